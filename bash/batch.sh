@@ -3,18 +3,9 @@
 clear
 FILENAME="CELCON"
 FILENAME2="PATCON"
-for i in {1..3..1}
-do
-    date
-    echo "STARTING THE SIMULATION NUMBER $i"
-    sleep 1
-    echo "COPYING FILE"
-    cp ./input/$FILENAME$i.txt ./input/$FILENAME.txt
-    cp ./input/$FILENAME2$i.txt ./input/$FILENAME2.txt
-    sleep 0.5
-    echo "RUNNING THE SIMULATION"
-    echo "START!"
-    python src/main.py
-    echo "SIMULATION NUMBER $i FINISHED"
-done
-echo "SIMULATION DONE"
\ No newline at end of file
+date
+echo "STARTING THE SIMULATIONS"
+python src/sweep.py --zip --jobs 3 \
+    --set $FILENAME=./input/${FILENAME}1.txt,./input/${FILENAME}2.txt,./input/${FILENAME}3.txt \
+    --set $FILENAME2=./input/${FILENAME2}1.txt,./input/${FILENAME2}2.txt,./input/${FILENAME2}3.txt
+echo "SIMULATION DONE"
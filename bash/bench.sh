@@ -0,0 +1,3 @@
+#!/bin/sh
+
+cd src && python -m physica.benchmark "$@"
\ No newline at end of file
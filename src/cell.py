@@ -14,6 +14,7 @@ import shapely.geometry as geo
 import integrin as ign
 import inputfile as ifile
 import physica as psc
+import state as sta
 
 
 class Cell:
@@ -64,11 +65,23 @@ class Cell:
         self._integrin_size = size
         self._integrin_mass = mass
         self._min_dst = min_dst
-        self._integrins: list[ign.Integrin] = self._build2(
+        self._integrins: list[ign.Integrin]
+        self._integrins, self._edges = self._build2(
             radius, self.x_position, self.y_position, self._min_dst
         )
+        self._neighbor_pointer, self._neighbor_index = self._neighbor_csr()
+        self._build_topology()
+        self._integrin_index = {obj.id_: obj for obj in self._integrins}
         self._alpha_shape = None
+        # the boundary coordinates and its area and perimeter, the
+        # ordered surface ring is reset by `_build_topology`
+        self._boundary = np.zeros((0, 2))
+        self._area = -1
+        self._perimeter = -1
         self._energy_loss = 0.0
+        self._state = None
+        self._rows = None
+        self._radius = None
         # self._min_dst = 1.5*min_dst
 
     def _build(self, radius, x_position, y_position, grid_length):
@@ -180,25 +193,24 @@ class Cell:
     def _build2(self, radius, x_position, y_position, grid_length):
         """a function to build the cell version 2.
 
-        Step:
-        	1. Buat semua integrin pada cell dengan cara tinjuan layer per layer.
-	        2. Setiap layer memiliki integrin dengan jarak i*d (I adalah nomor layer) dan sudut kelipatan pi/3
-	        3. Untuk setiap layer ke I, dari salah satu integrin dengan jarak i*d tersebut. Akan dikurangi i-1 kali untuk menemukan posisi integrin di sisi hexagon
-		        a. Integrin sudut 0, dari posisinya, x - n*d cos 60 dan y + n*d sin 60 untuk n dari 1 sampai i-1
-		        b. Integirn sudut 60  dari posisinya,  x - n*d dan y, untuk n dari 1 sampai i-1
-		        c. Integrin sudut 120 dari posisinya, x - n*d cos 60 dan y - n*d sin 60 untuk n dari 1 sampai i-1
-		        d. Integrin sudut 180 dari posisinya, x + n*d cos 60 dan y - n*d sin 60 untuk n dari 1 sampai i-1
-		        e. Integrin sudut 240 dari posisinya x + n*d dan y untuk n dari 1 sampai i-1
-		        f. Integrin sudut 300 dari posisinya x + n*d  cos 60 dan y + n*d sin 60 untuk n dari 1 sampai i-1
-	        4. Masukkan setiap integrin ke dalam sebuah list jika integrin masih berada pada radius cell
-	        5. Pengisian berhenti jika tidak ada integrin dalam satu layer tersebut yang berada pada radius cell
-	        6. Menentukan tetangga dengan prinsip slicing, dan mencari seluruh integrin tetangga berjadak d.
-	        7. List depan selalu berisi integrin dengan layer awal (layer dalam) dan setiap layer akan di mulai dari sudut paling rendah ke sudut besar.
-	        8. Misal dari integrin awal list[x] yang ada di pusat, dia akan mencari tetangga dengan mengechek setiap interin dari list[x+1:]. 
-	        9. Jika sudah mendapat 6 tetangga atau sudah mencari seluruh integrin maka lanjut ke integrin [x+1] dengan mengecheck integrin dari list [x+2:] dst.
-	        10. Hingga integrin yang dicheck merupakan integrin ke n-1 dengan mengecheck integrin ke n. 
-	        11. setelah itu kemungkinan semua integrin telah memiliki tetangga maksimum 6 buah. 
+        The integrins are placed on a hexagonal lattice with the lattice
+        vectors (d, 0) and (d/2, d*sqrt(3)/2) where d is the grid
+        length. Every lattice point is written in the axial coordinate
+        (q, r) and its position is q*(d, 0) + r*(d/2, d*sqrt(3)/2).
 
+        Step:
+            1. Create the lattice points layer per layer. The layer i
+            is the hexagon ring with 6*i points, starting from the
+            corner with angle 0 and going counterclockwise.
+            2. Keep the points inside the cell radius. The layers stop
+            at the first layer without any point inside the radius.
+            3. The list always starts with the inner layer, so the
+            order (and the id) of the integrins is the same as the
+            layer per layer construction.
+            4. Two integrins are neighbors if their axial coordinates
+            differ by one of the six lattice directions. The neighbor
+            pairs are found with a lookup table of the axial
+            coordinates.
 
         Parameters
         ----------
@@ -210,42 +222,136 @@ class Cell:
             the dist between integrins. The integrins is spread in
             the hexagonal pattern.
 
+        Return
+        ------
+        objs:
+            the list of integrins
+        edges:
+            (E, 2) array of the local indices of neighboring integrins
+            with i < j.
         """
-        objs = []
-        create_integrin = True
-        # build integrin on the center
-        layer_lvl = 0
-        objs.append(ign.Integrin(self, x_position, y_position))
         print("Cell is build using build2 module")
-        
-        # build per layer
-        while(create_integrin):
-            create_integrin = False
-            layer_lvl += 1
-            print(f"layer_lvl : {layer_lvl}")
-            total_integrin_spot = 6*layer_lvl
-            layer_distance = layer_lvl*grid_length
-            for i in range(total_integrin_spot):
-                theta = (2*np.pi*i)/total_integrin_spot
-                #SAS triangle
-                side_A = layer_distance
-                side_B = layer_distance*((theta % (np.pi/3))/(np.pi/3))
-                integrin_distance = np.sqrt(side_A**2 + side_B**2 - 2*side_A*side_B*np.cos(np.pi/3))
-                if integrin_distance <= radius:
-                    x_dot = integrin_distance*np.cos(theta) + x_position
-                    y_dot = integrin_distance*np.sin(theta) + y_position
-                    objs.append(ign.Integrin(self, x_dot, y_dot))
-                    create_integrin = True
-        
-        # find neighbors
-        for i in range(len(objs)):
-            for j in range(i+1, len(objs)):
-                if objs[i].get_distance(objs[j]) <= grid_length*1.1:
-                    objs[i].neighbors.append(objs[j])
-                    objs[j].neighbors.append(objs[i])
-                if len(objs[i].neighbors) >= 6:
-                    break;  
-        return objs
+        # corner and side direction of the hexagon rings (axial)
+        corner = np.array(((1, 0), (0, 1), (-1, 1), (-1, 0), (0, -1), (1, -1)))
+        side = np.roll(corner, -1, axis=0) - corner
+
+        # every layer has at least one point closer than its distance
+        layer_max = int(np.floor(radius / (grid_length * np.sqrt(3) / 2))) + 1
+        layer = np.repeat(np.arange(1, layer_max + 1), 6 * np.arange(1, layer_max + 1))
+        spot = np.arange(len(layer)) - 3 * layer * (layer - 1)
+        sector = spot // layer
+        step = spot % layer
+        axial = corner[sector] * layer[:, np.newaxis] + side[sector] * step[:, np.newaxis]
+        axial = np.concatenate((np.zeros((1, 2), dtype=int), axial))
+        layer = np.concatenate(([0], layer))
+
+        # filter the lattice points inside the radius
+        q_coord = axial[:, 0]
+        r_coord = axial[:, 1]
+        distance = grid_length * np.sqrt(q_coord**2 + q_coord * r_coord + r_coord**2)
+        inside = distance <= radius
+        filled = np.bincount(layer[inside], minlength=layer_max + 1) > 0
+        layer_num = np.argmin(filled) if not filled.all() else layer_max + 1
+        inside &= layer < layer_num
+        axial = axial[inside]
+
+        x_dot = grid_length * (axial[:, 0] + axial[:, 1] / 2) + x_position
+        y_dot = grid_length * (np.sqrt(3) / 2) * axial[:, 1] + y_position
+        objs = [
+            ign.Integrin(self, x, y) for x, y in zip(x_dot.tolist(), y_dot.tolist())
+        ]
+
+        # find neighbors from the lattice adjacency
+        offset = layer_max + 1
+        lookup = np.full((2 * offset + 1, 2 * offset + 1), -1, dtype=int)
+        lookup[axial[:, 0] + offset, axial[:, 1] + offset] = np.arange(len(axial))
+        edges = []
+        for direction in corner[(0, 1, 5),]:
+            neighbor = lookup[
+                axial[:, 0] + direction[0] + offset, axial[:, 1] + direction[1] + offset
+            ]
+            source = np.flatnonzero(neighbor >= 0)
+            edges.append(np.column_stack((source, neighbor[source])))
+        edges = np.sort(np.concatenate(edges), axis=1)
+        edges = edges[np.lexsort((edges[:, 1], edges[:, 0]))]
+        for i, j in edges.tolist():
+            objs[i].neighbors.append(objs[j])
+            objs[j].neighbors.append(objs[i])
+        return objs, edges
+
+    def _freeze_neighbors(self):
+        """a function to freeze the neighbor graph of the integrins
+        into an edge array.
+
+        The neighbor graph never changes after the cell is built, so
+        every spring connection is stored once as a pair of local
+        indices (i, j) with i < j.
+
+        Return
+        ------
+        (E, 2) array of the local indices of connected integrins.
+        """
+        local_index = {id(obj): i for i, obj in enumerate(self._integrins)}
+        edges = []
+        for i, obj in enumerate(self._integrins):
+            for neighbor in obj.neighbors:
+                j = local_index[id(neighbor)]
+                if i < j:
+                    edges.append((i, j))
+        return np.array(edges, dtype=int).reshape(-1, 2)
+
+    def _neighbor_csr(self):
+        """a function to build the compressed sparse row (CSR) neighbor
+        lists from the edge array.
+
+        Return
+        ------
+        neighbor_pointer:
+            the neighbors of local integrin i are
+            `neighbor_index[neighbor_pointer[i]:neighbor_pointer[i+1]]`
+        neighbor_index:
+            the local index of the neighbors
+        """
+        number = len(self._integrins)
+        source = np.concatenate((self._edges[:, 0], self._edges[:, 1]))
+        target = np.concatenate((self._edges[:, 1], self._edges[:, 0]))
+        order = np.argsort(source, kind="stable")
+        neighbor_pointer = np.zeros(number + 1, dtype=int)
+        np.cumsum(np.bincount(source, minlength=number), out=neighbor_pointer[1:])
+        return neighbor_pointer, target[order]
+
+    def _build_topology(self):
+        """procedure to store the data derived from the neighbor graph
+        as arrays: the degree, the surface mask and index and the
+        neighbor ids. The integrins get their surface status and
+        neighbor ids from these arrays.
+        """
+        self._degree = np.diff(self._neighbor_pointer)
+        self._surface_mask = self._degree < 6
+        self._surface_index = np.flatnonzero(self._surface_mask)
+        integrin_id = np.array([obj.id_ for obj in self._integrins], dtype=int)
+        self._neighbor_id = integrin_id[self._neighbor_index]
+        self._surface_integrins = [self._integrins[i] for i in self._surface_index]
+        for i, obj in enumerate(self._integrins):
+            obj._issurface = bool(self._surface_mask[i])
+            obj._neighbors_id = [neighbor.id_ for neighbor in obj.neighbors]
+        # the surface ring is traced again when it is needed
+        self._ring = None
+
+    def invalidate_topology(self):
+        """procedure to rebuild the topology data after the neighbor
+        lists of the integrins are changed.
+
+        The edges, the CSR neighbor lists and the topology arrays are
+        rebuilt from the integrin neighbors, and the spring network of
+        the integrin state is rebuilt. The nearest list rebuilds its
+        surface mask on its next update.
+        """
+        self._edges = self._freeze_neighbors()
+        self._neighbor_pointer, self._neighbor_index = self._neighbor_csr()
+        self._build_topology()
+        if self._state is not None:
+            self._state.update_edges()
 
     def get_integrin_by_id(self, id_):
         """procedure to get a specific integrin by its ID.
@@ -259,17 +365,49 @@ class Cell:
         ------
         integrin with the id mentioned.
         """
-        for integrin_ in self.integrins:
-            if integrin_.id_ == id_:
-                return integrin_
-            return None
+        return self._integrin_index.get(id_)
+
+    def bind(self, state, rows: slice):
+        """procedure to register the rows of the cell's integrins in
+        the integrin state.
+
+        Parameters
+        ----------
+        state: :obj: IntegrinState
+            the state which stores all the integrins in the system
+        rows: slice
+            the contiguous rows of the cell's integrins in the state
+        """
+        self._state = state
+        self._rows = rows
+
+    def _surface_rows(self):
+        """return the rows of the surface integrins in the state."""
+        return self._rows.start + self._surface_index
+
+    def update_radius(self):
+        """Procedure to update the cached bounding circle radius of the
+        cell from the surface integrin positions.
+        """
+        position = self._state.position[self._surface_rows()]
+        if len(position) == 0:
+            self._radius = -1
+            return self._radius
+        dist_vec = position - self.position
+        self._radius = np.sqrt(np.max(np.einsum("ij,ij->i", dist_vec, dist_vec)))
+        return self._radius
 
     def update_position(self):
-        """Procedure to update the position of center of mass."""
-        center_of_mass = np.array([0, 0], dtype=float)
-        for integrin_ in self.integrins:
-            center_of_mass += integrin_.position
-        return center_of_mass / self.number_integrin
+        """Procedure to update the position of center of mass from the
+        integrin positions in the state. It should be called once after
+        the integrins move.
+        """
+        self._position[:] = np.average(
+            self._state.position[self._rows],
+            axis=0,
+            weights=self._state.mass[self._rows],
+        )
+        return self._position
 
     def update_alphashape(self, alpha_value=0):
         """Alphashape is a method to create the surrounding area of
@@ -283,6 +421,79 @@ class Cell:
         """
         dot_position = self.pos_list[0] + self.pos_list[1]
         self.alpha_shape= alphashape.alphashape(dot_position, alpha_value)
+        self._area = self.alpha_shape.area
+        self._perimeter = self.alpha_shape.length
+        if isinstance(self.alpha_shape, geo.Polygon):
+            self._boundary = np.asarray(self.alpha_shape.exterior.coords)[:-1, :2]
+
+    def _surface_ring(self):
+        """a function to order the surface integrins into the outer
+        ring of the neighbor graph.
+
+        The ring is traced from the lowest integrin. In every step, the
+        next integrin is the first neighbor counterclockwise from the
+        direction back to the previous integrin, so the outside of the
+        cell is always on the right side and the ring is
+        counterclockwise.
+
+        Return
+        ------
+        the local index of the ring integrins, it is empty if the ring
+        can not be traced.
+        """
+        position = self._state.position[self._rows]
+        if len(position) < 3:
+            return np.zeros(0, dtype=int)
+        start = int(np.lexsort((position[:, 0], position[:, 1]))[0])
+        back_angle = -np.pi / 2
+        current = start
+        ring = [start]
+        for _ in range(len(position)):
+            neighbor = self._neighbor_index[
+                self._neighbor_pointer[current]:self._neighbor_pointer[current + 1]
+            ]
+            if len(neighbor) == 0:
+                break
+            vector = position[neighbor] - position[current]
+            angle = np.mod(np.arctan2(vector[:, 1], vector[:, 0]) - back_angle, 2 * np.pi)
+            # going back is the last choice
+            angle[angle < 1e-9] = 2 * np.pi
+            following = int(neighbor[np.argmin(angle)])
+            vector = position[current] - position[following]
+            back_angle = np.arctan2(vector[1], vector[0])
+            current = following
+            if current == start:
+                return np.array(ring, dtype=int)
+            ring.append(current)
+        return np.zeros(0, dtype=int)
+
+    def update_boundary(self, alpha_value=0):
+        """Procedure to update the boundary, the area and the perimeter
+        of the cell from the surface ring.
+
+        The surface integrins are ordered once from the neighbor graph,
+        then the area and the perimeter are computed with the shoelace
+        formula from the current position. The alpha shape is only
+        used if the ring can not be traced.
+
+        Parameters
+        ----------
+        alpha_value, default 0
+            the alpha value of the alpha shape if it is used
+        """
+        if self._ring is None:
+            self._ring = self._surface_ring()
+        if len(self._ring) < 3:
+            self.update_alphashape(alpha_value)
+            return
+        boundary = self._state.position[self._rows.start + self._ring]
+        following = np.roll(boundary, -1, axis=0)
+        self._area = 0.5 * abs(
+            np.sum(boundary[:, 0] * following[:, 1] - following[:, 0] * boundary[:, 1])
+        )
+        self._perimeter = np.sum(np.linalg.norm(following - boundary, axis=1))
+        self._boundary = boundary
+        self._alpha_shape = None
 
     @property
     def integrin_size(self):
@@ -367,14 +578,33 @@ class Cell:
     def alpha_shape(self, value):
         self._alpha_shape = value
 
+    @property
+    def shape(self):
+        """return the shapely polygon of the cell, i.e. the alpha shape
+        or the polygon of the surface ring.
+        """
+        if self._alpha_shape is not None:
+            return self._alpha_shape
+        return geo.Polygon(self._boundary)
+
+    @property
+    def boundary(self):
+        """return the (K, 2) coordinates of the cell boundary"""
+        return self._boundary
+
     @property
     def area(self):
-        """return the area size of the cell based on the alphashape
-        perimeter.
+        """return the area size of the cell based on the last updated
+        boundary (alphashape or surface ring), -1 if there is none.
         """
-        if self.alpha_shape is not None:
-            return self.alpha_shape.area
-        return -1
+        return self._area
+
+    @property
+    def perimeter(self):
+        """return the perimeter of the cell based on the last updated
+        boundary (alphashape or surface ring), -1 if there is none.
+        """
+        return self._perimeter
 
     @property
     def total_bound(self):
@@ -390,6 +620,31 @@ class Cell:
         """return the list of integrins in the cell."""
         return self._integrins
 
+    @property
+    def edges(self):
+        """return the (E, 2) local index pairs of the spring network."""
+        return self._edges
+
+    @property
+    def neighbor_pointer(self):
+        """return the CSR pointer of the neighbor lists."""
+        return self._neighbor_pointer
+
+    @property
+    def neighbor_index(self):
+        """return the CSR local index of the neighbor lists."""
+        return self._neighbor_index
+
+    @property
+    def state(self):
+        """return the integrin state which stores the cell's integrins."""
+        return self._state
+
+    @property
+    def rows(self):
+        """return the slice of the cell's integrins in the state."""
+        return self._rows
+
     @property
     def number_integrin(self):
         """return the total number of integrin in the cell."""
@@ -402,12 +657,32 @@ class Cell:
 
     @property
     def surface_integrin(self):
-        """return the list of surface integrins"""
-        integrin_list: list[ign.Integrin]  = []
-        for integrin_ in self.integrins:
-            if integrin_.issurface:
-                integrin_list.append(integrin_)
-        return integrin_list
+        """return the list of surface integrins, it must not be
+        modified.
+        """
+        return self._surface_integrins
+
+    @property
+    def degree(self):
+        """return the number of neighbors of every integrin."""
+        return self._degree
+
+    @property
+    def surface_mask(self):
+        """return the surface status of every integrin."""
+        return self._surface_mask
+
+    @property
+    def surface_index(self):
+        """return the local index of the surface integrins."""
+        return self._surface_index
+
+    @property
+    def neighbor_id(self):
+        """return the ids of the neighbors in the CSR order of
+        `neighbor_index`.
+        """
+        return self._neighbor_id
 
     @property
     def mass(self):
@@ -421,11 +696,10 @@ class Cell:
         This kinetic energy is based on the integrin velocity in x-axis
         and y-axis.
         """
-        energy = 0.0
-        for integrin_ in self.integrins:
-            # if not integrin_.bound:
-            energy = energy + integrin_.kinetic_energy
-        return energy
+        velocity = self._state.velocity[self._rows]
+        return 0.5 * np.sum(
+            self._state.mass[self._rows] * np.einsum("ij,ij->i", velocity, velocity)
+        )
     
     @property
     def potential_energy(self):
@@ -435,19 +709,14 @@ class Cell:
         1. spring connection.
         2. Lennard-jones potential
         """
-        energy = 0.0
-        for integrin_ in self.integrins:
-           energy = energy + integrin_._potential_energy
+        energy = np.sum(self._state.potential_energy[self._rows])
         return energy - self._energy_loss
 
     @property
     def bonding_energy(self):
         """return the value of total Bonding energy of the integrin"""
-        energy = 0.0
-        for integrin_ in self.integrins:
-            if integrin_.bound:
-                energy = energy + integrin_.bonding_energy
-        return energy
+        bound = self._state.bound[self._rows]
+        return np.sum(self._state.bonding_energy[self._rows][bound])
 
     @property
     def normal_length(self):
@@ -460,15 +729,14 @@ class Cell:
     def radius(self):
         """return the radius of the smallest circle which surroudnd the
         the cell
+
+        The radius is cached, call `update_radius` to refresh it after
+        the integrins move.
         """
-        dist = -1
-        for integrin in self.surface_integrin:
-            calc_dist = np.linalg.norm(integrin.position-self.position)
-            if dist < 0:
-                dist = calc_dist
-            elif dist < calc_dist:
-                dist = calc_dist
-        return dist
+        if self._radius is None:
+            self.update_radius()
+        return self._radius
+
     @classmethod
     def reset_count(cls):
         """reset the number of cell created into 0."""
@@ -514,6 +782,14 @@ class Cells:
         else:
             pass
 
+        self._cell_index = {cell.id_: cell for cell in self._members}
+
+        # sub-collections share the state of their parent collection
+        if self._members and self._members[0].state is not None:
+            self._state = self._members[0].state
+        else:
+            self._state = sta.IntegrinState(self._members)
+
         print(f"SYSTEM: {len(self.members)} cell(s) is created")
 
     def get_cell_by_id(self, id_):
@@ -528,13 +804,10 @@ class Cells:
         ------
         Cell with the id.
         """
-        for cell in self.members:
-            if cell.id_ == id_:
-                return cell
-        return None
+        return self._cell_index.get(id_)
     
     def get_integrin_by_id(self, cell_id, integrin_id):
-        """Procedure to get cell by id.
+        """Procedure to get integrin by the id of its cell and its id.
 
         Parameter
         ---------
@@ -547,12 +820,10 @@ class Cells:
         ------
         integrin with the cell_id and integrin_id.
         """
-        for cell in self.members:
-            if cell.id_ == cell_id:
-                for integrin_ in cell.integrins:
-                    if integrin_.id_ == integrin_id:
-                        return integrin_
-        return None
+        cell = self.get_cell_by_id(cell_id)
+        if cell is None:
+            return None
+        return cell.get_integrin_by_id(integrin_id)
 
 
     def exclude_cell_by_id(self, id_):
@@ -602,16 +873,154 @@ class Cells:
                     surface_integrin += obj.surface_integrin
         # filter the integrin
         if filter_bound is True:
-            for integrin_ in surface_integrin:
-                if integrin_.bound is True:
-                    surface_integrin.remove(integrin_)
+            surface_integrin = [
+                integrin_ for integrin_ in surface_integrin if integrin_.bound is False
+            ]
         return surface_integrin
 
+    def update_position(self):
+        """Procedure to update the center of mass of every member cell.
+        It should be called once after the integrins move, before
+        `update_radius`.
+        """
+        for cell in self.members:
+            cell.update_position()
+
+    def update_radius(self):
+        """Procedure to update the cached bounding circle of every
+        member cell. It should be called once after the integrins move.
+        """
+        for cell in self.members:
+            cell.update_radius()
+
+    def surface_pairs(self, max_dist, filter_bound: bool = True):
+        """procedure to find every pair of surface integrins from
+        different cells which are closer than `max_dist` in one pass.
+
+        The cells whose bounding circles are too far from every other
+        cell are skipped. The surface integrins of the remaining cells
+        are put into one spatial hash and queried at once.
+
+        Parameter
+        ---------
+        max_dist: float
+            the maximum distance between the integrins.
+        filter_bound: bool, default=True
+            only return the unbound target integrins.
+
+        Return
+        ------
+        row:
+            the row of the surface integrin of every pair.
+        index:
+            the row of the target surface integrin of every pair.
+        """
+        state = self.state
+        empty = np.zeros(0, dtype=int)
+        if not self.many:
+            return empty, empty
+        # broadphase of the bounding circles
+        center = np.array([cell.position for cell in self.members], dtype=float)
+        radius = np.array([cell.radius for cell in self.members], dtype=float)
+        dist = np.linalg.norm(center[:, np.newaxis] - center[np.newaxis], axis=2)
+        near = (dist - (radius[:, np.newaxis] + radius[np.newaxis])) < max_dist
+        np.fill_diagonal(near, False)
+        active = np.flatnonzero(near.any(axis=1))
+        if len(active) == 0:
+            return empty, empty
+        rows = np.concatenate([self.members[i]._surface_rows() for i in active])
+        # narrowphase with the spatial hash of the surface integrins
+        target = rows
+        if filter_bound is True:
+            target = rows[~state.bound[rows]]
+        spatial_hash = psc.SpatialHash(state.position[target], max_dist)
+        pointer, index = spatial_hash.query(state.position[rows], max_dist)
+        row = np.repeat(rows, np.diff(pointer))
+        index = target[index]
+        keep = state.cell_id[row] != state.cell_id[index]
+        return row[keep], index[keep]
+
+    def update_target_bound(self, substrate):
+        """procedure to update the target of every integrin in one
+        pass, it gives the same targets as `Integrin.update_target_bound`
+        of every integrin.
+
+        The surface integrins of many cells search the unbound surface
+        integrins of the other cells with `surface_pairs`, the other
+        integrins search the unbound ligands with
+        `Nanopattern.nearest_many`. The closest candidate becomes the
+        target if it is closer than the current target.
+
+        Parameter
+        ---------
+        substrate: :obj: Nanopattern
+            the nanopatterned substrate, consists of ligands
+        """
+        state = self.state
+        position = state.position
+        surface = np.zeros(state.number, dtype=bool)
+        if self.many:
+            for cell in self.members:
+                surface[cell._surface_rows()] = True
+        candidate_row = []
+        candidate_dist = []
+        candidate_target = []
+
+        # the unbound ligands of the non surface integrins
+        rows = np.flatnonzero(~surface)
+        pointer, index = substrate.nearest_many(position[rows], 2 * substrate.ligand_size)
+        row = np.repeat(rows, np.diff(pointer))
+        dist = np.linalg.norm(substrate.positions[index] - position[row], axis=1)
+        keep = dist <= state.size[row] + (2 ** (1 / 6)) * substrate.ligand_size
+        candidate_row.append(row[keep])
+        candidate_dist.append(dist[keep])
+        candidate_target.append([substrate.ligands[i] for i in index[keep]])
+
+        # the unbound surface integrins of the other cells
+        if self.many:
+            size = state.size
+            row, index = self.surface_pairs(3 * np.max(size))
+            # the bounding circles of both cells are closer than 2*size
+            cell_index = np.repeat(
+                np.arange(self.number_cell),
+                [cell.number_integrin for cell in self.members],
+            )
+            center = np.array([cell.position for cell in self.members], dtype=float)
+            radius = np.array([cell.radius for cell in self.members], dtype=float)
+            cell_a = cell_index[row]
+            cell_b = cell_index[index]
+            gap = np.linalg.norm(center[cell_b] - center[cell_a], axis=1) - (
+                radius[cell_a] + radius[cell_b]
+            )
+            dist = np.linalg.norm(position[index] - position[row], axis=1)
+            keep = (gap < 2 * size[row]) & (
+                dist <= 1.2 * (size[row] + (2 ** (1 / 6)) * size[index])
+            )
+            candidate_row.append(row[keep])
+            candidate_dist.append(dist[keep])
+            candidate_target.append([state.integrins[i] for i in index[keep]])
+
+        # the closest candidate of every row, the first one on a tie
+        row = np.concatenate(candidate_row)
+        dist = np.concatenate(candidate_dist)
+        target = [obj for targets in candidate_target for obj in targets]
+        order = np.lexsort((np.arange(len(row)), dist, row))
+        first = order[np.r_[True, row[order][1:] != row[order][:-1]]] if len(row) else order
+        for i in first:
+            integrin_ = state.integrins[row[i]]
+            if integrin_.target is None or dist[i] < integrin_.get_distance(integrin_.target):
+                integrin_._target = target[i]
+
     @property
     def members(self):
         """return list of cells from Cells object"""
         return self._members
 
+    @property
+    def state(self):
+        """return the integrin state of all the member cells"""
+        return self._state
+
     @property
     def number_cell(self):
         """return the total number of cells in the Cells object"""
@@ -0,0 +1,216 @@
+"""checkpoint module
+
+This module saves and restores the complete dynamic state of the
+simulation in a binary checkpoint file, so an interrupted simulation
+can be resumed exactly where it stopped.
+
+The static structure, i.e. the ligands, the cells, the integrins and
+their spring network, is rebuilt from the input files. The checkpoint
+stores everything that changes during the simulation:
+1. the integrin arrays of the state and the bond pairs
+2. the target, bound status and bonding energy of every integrin
+3. the bound status and the target of every ligand
+4. the energy loss of every cell
+5. the Verlet lists of the nearest list
+6. the time-averaged density map, if it is accumulated
+7. the iteration counter, the start time and the config hash
+"""
+
+# built-in import
+import hashlib
+import os
+from datetime import datetime
+from pathlib import Path
+
+# third party import
+import numpy as np
+
+# local import
+import ligand as lig
+import physica as psc
+
+CHECKPOINT_NAME = "CHECKPOINT.npz"
+# the files and sections of the input which define the simulated system
+_HASHED_INPUT = (("PATCON", None), ("CELCON", None), ("SIMCON", "#PHYSICS"))
+
+
+def checkpoint_file(time) -> Path:
+    """return the path of the checkpoint of a simulation"""
+    return Path(f"./output/{psc.time_format(time)}-output/checkpoint/{CHECKPOINT_NAME}")
+
+
+def config_hash(input_dir="./input"):
+    """Function to get the hash of the input files.
+
+    The output options in SIMCON (e.g. the number of iteration or the
+    save gap) may change on resume, so only its physics section is
+    used.
+
+    Return
+    ------
+    the sha256 hex digest of the input
+    """
+    digest = hashlib.sha256()
+    for file_name, section in _HASHED_INPUT:
+        with open(f"{input_dir}/{file_name}.txt", "r", encoding="utf-8") as data_file:
+            lines = [line.strip() for line in data_file.readlines() if line.strip()]
+        if section is not None:
+            start_index = lines.index(section) + 1
+            end_index = next(
+                (i for i in range(start_index, len(lines)) if lines[i].startswith("#")),
+                len(lines),
+            )
+            lines = lines[start_index:end_index]
+        digest.update(file_name.encode())
+        digest.update("\n".join(lines).encode())
+    return digest.hexdigest()
+
+
+def save(
+    file_name, iteration, time, cells, substrate, nearest_list, hash_=None, density_map=None
+):
+    """Procedure to write the checkpoint of the simulation.
+
+    The file is written next to the target first and then renamed, so
+    an interrupted write never corrupts the previous checkpoint.
+
+    Parameters
+    ----------
+    file_name: str or Path
+        the path of the checkpoint
+    iteration: int
+        the last completed iteration
+    time: datetime
+        the start time of the simulation
+    cells: :obj: Cells
+        the compilation of cells
+    substrate: :obj: Nanopattern
+        the nanopatterned substrate
+    nearest_list: :obj: NearestList
+        the neighbor lists of the integrins
+    hash_: str, default=None
+        the config hash, the hash of the current input if None
+    density_map: :obj: DensityMap, default=None
+        the time-averaged density map of the integrins
+    """
+    state = cells.state
+    ligand_index = {id(ligand_): i for i, ligand_ in enumerate(substrate.ligands)}
+    target_ligand = np.full(state.number, -1, dtype=int)
+    target_integrin = np.full(state.number, -1, dtype=int)
+    for row, integrin_ in enumerate(state.integrins):
+        if isinstance(integrin_.target, lig.Ligand):
+            target_ligand[row] = ligand_index[id(integrin_.target)]
+        elif integrin_.target is not None:
+            target_integrin[row] = integrin_.target.row
+    ligand_target = np.fromiter(
+        (-1 if ligand_.target is None else ligand_.target.row for ligand_ in substrate.ligands),
+        dtype=int,
+        count=len(substrate.ligands),
+    )
+    arrays = {
+        "iteration": np.array(iteration),
+        "time": np.array(time.isoformat() if isinstance(time, datetime) else str(time)),
+        "config_hash": np.array(config_hash() if hash_ is None else hash_),
+        "position": state.position,
+        "velocity": state.velocity,
+        "acceleration": state.acceleration,
+        "force": state.force,
+        "bound": state.bound,
+        "potential_energy": state.potential_energy,
+        "bond_ligand": state.bond_ligand,
+        "bond_integrin": state.bond_integrin,
+        "target_ligand": target_ligand,
+        "target_integrin": target_integrin,
+        "bonding_energy": state.bonding_energy,
+        "ligand_bound": substrate.bound_mask,
+        "ligand_target": ligand_target,
+        "energy_loss": np.array([cell._energy_loss for cell in cells.members]),
+    }
+    for key, value in nearest_list.get_state().items():
+        arrays[f"nearest_{key}"] = value
+    if density_map is not None:
+        for key, value in density_map.get_state().items():
+            arrays[f"density_{key}"] = value
+
+    file_name = Path(file_name)
+    file_name.parent.mkdir(parents=True, exist_ok=True)
+    temp_name = file_name.with_name(f"{file_name.stem}.tmp.npz")
+    np.savez(temp_name, **arrays)
+    os.replace(temp_name, file_name)
+
+
+def read_info(file_name):
+    """Function to read the iteration, the start time and the config
+    hash of a checkpoint without restoring it.
+    """
+    with np.load(file_name) as data:
+        iteration = int(data["iteration"])
+        time = str(data["time"])
+        hash_ = str(data["config_hash"])
+    if time != "debug":
+        time = datetime.fromisoformat(time)
+    return iteration, time, hash_
+
+
+def load(file_name, cells, substrate, nearest_list, density_map=None):
+    """Procedure to restore the simulation from a checkpoint.
+
+    The cells and the substrate must be built from the same input as
+    the checkpointed simulation.
+
+    Parameters
+    ----------
+    file_name: str or Path
+        the path of the checkpoint
+    cells: :obj: Cells
+        the compilation of cells
+    substrate: :obj: Nanopattern
+        the nanopatterned substrate
+    nearest_list: :obj: NearestList
+        the neighbor lists of the integrins
+    density_map: :obj: DensityMap, default=None
+        the time-averaged density map, it is restored if the
+        checkpoint has one
+
+    Return
+    ------
+    the last completed iteration of the checkpoint
+    """
+    state = cells.state
+    with np.load(file_name) as data:
+        if data["position"].shape != state.position.shape or len(
+            data["ligand_bound"]
+        ) != len(substrate.ligands):
+            raise ValueError("the checkpoint does not match the system")
+        # the integrin objects are views of these arrays
+        for key in ("position", "velocity", "acceleration", "force"):
+            getattr(state, key)[:] = data[key]
+        for key in ("potential_energy", "bonding_energy", "bond_ligand", "bond_integrin"):
+            getattr(state, key)[:] = data[key]
+        for row, integrin_ in enumerate(state.integrins):
+            integrin_.bound = bool(data["bound"][row])
+            if data["target_ligand"][row] >= 0:
+                integrin_._target = substrate.ligands[data["target_ligand"][row]]
+            elif data["target_integrin"][row] >= 0:
+                integrin_._target = state.integrins[data["target_integrin"][row]]
+            else:
+                integrin_._target = None
+        for index, ligand_ in enumerate(substrate.ligands):
+            ligand_.bound = bool(data["ligand_bound"][index])
+            row = data["ligand_target"][index]
+            ligand_._target = None if row < 0 else state.integrins[row]
+        for cell, energy_loss in zip(cells.members, data["energy_loss"]):
+            cell._energy_loss = float(energy_loss)
+        nearest_list.set_state(
+            {
+                key[len("nearest_"):]: data[key]
+                for key in data.files
+                if key.startswith("nearest_")
+            }
+        )
+        if density_map is not None and "density_sum" in data.files:
+            density_map.set_state({"sum": data["density_sum"], "count": data["density_count"]})
+        iteration = int(data["iteration"])
+    cells.update_position()
+    cells.update_radius()
+    return iteration
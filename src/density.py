@@ -0,0 +1,141 @@
+"""density module
+
+This module computes the density map of the integrins on the
+substrate and accumulates the time-averaged density map during the
+simulation, so the heat map does not depend on the rendered figures.
+
+"""
+
+# built-in import
+import os
+from pathlib import Path
+
+# third party import
+import numpy as np
+
+# local import
+import physica as psc
+
+DENSITY_NAME = "DENSITY.npz"
+
+
+def histogram(position, width, height, resolution: int = 100):
+    """Function to count the objects in every bin of a regular grid.
+
+    The objects on the right or top edge of the substrate are counted
+    in the last bin and the objects outside the substrate are ignored.
+
+    Parameters
+    ----------
+    position: np.ndarray
+        the (N, 2) position of the objects
+    width: float
+        the width of the substrate
+    height: float
+        the height of the substrate
+    resolution: int, default=100
+        the number of bins in every axis
+
+    Return
+    ------
+    (resolution, resolution) array of the count, the first index is
+    the x-axis bin
+    """
+    position = np.asarray(position, dtype=float).reshape(-1, 2)
+    inside = (
+        (position[:, 0] >= 0)
+        & (position[:, 0] <= width)
+        & (position[:, 1] >= 0)
+        & (position[:, 1] <= height)
+    )
+    x_index = np.minimum((position[inside, 0] * (resolution / width)).astype(int), resolution - 1)
+    y_index = np.minimum((position[inside, 1] * (resolution / height)).astype(int), resolution - 1)
+    count = np.bincount(x_index * resolution + y_index, minlength=resolution * resolution)
+    return count.reshape(resolution, resolution).astype(float)
+
+
+class DensityMap:
+    """Running time-averaged density map of the integrins.
+
+    Every call of `add` adds the histogram of the current position,
+    the mean is the sum divided by the number of added steps.
+    """
+
+    def __init__(self, width, height, resolution: int = 100) -> None:
+        """init function for the density map.
+
+        parameters
+        ----------
+        width: float
+            the width of the substrate
+        height: float
+            the height of the substrate
+        resolution: int, default=100
+            the number of bins in every axis
+        """
+        self._width = width
+        self._height = height
+        self._resolution = resolution
+        self._sum = np.zeros((resolution, resolution), dtype=float)
+        self._count = 0
+
+    def add(self, position):
+        """Procedure to add the histogram of a step.
+
+        Parameter
+        ---------
+        position: np.ndarray
+            the (N, 2) position of the integrins
+        """
+        self._sum += histogram(position, self._width, self._height, self._resolution)
+        self._count += 1
+
+    def save(self, file_name):
+        """Procedure to save the density map as a npz file with the
+        sum, the number of steps, the mean and the bin edges.
+        """
+        file_name = Path(file_name)
+        file_name.parent.mkdir(parents=True, exist_ok=True)
+        temp_name = file_name.with_name(f"{file_name.stem}.tmp.npz")
+        np.savez(
+            temp_name,
+            sum=self._sum,
+            count=np.array(self._count),
+            mean=self.mean,
+            x_edges=np.linspace(0, self._width, self._resolution + 1),
+            y_edges=np.linspace(0, self._height, self._resolution + 1),
+        )
+        os.replace(temp_name, file_name)
+
+    def get_state(self):
+        """return the arrays to restore the density map, e.g. in a
+        checkpoint
+        """
+        return {"sum": self._sum.copy(), "count": np.array(self._count)}
+
+    def set_state(self, arrays: dict):
+        """Procedure to restore the density map from `get_state`"""
+        if arrays["sum"].shape != self._sum.shape:
+            raise ValueError("the density map does not match the resolution")
+        self._sum[:] = arrays["sum"]
+        self._count = int(arrays["count"])
+
+    @property
+    def mean(self):
+        """return the time-averaged density map"""
+        return self._sum / max(self._count, 1)
+
+    @property
+    def count(self):
+        """return the number of added steps"""
+        return self._count
+
+    @property
+    def resolution(self):
+        """return the number of bins in every axis"""
+        return self._resolution
+
+
+def density_file(time) -> str:
+    """return the path of the density map of a simulation"""
+    return f"./output/{psc.time_format(time)}-output/file/{DENSITY_NAME}"
@@ -72,12 +72,19 @@ def force_objects_lennardjones(
         The total force from the objects.
 
     """
-    total_force = np.zeros(dim)
-    for target in collection_target:
-        total_force = total_force + psc.force.lj_6_12(
-            target.position, position_object, epsilon, sigma
-        )
-    return total_force
+    if not collection_target:
+        return np.zeros(dim)
+    target_position = np.array([target.position for target in collection_target])
+    number_target = len(target_position)
+    total_force = psc.force.lj_6_12_pairs(
+        target_position,
+        np.array([position_object]),
+        np.arange(number_target),
+        np.zeros(number_target, dtype=int),
+        epsilon,
+        sigma,
+    )
+    return total_force[0]
 
 
 def force_objects_spring(
@@ -125,3 +132,244 @@ def force_objects_spring(
             damping_coefficient,
         )
     return total_force
+
+
+def total_force_system(
+    position,
+    velocity,
+    state,
+    ligand_position,
+    lennardjones_pairs,
+    spring_constant,
+    damping_coefficient,
+    viscocity,
+    epsilon=1,
+    cutoff=None,
+):
+    """The total force acting on every integrin in the integrin state.
+
+    It is used as the force function of the batched integration, so
+    the positions and velocities of the neighboring integrins are
+    taken from the integrated state instead of the integrin objects.
+    The force on the bound integrins is zero.
+
+    Parameter
+    --------
+    position: numpy.ndarray
+        The (N, 2) position of all integrins.
+    velocity: numpy.ndarray
+        The (N, 2) velocity of all integrins.
+    state: IntegrinState
+        The state which stores all the integrins.
+    ligand_position: numpy.ndarray
+        The (M, 2) position of all ligands.
+    lennardjones_pairs: tuple
+        The Lennard-Jones pairs from `NearestList.pairs`.
+    spring_constant: float
+        The spring constant value.
+    damping_coefficient: float
+        The damping coefficient value.
+    viscocity: float
+        The viscocity of the medium.
+    epsilon: float
+        The depth of LJ potential.
+    cutoff: float, default=None
+        The maximum distance of the Lennard-Jones pairs.
+
+    Return
+    ------
+    totalForce:
+        The (N, 2) total force acting on the integrins.
+
+    """
+    ligand_index, ligand_row, integrin_index, integrin_row = lennardjones_pairs
+    number = len(position)
+    sigma = state.size
+    # Lennard-Jones force from the ligands and other cells' integrins
+    total_force = psc.force.lj_6_12_pairs(
+        ligand_position,
+        position,
+        ligand_index,
+        ligand_row,
+        epsilon,
+        sigma[ligand_row],
+        size=number,
+        cutoff=cutoff,
+    )
+    total_force += psc.force.lj_6_12_pairs(
+        position,
+        position,
+        integrin_index,
+        integrin_row,
+        epsilon,
+        sigma[integrin_row],
+        size=number,
+        cutoff=cutoff,
+    )
+    # spring force from the spring network, every spring once
+    total_force += psc.force.spring_pairs(
+        position,
+        velocity,
+        state.edges[:, 0],
+        state.edges[:, 1],
+        spring_constant,
+        state.rest_length,
+        damping_coefficient,
+        size=number,
+    )
+    # drag force from the medium
+    total_force += psc.force.drag(velocity, sigma[:, np.newaxis], viscocity)
+    total_force[state.bound] = 0.0
+    return total_force
+
+
+def potential_spring_system(position, state, spring_constant, mask=None):
+    """Function to calculate the spring potential energy of every
+    integrin from the spring network.
+
+    Each spring is evaluated once and its energy is shared equally by
+    both of the connected integrins.
+
+    Parameter
+    --------
+    position: numpy.ndarray
+        The (N, 2) position of all integrins.
+    state: IntegrinState
+        The state which stores all the integrins.
+    spring_constant: float
+        The spring constant value.
+    mask: numpy.ndarray, default=None
+        The (N,) boolean mask of the integrins to be calculated, only
+        the springs of these integrins are evaluated.
+
+    Return
+    ------
+    energy:
+        The (N,) spring potential energy of the integrins.
+
+    """
+    number = len(position)
+    index_a = state.edges[:, 0]
+    index_b = state.edges[:, 1]
+    rest_length = state.rest_length
+    if mask is not None:
+        keep = mask[index_a] | mask[index_b]
+        index_a = index_a[keep]
+        index_b = index_b[keep]
+        rest_length = rest_length[keep]
+    energy = 0.5 * psc.potential.spring_pairs(
+        position, index_a, index_b, spring_constant, rest_length
+    )
+    return np.bincount(index_a, weights=energy, minlength=number) + np.bincount(
+        index_b, weights=energy, minlength=number
+    )
+
+
+def potential_energy_system(
+    position,
+    state,
+    ligand_position,
+    lennardjones_pairs,
+    spring_constant,
+    epsilon=1,
+    cutoff=None,
+    rows=None,
+):
+    """Function to calculate the potential energy of every integrin in
+    the integrin state.
+
+    The potential energy consists of:
+    1. Lennard-Jones potential from the nearest unbound ligands or
+       other cells' surface integrins (shared by half).
+    2. Lennard-Jones potential from the bound target.
+    3. Spring potential from the spring network (shared by half).
+
+    Parameter
+    --------
+    position: numpy.ndarray
+        The (N, 2) position of all integrins.
+    state: IntegrinState
+        The state which stores all the integrins.
+    ligand_position: numpy.ndarray
+        The (M, 2) position of all ligands.
+    lennardjones_pairs: tuple
+        The Lennard-Jones pairs from `NearestList.pairs`.
+    spring_constant: float
+        The spring constant value.
+    epsilon: float
+        The depth of LJ potential.
+    cutoff: float, default=None
+        The maximum distance of the Lennard-Jones pairs.
+    rows: numpy.ndarray, default=None
+        The rows of the integrins to be calculated, e.g. the integrins
+        affected by a bonding. Only the pair terms of these integrins
+        are evaluated and the energy of the other rows is not valid.
+
+    Return
+    ------
+    energy:
+        The (N,) potential energy of the integrins.
+
+    """
+    ligand_index, ligand_row, integrin_index, integrin_row = lennardjones_pairs
+    number = len(position)
+    sigma = state.size
+    bond_ligand = np.flatnonzero(state.bond_ligand >= 0)
+    bond_integrin = np.flatnonzero(state.bond_integrin >= 0)
+    mask = None
+    if rows is not None:
+        mask = np.zeros(number, dtype=bool)
+        mask[rows] = True
+        keep = mask[ligand_row]
+        ligand_index = ligand_index[keep]
+        ligand_row = ligand_row[keep]
+        keep = mask[integrin_row]
+        integrin_index = integrin_index[keep]
+        integrin_row = integrin_row[keep]
+        bond_ligand = bond_ligand[mask[bond_ligand]]
+        bond_integrin = bond_integrin[mask[bond_integrin]]
+    # np.bincount returns integers for no pairs, so the sum starts as float
+    energy = np.zeros(number, dtype=float)
+    energy += psc.potential.lennardjones_6_12_pairs(
+        ligand_position,
+        position,
+        ligand_index,
+        ligand_row,
+        epsilon,
+        sigma[ligand_row],
+        size=number,
+        cutoff=cutoff,
+    )
+    energy += psc.potential.lennardjones_6_12_pairs(
+        position,
+        position,
+        integrin_index,
+        integrin_row,
+        epsilon,
+        sigma[integrin_row],
+        weight=0.5,
+        size=number,
+        cutoff=cutoff,
+    )
+    # the bound target
+    energy += psc.potential.lennardjones_6_12_pairs(
+        ligand_position,
+        position,
+        state.bond_ligand[bond_ligand],
+        bond_ligand,
+        epsilon,
+        sigma[bond_ligand],
+        size=number,
+    )
+    energy += psc.potential.lennardjones_6_12_pairs(
+        position,
+        position,
+        state.bond_integrin[bond_integrin],
+        bond_integrin,
+        epsilon,
+        sigma[bond_integrin],
+        weight=0.5,
+        size=number,
+    )
+    energy += potential_spring_system(position, state, spring_constant, mask)
+    return energy
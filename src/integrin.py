@@ -50,10 +50,44 @@ class Integrin(psc.ObjBase):
         self._potential_energy = 0.0
         self._bonding_energy = 0.0
         self._neighbors: list[Integrin] = []
+        # the topology cache, it is set by the host cell
+        self._issurface = None
+        self._neighbors_id = None
         self._target = None
         self._bound = False
         self._nearest = []
         self._radar_radius = 0.0
+        self._state = None
+        self._row = None
+
+    def bind(self, state, row: int):
+        """procedure to bind the integrin into a row of the state.
+
+        After binding, the integrin position, velocity, acceleration
+        and force are views of the state arrays.
+
+        Parameters
+        ----------
+        state: :obj: IntegrinState
+            the state which stores all the integrins in the system
+        row: int
+            the row of the integrin in the state
+        """
+        super().bind(
+            state.position[row],
+            state.velocity[row],
+            state.acceleration[row],
+            state.force[row],
+        )
+        self._state = state
+        self._row = row
+        state.cell_id[row] = self._cell.id_
+        state.integrin_id[row] = self.id_
+        state.bound[row] = self._bound
+        state.size[row] = self._size
+        state.mass[row] = self._mass
+        state.potential_energy[row] = self._potential_energy
+        state.bonding_energy[row] = self._bonding_energy
 
     def update_target_bound(self, cells:cel.Cells, substrate: npt.Nanopattern):
         """procedure to update the target bound
@@ -111,27 +145,27 @@ class Integrin(psc.ObjBase):
                     vector_dir = (self.position - self.target.position)/dist
                     self.position = self.target.position + vector_dir*(self.size + (2**(1/6))*self.target.size)
                 self.bound = True
-                self._bonding_energy = self.kinetic_energy
-                self._velocity = np.array([0.0, 0.0])
-                self._temp_velocity = self._velocity
-                self._acceleration = np.array([0.0, 0.0])
-                self._temp_acceleration = self._acceleration
-                self._force = np.array([0.0, 0.0])
-                self._temp_force = self._force
-                self._temp_position = self._position
+                self.bonding_energy = self.kinetic_energy
+                # reset in place to keep the views of the state
+                self._velocity[:] = 0.0
+                self._acceleration[:] = 0.0
+                self._force[:] = 0.0
 
                 # for target
                 self.target.bound = True
                 if isinstance(self.target, Integrin):
-                    self.target._bonding_energy = self.target.kinetic_energy
-                self.target._velocity = np.array([0.0, 0.0])
-                self.target._temp_velocity = self.target._velocity
-                self.target._acceleration = np.array([0.0, 0.0])
-                self.target._temp_acceleration = self.target._acceleration
-                self.target._force = np.array([0.0, 0.0])
-                self.target._temp_force = self.target._force
-                self.target._temp_position = self.target._position
+                    self.target.bonding_energy = self.target.kinetic_energy
+                self.target._velocity[:] = 0.0
+                self.target._acceleration[:] = 0.0
+                self.target._force[:] = 0.0
                 self.target.target = self
+                # register the bond pair in the state
+                if self._state is not None:
+                    if isinstance(self.target, Integrin):
+                        self._state.bond_integrin[self.row] = self.target.row
+                        self._state.bond_integrin[self.target.row] = self.row
+                    else:
+                        self._state.bond_ligand[self.row] = self.target.index
                 return True
             self.target = None
         return False
@@ -142,7 +176,8 @@ class Integrin(psc.ObjBase):
                        normal_length=1, 
                        spring_constant=1, 
                        epsilon=1, 
-                       sigma=1 ):
+                       sigma=1,
+                       spring_energy=None):
         """Procedure to calculate the potential 
         
         Parameter
@@ -154,6 +189,10 @@ class Integrin(psc.ObjBase):
             The epsilon value for Lennard-jones.
         sigma: float
             The sigma value for Lennard-jones.
+        spring_energy: float, default=None
+            The spring potential energy of the integrin computed from
+            the spring network. If None, it is calculated from the
+            neighbors.
         """
         energy = 0.0
         # Calculate the Lennard-Jones Potential
@@ -170,10 +209,13 @@ class Integrin(psc.ObjBase):
                 lj_pot_energy = psc.potential.lennardjones_6_12(self.target.position, self.position, epsilon, sigma)
             energy = energy + lj_pot_energy
         # Calculate the spring potential
-        for neighbor in self.neighbors:
-            spring_pot_energy = 0.5*psc.potential.spring(neighbor.position, self.position, spring_constant, normal_length)
-            energy = energy + spring_pot_energy
-        self._potential_energy = energy
+        if spring_energy is not None:
+            energy = energy + spring_energy
+        else:
+            for neighbor in self.neighbors:
+                spring_pot_energy = 0.5*psc.potential.spring(neighbor.position, self.position, spring_constant, normal_length)
+                energy = energy + spring_pot_energy
+        self.potential_energy = energy
         return energy
 
 
@@ -184,11 +226,12 @@ class Integrin(psc.ObjBase):
     
     @property
     def neighbors_id(self):
-        """return the ids of the neighbors"""
-        list_id = []
-        for neighbors in self.neighbors:
-            list_id.append(neighbors.id_)
-        return list_id
+        """return the ids of the neighbors, it is cached by the host
+        cell
+        """
+        if self._neighbors_id is None:
+            return [neighbor.id_ for neighbor in self.neighbors]
+        return self._neighbors_id
 
     @property
     def x_distance_center(self):
@@ -209,7 +252,9 @@ class Integrin(psc.ObjBase):
         ------
         True or false
         """
-        return bool(len(self.neighbors) < 6)
+        if self._issurface is None:
+            return bool(len(self.neighbors) < 6)
+        return self._issurface
 
     @property
     def target(self) -> Union[None, lig.Ligand, Integrin]:
@@ -221,6 +266,17 @@ class Integrin(psc.ObjBase):
         if isinstance(value, lig.Ligand) or isinstance(value, Integrin):
             self._target = value
 
+    @property
+    def bondable(self):
+        """return True if the integrin bonds to its target on the next
+        `bonding` call.
+        """
+        return (
+            self.bound is False
+            and self.target is not None
+            and self.target.bound is False
+        )
+
     @property
     def bound(self):
         """Integrin condition related to bonding status with other
@@ -232,6 +288,18 @@ class Integrin(psc.ObjBase):
     def bound(self, value):
         if isinstance(value, bool):
             self._bound = value
+            if self._state is not None:
+                self._state.bound[self._row] = value
+
+    @property
+    def state(self):
+        """return the state which stores the integrin"""
+        return self._state
+
+    @property
+    def row(self):
+        """return the row of the integrin in the state"""
+        return self._row
 
     @property
     def kinetic_energy(self):
@@ -241,7 +309,28 @@ class Integrin(psc.ObjBase):
     @property
     def bonding_energy(self):
         """return the bonding energy"""
+        if self._state is not None:
+            return self._state.bonding_energy[self._row]
         return self._bonding_energy
+
+    @bonding_energy.setter
+    def bonding_energy(self, value):
+        self._bonding_energy = value
+        if self._state is not None:
+            self._state.bonding_energy[self._row] = value
+
+    @property
+    def potential_energy(self):
+        """return the potential energy from the last calculation"""
+        if self._state is not None:
+            return self._state.potential_energy[self._row]
+        return self._potential_energy
+
+    @potential_energy.setter
+    def potential_energy(self, value):
+        self._potential_energy = value
+        if self._state is not None:
+            self._state.potential_energy[self._row] = value
     
     @classmethod
     def reset_count(cls):
@@ -40,6 +40,33 @@ class Ligand(psc.ObjBase):
         self._target: ign.Integrin = None
         self._target_integrin_id = None
         self._target_cell_id = None
+        self._pattern = None
+        self._index = None
+
+    def bind(self, pattern, index: int):
+        """procedure to bind the ligand into the arrays of the
+        nanopattern.
+
+        After binding, the ligand position is a view of the position
+        array of the nanopattern and the bound status is mirrored in
+        its bound array.
+
+        Parameters
+        ----------
+        pattern: :obj: Nanopattern
+            the nanopattern which contains the ligand
+        index: int
+            the index of the ligand in the nanopattern
+        """
+        super().bind(
+            pattern.positions[index],
+            self._velocity,
+            self._acceleration,
+            self._force,
+        )
+        self._pattern = pattern
+        self._index = index
+        pattern.bound_mask[index] = self._bound
 
     @classmethod
     def reset_count(cls):
@@ -57,6 +84,13 @@ class Ligand(psc.ObjBase):
     def bound(self, value):
         if isinstance(value, bool):
             self._bound = value
+            if self._pattern is not None:
+                self._pattern.bound_mask[self._index] = value
+
+    @property
+    def index(self):
+        """the index of the ligand in the nanopattern"""
+        return self._index
 
     @property
     def target(self):
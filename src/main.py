@@ -1,6 +1,8 @@
 """The main module of the simulation"""
 
 # built-in import
+import argparse
+import signal
 import sys
 from datetime import datetime
 from warnings import filterwarnings
@@ -10,14 +12,18 @@ import numpy as np
 
 # local import
 import cell as cel
+import checkpoint
+import density as dns
 import forces
 import inputfile as ifile
 import integrin as ign
 import ligand as lig
-import misc
 import nanopattern as npt
+import neighbor as nbr
+import parallel
 import physica as psc
 import plotter
+import render
 import save
 import simlog
 
@@ -25,9 +31,29 @@ import simlog
 COND = "debug"
 filterwarnings("ignore", category=FutureWarning)
 
+# read the command line arguments
+parser = argparse.ArgumentParser(description="run the stem cell simulation")
+parser.add_argument(
+    "--resume",
+    metavar="FOLDER_CODE",
+    help="resume the simulation from the checkpoint in ./output/FOLDER_CODE-output",
+)
+args = parser.parse_args()
+checkpoint_info = None
+if args.resume:
+    checkpoint_name = f"./output/{args.resume}-output/checkpoint/{checkpoint.CHECKPOINT_NAME}"
+    checkpoint_info = checkpoint.read_info(checkpoint_name)
+    if checkpoint_info[2] != checkpoint.config_hash():
+        raise ValueError(
+            f"the input files are different from the input of {checkpoint_name}"
+        )
+
 # initiate the code
 ori = sys.stdout
-time, log = simlog.init_simulation()
+if checkpoint_info is None:
+    time, log = simlog.init_simulation()
+else:
+    time, log = simlog.init_simulation(start_time=checkpoint_info[1])
 
 # open file SIMCON file
 simcon = ifile.Read("SIMCON")
@@ -38,17 +64,29 @@ print(f'SYSTEM: title of simulation\t\t: {metadata["title"]}')
 # get simulation configuration value from SIMCON file
 N_ITERATION = int(simcon.get("iteration"))
 SAVE_GAP = simcon.get("savegap")
+ENERGY_GAP = int(simcon.get("energygap") or 1)
 SAVE_FIG = bool(simcon.get("savefig") == 1)
 ALPHAVALUE = simcon.get("alpha")
+USE_RING = bool(simcon.get("boundary") == 1)
 SAVE_PATTERN_MAP = bool(simcon.get("patternmaping") == 1)
 SHOW_INTEGRIN = bool(simcon.get("showintegrin") == 1)
 SAVE_CENTER_OF_MASS = bool(simcon.get("centerofmass") == 1)
 SAVE_CELL_AREA = bool(simcon.get("cellarea") == 1)
 SAVE_GIF = bool(simcon.get("gif") == 1)
+GIF_STRIDE = int(simcon.get("gifstride") or 1)
+GIF_SIZE = simcon.get("gifsize")
+GIF_SIZE = 1000 if GIF_SIZE is None else int(GIF_SIZE)
 SAVE_CELL_MAP = bool(simcon.get("cellmaping") == 1)
 FORCE_ARROW = bool(simcon.get("forcearrow") == 1)
 GET_CONTOUR = bool(simcon.get("contour") == 1)
+SAVE_DENSITY = bool(simcon.get("densitymap") == 1)
+DENSITY_RESOLUTION = int(simcon.get("densityresolution") or 100)
 SHOW_PROGRESS = bool(simcon.get("showprogress") == 1)
+USE_JIT = bool(simcon.get("jit") == 1)
+WORKERS = int(simcon.get("workers") or 1)
+MAP_FORMAT = int(simcon.get("mapformat") or save.TEXT)
+OUTPUT_QUEUE = int(simcon.get("outputqueue") or 0)
+RENDER_WORKERS = int(simcon.get("renderworkers") or 0)
 
 # get the physical configuration value from SIMCON file
 EPSILON = simcon.get("epsilon")
@@ -58,7 +96,11 @@ MIN_FORCE = simcon.get("minForce")
 VISCOSITY = simcon.get("viscosity")
 TIMESTEP = simcon.get("timestep")
 input_near_dist = simcon.get("neardist")
+SKIN = simcon.get("skin") or 0.0
+CHECKPOINT_GAP = int(simcon.get("checkpointgap") or 0)
 
+# select the backend of the force and potential kernels
+print(f'SYSTEM: kernel backend\t\t\t: {psc.set_backend("numba" if USE_JIT else "numpy")}')
 
 # reset all the simulation dependent variables
 lig.Ligand.reset_count()
@@ -68,250 +110,363 @@ ign.Integrin.reset_count()
 # create substrate and cells
 substrate = npt.Nanopattern()
 cells = cel.Cells()
+state = cells.state
 calc_near_dist = psc.force.nearest_dist_LJ(EPSILON, cells.integrin_size, MIN_FORCE)
 if calc_near_dist > input_near_dist:
     NEAR_DIST = input_near_dist
 else:
     NEAR_DIST = calc_near_dist
 
-# change value into boolean or default value
-if SAVE_PATTERN_MAP:
-    save.save(substrate, time)
-
-# update cell condition after creation
-for cell in cells.members:
-    cell.update_alphashape(alpha_value=ALPHAVALUE)
-    for integrin_ in cell.integrins:
-        integrin_.update_target_bound(cells, substrate)
-for cell in cells.members:
-    for integrin_ in cell.integrins:
-        integrin_.bonding()
-
-# Calculate potential energy
-for cell in cells.members:
-    if cells.many:
-        surface_integrin = cells.surface_integrins_target(cell, NEAR_DIST)
-    for integrin_ in cell.integrins:
-        if integrin_.issurface and cells.many:
-            nearest_surface_integrin = misc.filter_by_dist(
-                surface_integrin, NEAR_DIST, integrin_.position
-            )
-            integrin_._nearest = nearest_surface_integrin
-        else:
-            nearest_ligands = substrate.nearest(
-                integrin_.x_position, integrin_.y_position, NEAR_DIST
-            )
-            integrin_._nearest = nearest_ligands
-
-        integrin_._radar_radius = NEAR_DIST
-        integrin_.calc_potential(integrin_._nearest,
-                                cell.normal_length,
-                                SPRING_CONSTANT,
-                                EPSILON,
-                                integrin_.size
-                                )
-save.save(cells, time, timestep=TIMESTEP,data_type="CELLEN")
-
 # initiate the figure for plot
 fig_cell = plotter.init_figure()
 fig_contour = plotter.init_figure()
 
-# show result of creation
-plotter.show_all(
-    fig_cell,
-    cells,
-    substrate,
-    time,
-    TIMESTEP,
-    show_substrate=True,
-    save=SAVE_FIG,
-    folder="newsimulate",
-    number=0,
-    forcearrow=FORCE_ARROW,
-    showintegrin=SHOW_INTEGRIN,
-)
+nearest_list = nbr.NearestList(cells, substrate, NEAR_DIST, SKIN)
+# the time-averaged density map of the integrins
+density_map = None
+if SAVE_DENSITY:
+    density_map = dns.DensityMap(substrate.width, substrate.height, DENSITY_RESOLUTION)
+if checkpoint_info is None:
+    # change value into boolean or default value
+    if SAVE_PATTERN_MAP:
+        save.save(substrate, time, map_format=MAP_FORMAT)
+
+    # update cell condition after creation
+    for cell in cells.members:
+        if USE_RING:
+            cell.update_boundary(alpha_value=ALPHAVALUE)
+        else:
+            cell.update_alphashape(alpha_value=ALPHAVALUE)
+    cells.update_target_bound(substrate)
+    for cell in cells.members:
+        for integrin_ in cell.integrins:
+            integrin_.bonding()
 
-# get contour plot if necessary
-if GET_CONTOUR:
-    plotter.contour_plot(
-        fig_contour, 
-        cells, 
-        substrate, 
-        time, 
-        TIMESTEP, 
-
-        number=0, 
-        folder="newsimulate"
+    # Calculate potential energy
+    nearest_list.update()
+    state.potential_energy[:] = forces.potential_energy_system(
+        state.position,
+        state,
+        substrate.positions,
+        nearest_list.pairs(),
+        SPRING_CONSTANT,
+        EPSILON,
+        NEAR_DIST,
     )
+    nearest_list.assign_objects()
+    save.save(cells, time, timestep=TIMESTEP,data_type="CELLEN")
 
-# save the cell map
-save.save(cells, time, timestep=TIMESTEP, data_type="CELMAP")
-save.save(cells, time, timestep=TIMESTEP, data_type="CELNBR")
+    # show result of creation
+    plotter.show_all(
+        fig_cell,
+        cells,
+        substrate,
+        time,
+        TIMESTEP,
+        show_substrate=True,
+        save=SAVE_FIG,
+        folder="newsimulate",
+        number=0,
+        forcearrow=FORCE_ARROW,
+        showintegrin=SHOW_INTEGRIN,
+    )
+
+    # get contour plot if necessary
+    if GET_CONTOUR:
+        plotter.contour_plot(
+            fig_contour, 
+            cells, 
+            substrate, 
+            time, 
+            TIMESTEP, 
+
+            number=0, 
+            folder="newsimulate",
+            resolution=DENSITY_RESOLUTION,
+        )
 
-# get the cell area data if necessary
-if SAVE_CELL_AREA:
-    save.save(cells, time, timestep=TIMESTEP, data_type="CELLAR")
-if SAVE_CENTER_OF_MASS:
-    save.save(cells, time, timestep=TIMESTEP, data_type="CELLCM")
+    # save the cell map
+    save.save(cells, time, timestep=TIMESTEP, data_type="CELMAP", map_format=MAP_FORMAT)
+    save.save(cells, time, timestep=TIMESTEP, data_type="CELNBR", map_format=MAP_FORMAT)
+
+    # get the cell area data if necessary
+    if SAVE_CELL_AREA:
+        save.save(cells, time, timestep=TIMESTEP, data_type="CELLAR")
+    if SAVE_CENTER_OF_MASS:
+        save.save(cells, time, timestep=TIMESTEP, data_type="CELLCM")
+else:
+    # restore the state and drop the records after the checkpoint
+    checkpoint.load(checkpoint_name, cells, substrate, nearest_list, density_map)
+    save.truncate(time, checkpoint_info[0], TIMESTEP)
+    print(f"SYSTEM: resumed from {checkpoint_name} at iteration {checkpoint_info[0]}")
 
 # region <simulation>
-iter_simulation = 0
+integration_buffer = psc.integration.IntegrationBuffer()
+# create the equation of motion (EOM) of the whole system
+# in this case the force acting on the unbound integrins are:
+# 1. nearest another surface integrin / if there is no
+#    surface integrin, it will be ligand
+# 2. neighboring integrin in the form of spring potential
+# 3. drag force from the medium
+eom = lambda x, v: forces.total_force_system(
+    x,
+    v,
+    state,
+    substrate.positions,
+    lennardjones_pairs,
+    SPRING_CONSTANT,
+    DAMPING_COEFFICIENT,
+    VISCOSITY,
+    EPSILON,
+    NEAR_DIST,
+)
+
+# stop after the current iteration and write a checkpoint on SIGTERM,
+# it is registered before the workers are forked, so the workers are
+# not killed by the signal before the checkpoint is written
+stop_signal = []
+signal.signal(signal.SIGTERM, lambda signum, frame: stop_signal.append(signum))
+
+# integrate the cells with a pool of worker processes if requested
+stepper = None
+if WORKERS > 1 and len(cells.members) > 1:
+    stepper = parallel.ParallelStepper(
+        state,
+        substrate.positions,
+        WORKERS,
+        SPRING_CONSTANT,
+        DAMPING_COEFFICIENT,
+        VISCOSITY,
+        TIMESTEP,
+        EPSILON,
+        NEAR_DIST,
+    )
+    print(f"SYSTEM: parallel stepping with {stepper.workers} worker(s)")
+
+# draw the figures with a pool of worker processes if requested
+renderer = None
+if RENDER_WORKERS > 0:
+    renderer = render.RenderPool(
+        RENDER_WORKERS,
+        f"./output/{psc.time_format(time)}-output/figure/newsimulate",
+        TIMESTEP,
+        save_fig=SAVE_FIG,
+        contour=GET_CONTOUR,
+        show_substrate=True,
+        showintegrin=SHOW_INTEGRIN,
+        forcearrow=FORCE_ARROW,
+        resolution=DENSITY_RESOLUTION,
+    )
+    print(f"SYSTEM: rendering with {renderer.workers} worker(s)")
+
+# write the output in the background, it is started after the workers
+# are forked
+if OUTPUT_QUEUE > 0:
+    save.start(OUTPUT_QUEUE)
+
+iter_simulation = 0 if checkpoint_info is None else checkpoint_info[0]
 while iter_simulation <= N_ITERATION:
     percent_progress = round(iter_simulation*100/N_ITERATION,3)
     iter_simulation += 1
     print(f"SYSTEM: iteration number {iter_simulation}")
-    for cell in cells.members:
-        # if cells.many:
-        #     surface_integrin = cells.surface_integrins_target(cell, NEAR_DIST)
-        for integrin_ in cell.integrins:
-            if integrin_.bound is False:
-                # create the equation of motion (EOM)
-                # in this case the force acting on the integrin are:
-                # 1. nearest another surface integrin / if there is no 
-                #    surface integrin, it will be ligand
-                # 2. neighboring integrin in the form of spring potential
-                eom = lambda x, v: forces.total_force(
-                        x,
-                        v,
-                        integrin_._nearest,
-                        integrin_.neighbors,
-                        cell.normal_length,
-                        SPRING_CONSTANT,
-                        DAMPING_COEFFICIENT,
-                        VISCOSITY,
-                        EPSILON,
-                        integrin_.size,
-                        dim=2
-                    )
-                integrin_.force = eom(integrin_.position, integrin_.velocity)
-                integrin_.temp_position, integrin_.temp_velocity = psc.integration.eom_rungekutta(
-                    integrin_.position,
-                    integrin_.velocity,
-                    eom,
-                    integrin_.mass,
-                    TIMESTEP,
-                )
+    # integrate every integrin of the system in one call
+    lennardjones_pairs = nearest_list.pairs(free_only=True)
+    if stepper is not None:
+        stepper.step(lennardjones_pairs)
+    else:
+        state.position[:], state.velocity[:] = psc.integration.eom_rungekutta_batch(
+            state.position,
+            state.velocity,
+            eom,
+            state.mass[:, np.newaxis],
+            TIMESTEP,
+            buffer=integration_buffer,
+            force_out=state.force,
+        )
+    if density_map is not None:
+        density_map.add(state.position)
     # Update all the cell
-    for cell in cells.members:
-        for integrin_ in cell.integrins:
-            integrin_.update()
-            cell.update_position()
+    cells.update_position()
+    cells.update_radius()
+    nearest_list.update()
+    cells.update_target_bound(substrate)
 
-    # Calculate potential energy
-    energy_pot_init = []
-    for cell in cells.members:
-        if cells.many:
-            surface_integrin = cells.surface_integrins_target(cell, NEAR_DIST)
-        for integrin_ in cell.integrins:
-            if integrin_.issurface and cells.many:
-                nearest_surface_integrin = misc.filter_by_dist(
-                    surface_integrin, NEAR_DIST, integrin_.position
-                )
-                integrin_._nearest = nearest_surface_integrin            
-            else:
-                nearest_ligands = substrate.nearest(
-                    integrin_.x_position, integrin_.y_position, NEAR_DIST
-                )
-                integrin_._nearest = nearest_ligands
-            integrin_.calc_potential(integrin_._nearest,
-                                    cell.normal_length,
-                                    SPRING_CONSTANT,
-                                    EPSILON,
-                                    integrin_.size
-                                    )
-        energy_pot_init.append(cell.potential_energy)          
-    # save energy
-    save.save(cells, time, iter_simulation, timestep=TIMESTEP, data_type="CELLEN")
-    
-    for cell in cells.members:
-        for integrin_ in cell.integrins:
-            integrin_.update_target_bound(cells, substrate)
-    bonding_objects = []
-    for cell in cells.members:
-        for integrin_ in cell.integrins:
-            bonding_value = integrin_.bonding()
-            if bonding_value is True:
-                bonding_objects.append(integrin_.target)
+    # Calculate potential energy if the energy is saved
+    if iter_simulation % ENERGY_GAP == 0 or iter_simulation > N_ITERATION:
+        state.potential_energy[:] = forces.potential_energy_system(
+            state.position,
+            state,
+            substrate.positions,
+            nearest_list.pairs(),
+            SPRING_CONSTANT,
+            EPSILON,
+            NEAR_DIST,
+        )
+        # save energy
+        save.save(cells, time, iter_simulation, timestep=TIMESTEP, data_type="CELLEN")
 
-    if bonding_objects:
+    # the energy before the bonding of the integrins which watch the
+    # objects that may become bound
+    candidates = [integrin_ for integrin_ in state.integrins if integrin_.bondable]
+    if candidates:
+        watched_rows = nearest_list.watchers(
+            [obj.target.index for obj in candidates if isinstance(obj.target, lig.Ligand)],
+            [obj.row for obj in candidates]
+            + [obj.target.row for obj in candidates if isinstance(obj.target, ign.Integrin)],
+        )
+        energy_pot_init = forces.potential_energy_system(
+            state.position,
+            state,
+            substrate.positions,
+            nearest_list.pairs(),
+            SPRING_CONSTANT,
+            EPSILON,
+            NEAR_DIST,
+            rows=watched_rows,
+        )
+
+    bonding_events = []
+    for integrin_ in candidates:
+        if integrin_.bonding() is True:
+            bonding_events.append((integrin_.row, integrin_.target))
+
+    if bonding_events:
         print('SYSTEM: bonding occur')
-        # Update nearest
-        energy_pot_final = []
-        for cell in cells.members:
-            for integrin_ in cell.integrins:
-                old_member_num = len(integrin_._nearest)
-                integrin_._nearest = [obj for obj in integrin_._nearest if obj not in bonding_objects]
-                new_member_num = len(integrin_._nearest)
-                if new_member_num < old_member_num:
-                    integrin_.calc_potential(integrin_._nearest,
-                                        cell.normal_length,
-                                        SPRING_CONSTANT,
-                                        EPSILON,
-                                        integrin_.size
-                                        )   
-            energy_pot_final.append(cell.potential_energy)  
-        energy_pot_init = np.array(energy_pot_init)
-        energy_pot_final = np.array(energy_pot_final)
-        energy_pot_loss = energy_pot_final - energy_pot_init
+        # Update nearest and the potential energy of the integrins
+        # which lose their targets
+        changed_rows = nearest_list.prune()
+        energy_pot = forces.potential_energy_system(
+            state.position,
+            state,
+            substrate.positions,
+            nearest_list.pairs(),
+            SPRING_CONSTANT,
+            EPSILON,
+            NEAR_DIST,
+            rows=changed_rows,
+        )
+        state.potential_energy[changed_rows] = energy_pot[changed_rows]
         # add the loss
-        for i in range(len(cells.members)):
-            cells.members[i]._energy_loss += energy_pot_loss[i]     
+        energy_pot_loss = np.zeros(state.number, dtype=float)
+        energy_pot_loss[changed_rows] = energy_pot[changed_rows] - energy_pot_init[changed_rows]
+        for cell in cells.members:
+            cell._energy_loss += np.sum(energy_pot_loss[cell.rows])
 
     # save the data
     if iter_simulation % SAVE_GAP == 0 or iter_simulation > N_ITERATION:
+        nearest_list.assign_objects()
         # to get the cell shape
         for cell in cells.members:
-            cell.update_alphashape(alpha_value=ALPHAVALUE)
-        # generate the image
-        plotter.show_all(
-            fig_cell,
-            cells,
-            substrate,
-            time,
-            TIMESTEP,
-            show_substrate=True,
-            save=SAVE_FIG,
-            folder="newsimulate",
-            number=iter_simulation,
-            showintegrin=SHOW_INTEGRIN,
-            forcearrow=FORCE_ARROW,
-        )
-        # generate contour
-        if GET_CONTOUR:
-            plotter.contour_plot(
-                fig_contour,
+            if USE_RING:
+                cell.update_boundary(alpha_value=ALPHAVALUE)
+            else:
+                cell.update_alphashape(alpha_value=ALPHAVALUE)
+        # generate the image and the contour
+        if renderer is not None:
+            if SAVE_FIG or GET_CONTOUR:
+                renderer.submit(plotter.frame_data(cells, substrate, iter_simulation))
+        else:
+            plotter.show_all(
+                fig_cell,
                 cells,
                 substrate,
                 time,
                 TIMESTEP,
-                number=iter_simulation,
+                show_substrate=True,
+                save=SAVE_FIG,
                 folder="newsimulate",
+                number=iter_simulation,
+                showintegrin=SHOW_INTEGRIN,
+                forcearrow=FORCE_ARROW,
             )
+            if GET_CONTOUR:
+                plotter.contour_plot(
+                    fig_contour,
+                    cells,
+                    substrate,
+                    time,
+                    TIMESTEP,
+                    number=iter_simulation,
+                    folder="newsimulate",
+                    resolution=DENSITY_RESOLUTION,
+                )
         # save area
         if SAVE_CELL_AREA is True:
             save.save(cells, time, iter_simulation, timestep=TIMESTEP, data_type="CELLAR")
         # save centter of mass
         if SAVE_CENTER_OF_MASS is True:
             save.save(cells, time, iter_simulation, timestep=TIMESTEP, data_type="CELLCM")
+        # save the time-averaged density map
+        if density_map is not None:
+            save.save(density_map, time, iter_simulation)
         # save cell mapping
         if SAVE_CELL_MAP is True:
-            save.save(cells, time, iter_simulation, timestep=TIMESTEP, data_type="CELMAP",)
+            save.save(
+                cells,
+                time,
+                iter_simulation,
+                timestep=TIMESTEP,
+                data_type="CELMAP",
+                map_format=MAP_FORMAT,
+            )
         # save nanopattern
         if SAVE_PATTERN_MAP is True:
-            save.save(substrate, time, iter_simulation, timestep=TIMESTEP, data_type="PATMAP")
+            save.save(
+                substrate,
+                time,
+                iter_simulation,
+                timestep=TIMESTEP,
+                data_type="PATMAP",
+                map_format=MAP_FORMAT,
+            )
 
     # endregion
+
+    # write the checkpoint
+    if stop_signal or (CHECKPOINT_GAP > 0 and iter_simulation % CHECKPOINT_GAP == 0):
+        save.flush()
+        checkpoint.save(
+            checkpoint.checkpoint_file(time),
+            iter_simulation,
+            time,
+            cells,
+            substrate,
+            nearest_list,
+            density_map=density_map,
+        )
+        print(f"SYSTEM: checkpoint is saved at iteration {iter_simulation}")
+    if stop_signal:
+        print(f"SYSTEM: simulation is stopped, resume with --resume {psc.time_format(time)}")
+        break
     
     if SHOW_PROGRESS:
         sys.stdout = ori
         print(f"\rprogress: [{percent_progress}%]", end="")
         sys.stdout = log
 
+if renderer is not None:
+    renderer.close()
+
+if stop_signal:
+    if stepper is not None:
+        stepper.close()
+    save.close()
+    log.close()
+    sys.stdout = ori
+    sys.exit(128 + stop_signal[0])
+
 if SAVE_GIF:
-    plotter.build_GIF(time)
+    plotter.build_GIF(time, stride=GIF_STRIDE, size=GIF_SIZE)
     print("SYSTEM: GIF created!")
 
+if stepper is not None:
+    stepper.close()
+save.close()
 save.save("Input", time)
+ligand_rebuild, integrin_rebuild = nearest_list.rebuild_count
+print(f"SYSTEM: nearest list skin: {SKIN}")
+print(f"SYSTEM: ligand list rebuilt {ligand_rebuild} times")
+print(f"SYSTEM: integrin list rebuilt {integrin_rebuild} times")
 print("SYSTEM: simulation done!")
 elapse_time = datetime.now() - time
 print(f"SYSTEM: execution time: {elapse_time}")
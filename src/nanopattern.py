@@ -9,9 +9,9 @@ import numpy as np
 
 # local import
 import physica as psc
-import misc
 import inputfile as ifile
 import ligand as lig
+import trajectory as trj
 
 
 class Nanopattern:
@@ -50,6 +50,8 @@ class Nanopattern:
             self._ligand_mass = patcon.get("ligandmass")
             self._ligands: list[lig.Ligand] = []
             self._gridnum = gridnum
+            self._x_grid_points = np.linspace(0, self.width, (self.x_gridnum + 1))
+            self._y_grid_points = np.linspace(0, self.height, (self.y_gridnum + 1))
 
             # build nanopattern
             self.build()
@@ -78,12 +80,14 @@ class Nanopattern:
             self._ligand_mass = patcon.get("ligandmass")
             self._ligands: list[lig.Ligand] = []
             self._gridnum = gridnum
+            self._x_grid_points = np.linspace(0, self.width, (self.x_gridnum + 1))
+            self._y_grid_points = np.linspace(0, self.height, (self.y_gridnum + 1))
             self._grid: list[list[list[lig.Ligand]]] = [
                 [[] for j in range(self.x_gridnum)] for i in range(self.y_gridnum)
             ]
             
             # open patmap file
-            file_dir = f"./output/{folder_code}-output/file/PATMAP/PATMAP{int(timestamp):06}.txt"
+            file_dir = trj.text_file(folder_code, "PATMAP", timestamp)
             print(f"open: {file_dir}")
             with open(file_dir, "r", encoding="utf-8") as data_file:
                 lst_strng = data_file.readlines()
@@ -94,9 +98,11 @@ class Nanopattern:
                 obj._id = int(obj_data[0])
                 obj._bound = bool(int(obj_data[1]))
                 self._grid[int(obj_data[3])][int(obj_data[2])].append(obj)
-                obj._target_cell_id = int(obj_data[6])
-                obj._target_integrin_id = int(obj_data[7])
+                if obj._bound is True:
+                    obj._target_cell_id = int(obj_data[6])
+                    obj._target_integrin_id = int(obj_data[7])
                 self._ligands.append(obj)
+            self._index_ligands()
             print("SYSTEM: nanopattern has been created")
     
     def sync(self, cells):
@@ -107,78 +113,122 @@ class Nanopattern:
                     ligand_._target_cell_id = ligand_.target_cell_id
                     ligand_._target_integrin_id = ligand_.target_integrin_id
                 else:
-                    ligand_.target = cells.get_integrin_by_id(ligand_.target_cell_id, ligand_.target_integrin_id)
+                    ligand_.target = cells.get_integrin_by_id(
+                        ligand_._target_cell_id, ligand_._target_integrin_id
+                    )
 
     def build(self):
         """building the nanopattern from empty list of ligands
 
         The procedure of building are as follows:
-        1. Since we can provide variation on the x and y distances
-        between ligands. We need to determine which distance to use.
-        2. Create the ligand and save it into ligands (list of ligands)
-        3. Update the distance and iteration
-        4. Create grid. We want to organize the ligands into grid-base
+        1. Create the coordinates of the ligands along x and y axis.
+        Since we can provide variation on the x and y distances between
+        ligands, the distances are taken periodically.
+        2. Create the ligand on every (x, y) pair of the coordinates and
+        save it into ligands (list of ligands)
+        3. Create grid. We want to organize the ligands into grid-base
         region. Hence, it will be easier to find nearest neighbors as
         the ligand doesn't move.
-        5. Arrange the ligand into appropriate grid base on its
-        position
+        4. Arrange the ligand into appropriate grid base on its
+        position with a binary search on the grid points
 
         """
         # create nanopattern
-        x_position = 0
-        y_position = 0
-        x_iter = 0
-        y_iter = 0
-        while y_position <= self.height:
-            y_dist_index = y_iter % len(self.y_dist)
-            while x_position <= self.width:
-                x_dist_index = x_iter % len(self.x_dist)
-                obj = lig.Ligand(x_position, y_position, self._ligand_size, self._ligand_mass)
-                self._ligands.append(obj)
-                x_position += self.x_dist[x_dist_index]
-                x_iter += 1
-            y_position += self.y_dist[y_dist_index]
-            y_iter += 1
-            x_iter = 0
-            x_position = 0
+        x_coord = self._lattice_coord(self.x_dist, self.width)
+        y_coord = self._lattice_coord(self.y_dist, self.height)
+        x_position = np.tile(x_coord, len(y_coord))
+        y_position = np.repeat(y_coord, len(x_coord))
+        self._ligands = [
+            lig.Ligand(x, y, self._ligand_size, self._ligand_mass)
+            for x, y in zip(x_position.tolist(), y_position.tolist())
+        ]
 
         # distribute nanopattern into grids
         self._grid: list[list[list[lig.Ligand]]] = [
             [[] for j in range(self.x_gridnum)] for i in range(self.y_gridnum)
         ]
-        unlocated_ligand = self._ligands
-        print(f"SYSTEM: There are {len(unlocated_ligand)} ligand(s) ungrouped.")
-        for i in range(self.y_gridnum):
-            for j in range(self.x_gridnum):
-                located_ligand: list[lig.Ligand] = []
-                for ligand in unlocated_ligand:
-                    if (
-                        self.x_grid_points[j]
-                        <= ligand.x_position
-                        < self.x_grid_points[j + 1]
-                    ) and (
-                        self.y_grid_points[i]
-                        <= ligand.y_position
-                        < self.y_grid_points[i + 1]
-                    ):
-                        located_ligand.append(ligand)
-                self._grid[i][j] = located_ligand
-                unlocated_ligand = [
-                    ligand
-                    for ligand in unlocated_ligand
-                    if ligand not in located_ligand
-                ]
-                print(f"SYSTEM: There are {len(unlocated_ligand)} ligand(s) ungrouped.")
+        column = np.searchsorted(self.x_grid_points, x_position, side="right") - 1
+        row = np.searchsorted(self.y_grid_points, y_position, side="right") - 1
+        inside = (
+            (column >= 0) & (column < self.x_gridnum) & (row >= 0) & (row < self.y_gridnum)
+        )
+        for index in np.flatnonzero(inside):
+            self._grid[row[index]][column[index]].append(self._ligands[index])
+        print(
+            f"SYSTEM: There are {len(self._ligands) - np.count_nonzero(inside)} "
+            "ligand(s) ungrouped."
+        )
+        self._index_ligands()
         print("SYSTEM: nanopattern has been created")
 
+    @staticmethod
+    def _lattice_coord(distance, length):
+        """return the coordinates of the ligands along one axis.
+
+        The distance between two ligands is taken periodically from the
+        `distance` list, starting from 0 until `length`.
+
+        Parameter
+        ---------
+        distance: list[float]
+            the periodic distance between two ligands
+        length: float
+            the length of the substrate in the axis
+        """
+        distance = np.asarray(distance, dtype=float)
+        number = int(np.ceil(length / np.min(distance))) + 2
+        step = np.resize(distance, number - 1)
+        coord = np.concatenate(([0.0], np.cumsum(step)))
+        return coord[coord <= length]
+
     def get_ligand_by_id(self, id_: int) -> lig.Ligand:
         """Procedure to get a ligand from ligand members of
         nanopattern by id.
         """
-        for ligand in self._ligands:
-            if ligand.id_ == id_:
-                return ligand
-        return None
+        return self._ligand_index.get(id_)
+
+    def _index_ligands(self):
+        """procedure to store the ligands in contiguous arrays and
+        build the id and spatial index of the ligands.
+
+        The ligands never move, so the spatial index is built once and
+        only the bound status is updated during the simulation.
+        """
+        number = len(self._ligands)
+        self._positions = np.zeros((number, 2), dtype=float)
+        self._bound_mask = np.zeros(number, dtype=bool)
+        for index, ligand_ in enumerate(self._ligands):
+            ligand_.bind(self, index)
+        self._ligand_index = {ligand_.id_: ligand_ for ligand_ in self._ligands}
+        self._spatial_hash = psc.SpatialHash(
+            self._positions, max(self.x_gridsize, self.y_gridsize)
+        )
+
+    def nearest_many(self, positions, radius, filter_bound: bool = True):
+        """Function to find the nearest ligands of many positions at
+        once
+
+        Parameters
+        ----------
+        positions: array_like
+            the (N, 2) positions of the objects reference
+        radius: float
+            the maximum distance of 'nearest' target
+        filter_bound: bool, default=True
+            only return the unbound ligands
+
+        Return
+        ------
+        pointer:
+            the nearest ligands of position i are
+            `index[pointer[i]:pointer[i+1]]`
+        index:
+            the index of the nearest ligands in `ligands`
+        """
+        mask = None
+        if filter_bound is True:
+            mask = ~self._bound_mask
+        return self._spatial_hash.query(positions, radius, mask=mask)
 
     def nearest(self, x_position: float, y_position: float, radius, filter_bound: bool=True):
         """Function to return list of nearest ligand from a position
@@ -191,67 +241,25 @@ class Nanopattern:
             the y position of the object reference
         radius: float
             the maximum distance of 'nearest' target
+        filter_bound: bool, default=True
+            only return the unbound ligands
         """
-
-        # Find the smallest kernel size needed
-        kernel_size_x = int(2 * radius / self.x_gridsize) + 2
-        kernel_size_y = int(2 * radius / self.y_gridsize) + 2
-        # make sure the kernel size is odd
-        if kernel_size_x % 2 == 0:
-            kernel_size_x += 1
-        if kernel_size_y % 2 == 0:
-            kernel_size_y += 1
-        # create the moore kernel
-        moore_kernel = [
-            [True for j in range(kernel_size_x)] for i in range(kernel_size_y)
-        ]
-        # find the index
-        x_index = psc.get_index(x_position, self.x_grid_points)
-        y_index = psc.get_index(y_position, self.y_grid_points)
-        # put the index at the middle of the moore kernel
-        mid_index_x = (kernel_size_x - 1) // 2
-        mid_index_y = (kernel_size_y - 1) // 2
-        # update kernel base on the position
-        # check for the columns
-        for k in range(kernel_size_x):
-            x_grid_index = x_index + (k - mid_index_x)
-            if x_grid_index < 0 or x_grid_index >= (self.x_gridnum - 1):
-                for l in range(kernel_size_y):
-                    moore_kernel[l][k] = False
-        # check for the rows
-        for k in range(kernel_size_y):
-            y_grid_index = y_index + (k - mid_index_y)
-            if y_grid_index < 0 or y_grid_index >= (self.y_gridnum - 1):
-                for l in range(kernel_size_x):
-                    moore_kernel[k][l] = False
-        # get the nearest unbound ligand
-        container: list[lig.Ligand] = []
-        for i in range(kernel_size_y):
-            for j in range(kernel_size_x):
-                if moore_kernel[i][j] is True:
-                    x_grid_index = x_index + (j - mid_index_x)
-                    y_grid_index = y_index + (i - mid_index_y)
-                    for ligand_ in self._grid[y_grid_index][x_grid_index]:
-                        if filter_bound is True:
-                            if ligand_.bound is False:
-                                container.append(ligand_)
-                        else:
-                            container.append(ligand_)
-        # filter again to make circle
-        nearest_ligand = misc.filter_by_dist(container, radius, (x_position, y_position))
-        return nearest_ligand
+        _, index = self.nearest_many(
+            ((x_position, y_position),), radius, filter_bound
+        )
+        return [self._ligands[i] for i in index]
 
     # region <Nanopattern property>
 
     @property
     def x_grid_points(self):
         """the boundary x point of the nanopattern grids"""
-        return np.linspace(0, self.width, (self.x_gridnum + 1))
+        return self._x_grid_points
 
     @property
     def y_grid_points(self):
         """the boundary y point of the nanopattern grids"""
-        return np.linspace(0, self.height, (self.y_gridnum + 1))
+        return self._y_grid_points
 
     @property
     def x_gridnum(self):
@@ -347,6 +355,16 @@ class Nanopattern:
         """return the number of ligands"""
         return lig.Ligand.count
 
+    @property
+    def positions(self):
+        """return the (N, 2) position array of the ligands"""
+        return self._positions
+
+    @property
+    def bound_mask(self):
+        """return the bound status array of the ligands"""
+        return self._bound_mask
+
     @property
     def ligands(self):
         """return the list of ligands in MultiObjBase"""
@@ -0,0 +1,244 @@
+"""neighbor module
+
+This module contains the nearest list class which keeps the neighbor
+lists between the integrins and their Lennard-Jones targets.
+
+"""
+
+# third party import
+import numpy as np
+
+# local import
+import cell as cel
+import nanopattern as npt
+import physica as psc
+
+
+class NearestList:
+    """Verlet neighbor lists of the integrins in the system.
+
+    There are two kinds of target:
+    1. the unbound ligands, for the non surface integrins or when
+    there is only one cell.
+    2. the unbound surface integrins of other cells, for the surface
+    integrins when there are many cells.
+
+    Both lists are built with the radius `radius + skin` and only
+    rebuilt when an integrin has moved more than half of the skin.
+    The targets which become bound are pruned from the lists.
+
+    The reverse index of every list, from the target to the integrins
+    which watch it, is built when it is needed and kept until the list
+    changes.
+    """
+
+    def __init__(
+        self,
+        cells: cel.Cells,
+        substrate: npt.Nanopattern,
+        radius: float,
+        skin: float = 0.0,
+    ) -> None:
+        """init function for the nearest list.
+
+        parameters
+        ----------
+        cells: :obj: Cells
+            the compilation of cells
+        substrate: :obj: Nanopattern
+            the nanopatterned substrate, consists of ligands
+        radius: float
+            the maximum distance of the 'nearest' target
+        skin: float, default=0.0
+            the skin distance of the Verlet lists
+        """
+        self._cells = cells
+        self._state = cells.state
+        self._substrate = substrate
+        self._update_surface()
+        self._ligand_list = psc.VerletList(self._build_ligand, radius, skin)
+        self._integrin_list = psc.VerletList(self._build_integrin, radius, skin)
+        self._reverse = {}
+
+    def _update_surface(self):
+        """store the integrins which interact with the surface integrins
+        of other cells
+        """
+        degree = np.concatenate([cell.degree for cell in self._cells.members])
+        self._surface = (degree < 6) & self._cells.many
+        self._topology_version = self._state.topology_version
+
+    def _build_ligand(self, list_radius):
+        """build the integrin-ligand pairs"""
+        rows = np.flatnonzero(~self._surface)
+        pointer, index = self._substrate.nearest_many(
+            self._state.position[rows], list_radius
+        )
+        return np.repeat(rows, np.diff(pointer)), index
+
+    def _build_integrin(self, list_radius):
+        """build the pairs between the surface integrins of different
+        cells
+        """
+        self._cells.update_radius()
+        return self._cells.surface_pairs(list_radius)
+
+    def update(self, force: bool = False):
+        """Rebuild the lists if it is needed.
+
+        Parameters
+        ----------
+        force: bool, default=False
+            rebuild the lists regardless of the displacement, they are
+            also rebuilt when the topology of a cell is changed
+        """
+        if self._topology_version != self._state.topology_version:
+            self._update_surface()
+            force = True
+        if self._ligand_list.update(self._state.position, force):
+            self._reverse.pop("ligand", None)
+        if self._integrin_list.update(self._state.position, force):
+            self._reverse.pop("integrin", None)
+
+    def prune(self):
+        """Remove the bound targets from the lists.
+
+        Return
+        ------
+        the rows which lose at least one target
+        """
+        removed_ligand = self._ligand_list.prune(~self._substrate.bound_mask)
+        removed_integrin = self._integrin_list.prune(~self._state.bound)
+        self._reverse = {}
+        return np.union1d(removed_ligand, removed_integrin)
+
+    def _reverse_index(self, name):
+        """return the reverse index of a list, the integrins which
+        watch the target i are `row[pointer[i]:pointer[i+1]]`
+        """
+        if name not in self._reverse:
+            if name == "ligand":
+                verlet_list = self._ligand_list
+                number = len(self._substrate.bound_mask)
+            else:
+                verlet_list = self._integrin_list
+                number = self._state.number
+            pointer = np.zeros(number + 1, dtype=int)
+            np.cumsum(np.bincount(verlet_list.index, minlength=number), out=pointer[1:])
+            order = np.argsort(verlet_list.index, kind="stable")
+            self._reverse[name] = (pointer, verlet_list.row[order])
+        return self._reverse[name]
+
+    def watchers(self, ligand_index, integrin_row):
+        """return the rows of the integrins whose lists contain at least
+        one of the targets, e.g. the integrins affected by a bonding.
+
+        Parameters
+        ----------
+        ligand_index: array_like
+            the index of the target ligands
+        integrin_row: array_like
+            the row of the target integrins
+        """
+        rows = [np.zeros(0, dtype=int)]
+        for name, targets in (("ligand", ligand_index), ("integrin", integrin_row)):
+            pointer, row = self._reverse_index(name)
+            rows += [row[pointer[target]:pointer[target + 1]] for target in targets]
+        return np.unique(np.concatenate(rows))
+
+    def pairs(self, free_only: bool = False):
+        """return the Lennard-Jones pairs of the lists.
+
+        Parameters
+        ----------
+        free_only: bool, default=False
+            only return the pairs of the unbound integrins
+
+        Return
+        ------
+        ligand_index:
+            the index of the ligand of every integrin-ligand pair
+        ligand_row:
+            the row of the integrin of every integrin-ligand pair
+        integrin_index:
+            the row of the target integrin of every integrin-integrin
+            pair
+        integrin_row:
+            the row of the integrin of every integrin-integrin pair
+        """
+        ligand_index = self._ligand_list.index
+        ligand_row = self._ligand_list.row
+        integrin_index = self._integrin_list.index
+        integrin_row = self._integrin_list.row
+        if free_only:
+            keep = ~self._state.bound[ligand_row]
+            ligand_index = ligand_index[keep]
+            ligand_row = ligand_row[keep]
+            keep = ~self._state.bound[integrin_row]
+            integrin_index = integrin_index[keep]
+            integrin_row = integrin_row[keep]
+        return ligand_index, ligand_row, integrin_index, integrin_row
+
+    def assign_objects(self):
+        """Procedure to store the nearest objects inside the radius into
+        the `_nearest` attribute of every integrin, e.g. for plotting.
+        """
+        position = self._state.position
+        ligand_index, ligand_row, integrin_index, integrin_row = self.pairs()
+        for integrin_ in self._state.integrins:
+            integrin_._nearest = []
+            integrin_._radar_radius = self.radius
+        dist = np.linalg.norm(
+            self._substrate.positions[ligand_index] - position[ligand_row], axis=1
+        )
+        for i in np.flatnonzero(dist < self.radius):
+            self._state.integrins[ligand_row[i]]._nearest.append(
+                self._substrate.ligands[ligand_index[i]]
+            )
+        dist = np.linalg.norm(position[integrin_index] - position[integrin_row], axis=1)
+        for i in np.flatnonzero(dist < self.radius):
+            self._state.integrins[integrin_row[i]]._nearest.append(
+                self._state.integrins[integrin_index[i]]
+            )
+
+    def get_state(self):
+        """return the arrays of both lists with prefixed names"""
+        arrays = {}
+        for name, verlet_list in (
+            ("ligand", self._ligand_list),
+            ("integrin", self._integrin_list),
+        ):
+            for key, value in verlet_list.get_state().items():
+                arrays[f"{name}_{key}"] = value
+        return arrays
+
+    def set_state(self, arrays):
+        """Restore both lists from the arrays of `get_state`"""
+        self._reverse = {}
+        for name, verlet_list in (
+            ("ligand", self._ligand_list),
+            ("integrin", self._integrin_list),
+        ):
+            verlet_list.set_state(
+                arrays[f"{name}_row"],
+                arrays[f"{name}_index"],
+                arrays[f"{name}_reference"],
+                arrays[f"{name}_rebuild_count"],
+            )
+
+    @property
+    def radius(self):
+        """return the maximum distance of the 'nearest' target"""
+        return self._ligand_list.radius
+
+    @property
+    def skin(self):
+        """return the skin distance of the lists"""
+        return self._ligand_list.skin
+
+    @property
+    def rebuild_count(self):
+        """return the number of rebuilds of the ligand and the
+        integrin lists
+        """
+        return self._ligand_list.rebuild_count, self._integrin_list.rebuild_count
@@ -0,0 +1,327 @@
+"""parallel module
+
+This module contains the parallel stepper which integrates the
+integrin state with a pool of worker processes. Every worker owns the
+rows of a group of cells and the state is exchanged through shared
+memory.
+
+Only the force evaluations of the Runge-Kutta integration run in the
+workers. On every step the main process copies the position, velocity
+and force of the whole state in and out of the shared memory, and it
+still runs the rest of the step serially: the Verlet list update, the
+target search, the bonding, the energy and the output. The speedup of
+`workers > 1` is therefore limited to systems whose force evaluation
+dominates the step, e.g. many large cells; for a few small cells the
+exchange costs more than it saves.
+
+"""
+
+# built-in import
+import atexit
+import multiprocessing as mp
+from multiprocessing import shared_memory
+
+# third party import
+import numpy as np
+
+# local import
+import physica as psc
+
+# the shared (N, 2) arrays of the stepper
+_SHARED_NAMES = ("position", "velocity", "force", "stage_position")
+
+
+def partition_rows(cell_id, workers: int):
+    """Function to split the rows of the state into contiguous groups
+    of whole cells with similar number of integrins.
+
+    Parameters
+    ----------
+    cell_id: np.ndarray
+        the cell id of every row, the rows of one cell are contiguous
+    workers: int
+        the maximum number of groups
+
+    Return
+    ------
+    list of (start, stop) rows of every group
+    """
+    number = len(cell_id)
+    boundary = np.concatenate(([0], np.flatnonzero(np.diff(cell_id)) + 1, [number]))
+    target = np.linspace(0, number, max(min(workers, len(boundary) - 1), 1) + 1)
+    # the nearest cell boundary of every target split
+    nearest = np.abs(boundary[:, np.newaxis] - target[np.newaxis]).argmin(axis=0)
+    split = np.unique(boundary[nearest])
+    return list(zip(split[:-1].tolist(), split[1:].tolist()))
+
+
+def _worker(connection, barrier, shared, start, stop, settings):
+    """the loop of one worker process.
+
+    For every step the worker receives the Lennard-Jones pairs of its
+    rows and integrates its rows with the 4th order Runge-Kutta. In
+    every stage, the stage position of the own rows is published in
+    the shared memory and only the halo rows, i.e. the surface
+    integrins of other workers' cells which are the Lennard-Jones
+    targets, are read back after the barrier.
+    """
+    own = slice(start, stop)
+    count = stop - start
+    position = shared["position"]
+    velocity = shared["velocity"]
+    force_out = shared["force"][own]
+    stage_position = shared["stage_position"]
+    bound = shared["bound"]
+    edges = settings["edges"]
+    rest_length = settings["rest_length"]
+    mass = settings["mass"][:, np.newaxis]
+    sigma = settings["size"]
+    ligand_position = settings["ligand_position"]
+    epsilon = settings["epsilon"]
+    cutoff = settings["cutoff"]
+    buffer = psc.integration.IntegrationBuffer()
+
+    while True:
+        message = connection.recv()
+        if message is None:
+            break
+        try:
+            ligand_index, ligand_row, integrin_index, integrin_row = message
+            ligand_row = ligand_row - start
+            integrin_row = integrin_row - start
+            # the targets outside the own rows are the halo
+            outside = (integrin_index < start) | (integrin_index >= stop)
+            halo = np.unique(integrin_index[outside])
+            source = np.where(
+                outside,
+                count + np.searchsorted(halo, integrin_index),
+                integrin_index - start,
+            )
+            combined = np.empty((count + len(halo), 2), dtype=float)
+            bound_own = bound[own].copy()
+
+            def eom(x, v):
+                stage_position[own] = x
+                barrier.wait()
+                combined[:count] = x
+                combined[count:] = stage_position[halo]
+                barrier.wait()
+                total_force = psc.force.lj_6_12_pairs(
+                    ligand_position,
+                    x,
+                    ligand_index,
+                    ligand_row,
+                    epsilon,
+                    sigma[ligand_row],
+                    size=count,
+                    cutoff=cutoff,
+                )
+                total_force += psc.force.lj_6_12_pairs(
+                    combined,
+                    x,
+                    source,
+                    integrin_row,
+                    epsilon,
+                    sigma[integrin_row],
+                    size=count,
+                    cutoff=cutoff,
+                )
+                total_force += psc.force.spring_pairs(
+                    x,
+                    v,
+                    edges[:, 0],
+                    edges[:, 1],
+                    settings["spring_constant"],
+                    rest_length,
+                    settings["damping_coefficient"],
+                    size=count,
+                )
+                total_force += psc.force.drag(
+                    v, sigma[:, np.newaxis], settings["viscocity"]
+                )
+                total_force[bound_own] = 0.0
+                return total_force
+
+            final_position, final_velocity = psc.integration.eom_rungekutta_batch(
+                position[own],
+                velocity[own],
+                eom,
+                mass,
+                settings["timestep"],
+                buffer=buffer,
+                force_out=force_out,
+            )
+            position[own] = final_position
+            velocity[own] = final_velocity
+            connection.send(None)
+        except Exception as error:  # pylint: disable=broad-except
+            barrier.abort()
+            connection.send(error)
+
+
+class ParallelStepper:
+    """Pool of worker processes which integrates the integrin state.
+
+    The rows of the state are split into groups of whole cells and
+    every group is owned by one worker. The position, velocity and
+    force are held in shared memory and the workers are synchronized
+    with a barrier in every Runge-Kutta stage. The result is the same
+    as `eom_rungekutta_batch` with `forces.total_force_system`.
+
+    The workers are forked, so the stepper is only available on the
+    platforms with the 'fork' start method.
+    """
+
+    def __init__(
+        self,
+        state,
+        ligand_position,
+        workers: int,
+        spring_constant,
+        damping_coefficient,
+        viscocity,
+        timestep,
+        epsilon=1,
+        cutoff=None,
+    ) -> None:
+        """init function for the parallel stepper.
+
+        parameters
+        ----------
+        state: :obj: IntegrinState
+            the state which stores all the integrins
+        ligand_position: np.ndarray
+            the (M, 2) position of all ligands
+        workers: int
+            the maximum number of worker processes
+        spring_constant: float
+            The spring constant value.
+        damping_coefficient: float
+            The damping coefficient value.
+        viscocity: float
+            The viscocity of the medium.
+        timestep: float
+            time step of integration
+        epsilon: float
+            The depth of LJ potential.
+        cutoff: float, default=None
+            The maximum distance of the Lennard-Jones pairs.
+        """
+        self._state = state
+        self._topology_version = state.topology_version
+        self._bounds = partition_rows(state.cell_id, workers)
+        self._memory = []
+        self._shared = {}
+        shape = (state.number, 2)
+        for name in _SHARED_NAMES:
+            self._shared[name] = self._allocate(shape, float)
+        self._shared["bound"] = self._allocate((state.number,), bool)
+
+        context = mp.get_context("fork")
+        barrier = context.Barrier(len(self._bounds))
+        self._connections = []
+        self._processes = []
+        for start, stop in self._bounds:
+            inside = (state.edges[:, 0] >= start) & (state.edges[:, 0] < stop)
+            settings = {
+                "edges": state.edges[inside] - start,
+                "rest_length": state.rest_length[inside],
+                "mass": state.mass[start:stop].copy(),
+                "size": state.size[start:stop].copy(),
+                "ligand_position": np.array(ligand_position, dtype=float),
+                "spring_constant": spring_constant,
+                "damping_coefficient": damping_coefficient,
+                "viscocity": viscocity,
+                "timestep": timestep,
+                "epsilon": epsilon,
+                "cutoff": cutoff,
+            }
+            parent_end, child_end = context.Pipe()
+            process = context.Process(
+                target=_worker,
+                args=(child_end, barrier, self._shared, start, stop, settings),
+                daemon=True,
+            )
+            process.start()
+            child_end.close()
+            self._connections.append(parent_end)
+            self._processes.append(process)
+        atexit.register(self.close)
+
+    def _allocate(self, shape, dtype):
+        """return an array in a new shared memory block"""
+        size = max(int(np.prod(shape)) * np.dtype(dtype).itemsize, 1)
+        memory = shared_memory.SharedMemory(create=True, size=size)
+        self._memory.append(memory)
+        return np.ndarray(shape, dtype=dtype, buffer=memory.buf)
+
+    def step(self, lennardjones_pairs):
+        """Procedure to integrate the state for one time step.
+
+        The position, velocity and force of the state are updated in
+        place.
+
+        Parameter
+        ---------
+        lennardjones_pairs: tuple
+            The Lennard-Jones pairs of the unbound integrins from
+            `NearestList.pairs`.
+        """
+        state = self._state
+        if state.topology_version != self._topology_version:
+            raise RuntimeError(
+                "the spring network is changed, the parallel stepper must be created again"
+            )
+        self._shared["position"][:] = state.position
+        self._shared["velocity"][:] = state.velocity
+        self._shared["bound"][:] = state.bound
+        ligand_index, ligand_row, integrin_index, integrin_row = lennardjones_pairs
+        for connection, (start, stop) in zip(self._connections, self._bounds):
+            ligand_keep = (ligand_row >= start) & (ligand_row < stop)
+            integrin_keep = (integrin_row >= start) & (integrin_row < stop)
+            connection.send(
+                (
+                    ligand_index[ligand_keep],
+                    ligand_row[ligand_keep],
+                    integrin_index[integrin_keep],
+                    integrin_row[integrin_keep],
+                )
+            )
+        errors = [connection.recv() for connection in self._connections]
+        for error in errors:
+            if error is not None:
+                raise error
+        state.position[:] = self._shared["position"]
+        state.velocity[:] = self._shared["velocity"]
+        state.force[:] = self._shared["force"]
+
+    def close(self):
+        """Procedure to stop the workers and release the shared
+        memory.
+        """
+        for connection in self._connections:
+            try:
+                connection.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.kill()
+        self._connections = []
+        self._processes = []
+        self._shared = {}
+        for memory in self._memory:
+            memory.close()
+            memory.unlink()
+        self._memory = []
+
+    @property
+    def bounds(self):
+        """return the (start, stop) rows of every worker"""
+        return self._bounds
+
+    @property
+    def workers(self):
+        """return the number of worker processes"""
+        return len(self._bounds)
@@ -13,7 +13,10 @@ from .get_time import time_format
 from .get_index import get_index
 from .circles import circles
 from .constant import *
-from .polygon_patch import polygon_patch
+from .polygon_patch import polygon_patch, polygon_path
+from .spatial_hash import SpatialHash
+from .verlet_list import VerletList
+from .backend import available_backends, get_backend, set_backend
 from . import force
 from . import potential
 from . import integration
@@ -27,5 +30,11 @@ __all__ = [
     "force",
     "potential",
     "integration",
-    "polygon_patch"
+    "polygon_patch",
+    "polygon_path",
+    "SpatialHash",
+    "VerletList",
+    "available_backends",
+    "get_backend",
+    "set_backend",
 ]
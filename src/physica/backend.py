@@ -0,0 +1,69 @@
+"""module to select the backend of the pair kernels
+
+There are two backends:
+1. 'numpy', the vectorized NumPy kernels (default).
+2. 'numba', the compiled pair loops of `physica.kernels`. It is only
+available when numba is installed.
+
+The backend is selected at runtime with `set_backend`. If the
+requested backend is not available, the NumPy backend is used.
+"""
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+BACKENDS = ("numpy", "numba")
+_backend = "numpy"
+
+
+def available_backends():
+    """return the names of the backends which can be used"""
+    if numba is None:
+        return ("numpy",)
+    return BACKENDS
+
+
+def set_backend(name: str = "numpy"):
+    """select the backend of the pair kernels
+
+    Parameter
+    --------
+    name: str, default='numpy'
+        the name of the backend, 'numpy', 'numba' or 'auto'. 'auto'
+        picks numba when it is installed.
+
+    Return
+    ------
+    the name of the selected backend
+    """
+    global _backend
+    if name == "auto":
+        name = available_backends()[-1]
+    if name not in BACKENDS:
+        raise ValueError(f"unknown backend '{name}', choose from {BACKENDS}")
+    if name not in available_backends():
+        print(f"SYSTEM: backend '{name}' is not available, numpy is used")
+        name = "numpy"
+    _backend = name
+    return _backend
+
+
+def get_backend():
+    """return the name of the selected backend"""
+    return _backend
+
+
+def use_numba():
+    """return True if the numba backend is selected"""
+    return _backend == "numba"
+
+
+def jit(func):
+    """compile a function with numba if it is installed, otherwise
+    return the function as it is.
+    """
+    if numba is None:
+        return func
+    return numba.njit(cache=True)(func)
@@ -0,0 +1,99 @@
+"""module to compare the backends of the pair kernels
+
+Run it from the src folder:
+
+    python -m physica.benchmark [number of objects] [number of pairs]
+
+For every kernel and every available backend, it prints the best time
+of several repeats and the maximum difference from the NumPy result.
+"""
+
+import sys
+from timeit import repeat
+
+import numpy as np
+
+from . import backend, force, potential
+
+
+def _cases(number, pairs, seed=0):
+    """return the name and the call of every benchmarked kernel"""
+    rng = np.random.default_rng(seed)
+    box = np.sqrt(number) * 2.0
+    position = rng.uniform(0, box, (number, 2))
+    velocity = rng.normal(0, 1, (number, 2))
+    index_a = rng.integers(0, number, pairs)
+    index_b = (index_a + rng.integers(1, number, pairs)) % number
+    sigma = rng.uniform(0.5, 1.0, pairs)
+    weight = np.full(pairs, 0.5)
+    radius = rng.uniform(0.5, 1.0, (number, 1))
+    charge = rng.normal(0, 1e-9, number)
+    mass = rng.uniform(1.0, 2.0, number)
+    return {
+        "force.lj_6_12_pairs": lambda: force.lj_6_12_pairs(
+            position, position, index_a, index_b, 511, sigma, weight, cutoff=10
+        ),
+        "force.spring_pairs": lambda: force.spring_pairs(
+            position, velocity, index_a, index_b, 0.4, 1.5, 0.1
+        ),
+        "potential.lennardjones_6_12_pairs": lambda: potential.lennardjones_6_12_pairs(
+            position, position, index_a, index_b, 511, sigma, weight, cutoff=10
+        ),
+        "potential.spring_pairs": lambda: potential.spring_pairs(
+            position, index_a, index_b, 0.4, 1.5
+        ),
+        "force.drag": lambda: force.drag(velocity, radius, 0.001),
+        "force.coulomb_pairs": lambda: force.coulomb_pairs(
+            position, position, index_a, index_b, charge, charge
+        ),
+        "force.general_gravity_pairs": lambda: force.general_gravity_pairs(
+            position, position, index_a, index_b, mass, mass
+        ),
+        "potential.coulomb_pairs": lambda: potential.coulomb_pairs(
+            position, position, index_a, index_b, charge, charge
+        ),
+        "potential.general_gravity_pairs": lambda: potential.general_gravity_pairs(
+            position, position, index_a, index_b, mass, mass
+        ),
+    }
+
+
+def run(number=10000, pairs=100000, number_repeat=5):
+    """benchmark the kernels with every available backend
+
+    Parameter
+    --------
+    number: int, default=10000
+        the number of objects
+    pairs: int, default=100000
+        the number of pairs
+    number_repeat: int, default=5
+        the number of repeats, the best time is reported
+
+    Return
+    ------
+    list of (kernel, backend, time, maximum difference)
+    """
+    selected = backend.get_backend()
+    cases = _cases(number, pairs)
+    result = []
+    print(f"objects: {number}, pairs: {pairs}")
+    print(f"{'kernel':<36}{'backend':<10}{'time (ms)':>12}{'max diff':>12}")
+    try:
+        for name, call in cases.items():
+            backend.set_backend("numpy")
+            reference = call()
+            for backend_name in backend.available_backends():
+                backend.set_backend(backend_name)
+                value = call()  # warm up, e.g. the compilation
+                best = min(repeat(call, number=1, repeat=number_repeat)) * 1e3
+                diff = np.max(np.abs(value - reference)) if value.size else 0.0
+                result.append((name, backend_name, best, diff))
+                print(f"{name:<36}{backend_name:<10}{best:>12.3f}{diff:>12.3g}")
+    finally:
+        backend.set_backend(selected)
+    return result
+
+
+if __name__ == "__main__":
+    run(*[int(arg) for arg in sys.argv[1:3]])
@@ -2,8 +2,7 @@
 
 import matplotlib.pyplot as plt
 import numpy as np
-from matplotlib.patches import Circle
-from matplotlib.collections import PatchCollection
+from matplotlib.collections import EllipseCollection
 
 
 def circles(ax, x_pos, y_pos, radius, color="b", vmin=None, vmax=None, **kwargs):
@@ -37,7 +36,9 @@ def circles(ax, x_pos, y_pos, radius, color="b", vmin=None, vmax=None, **kwargs)
 
     Returns
     -------
-    paths : `~matplotlib.collections.PathCollection`
+    collection : `~matplotlib.collections.EllipseCollection`
+        all circles in one collection, the position of the circles
+        can be updated with `set_offsets`
 
     Examples
     --------
@@ -63,10 +64,19 @@ def circles(ax, x_pos, y_pos, radius, color="b", vmin=None, vmax=None, **kwargs)
     if "lw" in kwargs:
         kwargs.setdefault("linewidth", kwargs.pop("lw"))
 
-    patches = [
-        Circle((x_, y_), s_) for x_, y_, s_ in np.broadcast(x_pos, y_pos, radius)
-    ]
-    collection = PatchCollection(patches, **kwargs)
+    x_pos, y_pos, radius = (
+        np.ravel(value) for value in np.broadcast_arrays(x_pos, y_pos, radius)
+    )
+    diameter = 2 * np.asarray(radius, dtype=float)
+    collection = EllipseCollection(
+        diameter,
+        diameter,
+        np.zeros_like(diameter),
+        units="xy",
+        offsets=np.column_stack((x_pos, y_pos)),
+        offset_transform=ax.transData,
+        **kwargs,
+    )
     if color is not None:
         collection.set_array(np.asarray(color))
         collection.set_clim(vmin, vmax)
@@ -1,18 +1,22 @@
 """init file for force module"""
 
 from .force_gravity import gravity
-from .force_lennardjones import lj_6_12, nearest_dist_LJ
-from .force_coulomb import coulomb
-from .force_general_gravity import general_gravity
-from .force_spring import spring
+from .force_lennardjones import lj_6_12, lj_6_12_pairs, nearest_dist_LJ
+from .force_coulomb import coulomb, coulomb_pairs
+from .force_general_gravity import general_gravity, general_gravity_pairs
+from .force_spring import spring, spring_pairs
 from .force_drag import drag
 
 __all__ = [
     "gravity",
     "lj_6_12",
+    "lj_6_12_pairs",
     "coulomb",
+    "coulomb_pairs",
     "general_gravity",
+    "general_gravity_pairs",
     "spring",
+    "spring_pairs",
     "nearest_dist_LJ",
     "drag"
 ]
@@ -1,5 +1,7 @@
 """module for coulombic force"""
 import numpy as np
+
+from .. import backend, kernels
 from ..constant import COULOMB_CONSTANT
 
 
@@ -32,3 +34,57 @@ def coulomb(charge_a, charge_b, position_a, position_b):
     dist_vec = (position_b - position_a) / dist
     force = (COULOMB_CONSTANT * charge_a * charge_b / (dist**2)) * dist_vec
     return force
+
+
+def coulomb_pairs(position_a, position_b, index_a, index_b, charge_a, charge_b, size=None):
+    """calculate the accumulated coulombic force of many pairs at once
+
+    Parameter
+    --------
+    position_a: np.ndarray
+        The (N, dim) coordinate position of the objects A
+    position_b: np.ndarray
+        The (M, dim) coordinate position of the objects B
+    index_a: np.ndarray
+        The index of object A in `position_a` for every pair
+    index_b: np.ndarray
+        The index of object B in `position_b` for every pair
+    charge_a: float or np.ndarray
+        The electronic charge of the objects A, it can be given per object
+    charge_b: float or np.ndarray
+        The electronic charge of the objects B, it can be given per object
+    size: int, default=None
+        The number of objects B in the result, default is the length
+        of `position_b`
+
+    Return
+    ------
+    (size, dim) array of the total coulombic force acting on every
+    object B
+
+    Notes
+    -----
+    - The force of each pair is the same as `coulomb` and it is the
+    force acting on object B from object A.
+    """
+    index_a = np.asarray(index_a, dtype=int)
+    index_b = np.asarray(index_b, dtype=int)
+    charge_a = np.broadcast_to(charge_a, np.shape(position_a)[:1])
+    charge_b = np.broadcast_to(charge_b, np.shape(position_b)[:1])
+    coefficient = COULOMB_CONSTANT * charge_a[index_a] * charge_b[index_b]
+    if backend.use_numba():
+        return kernels.inverse_square_force_pairs(
+            position_a, position_b, index_a, index_b, coefficient, size
+        )
+    position_b = np.asarray(position_b)
+    if size is None:
+        size = len(position_b)
+    dist_vec = position_b[index_b] - np.asarray(position_a)[index_a]
+    dist_sq = np.einsum("ij,ij->i", dist_vec, dist_vec)
+    force = coefficient / (dist_sq * np.sqrt(dist_sq))
+    total_force = np.empty((size, dist_vec.shape[1]), dtype=float)
+    for axis in range(dist_vec.shape[1]):
+        total_force[:, axis] = np.bincount(
+            index_b, weights=force * dist_vec[:, axis], minlength=size
+        )
+    return total_force
@@ -1,5 +1,7 @@
 import numpy as np
 
+from .. import backend, kernels
+
 
 def drag(obj_velocity, obj_radius, viscocity):
     """calculate the drag force
@@ -17,8 +19,13 @@ def drag(obj_velocity, obj_radius, viscocity):
     ------
     F = -6*pi*viscocity*radius*velocity
 
+    Notes
+    -----
+    - The velocity can be the (N, dim) velocity of many objects with
+    the radius of every object, e.g. in the shape of (N, 1).
     """
-    
     obj_velocity = np.array(obj_velocity)
+    if backend.use_numba() and obj_velocity.ndim == 2 and np.ndim(viscocity) == 0:
+        return kernels.drag(obj_velocity, obj_radius, viscocity)
     force = -6*np.pi*viscocity*obj_radius*obj_velocity
     return force
\ No newline at end of file
@@ -1,6 +1,8 @@
 """Module for general gravity force"""
 
 import numpy as np
+
+from .. import backend, kernels
 from ..constant import GRAVITY_CONSTANT
 
 
@@ -33,3 +35,57 @@ def general_gravity(mass_a, mass_b, position_a, position_b):
     dist_vec = (position_b - position_a) / dist
     force = -1 * GRAVITY_CONSTANT * mass_a * mass_b / (dist**2) * dist_vec
     return force
+
+
+def general_gravity_pairs(position_a, position_b, index_a, index_b, mass_a, mass_b, size=None):
+    """calculate the accumulated general gravity force of many pairs at once
+
+    Parameter
+    --------
+    position_a: np.ndarray
+        The (N, dim) coordinate position of the objects A
+    position_b: np.ndarray
+        The (M, dim) coordinate position of the objects B
+    index_a: np.ndarray
+        The index of object A in `position_a` for every pair
+    index_b: np.ndarray
+        The index of object B in `position_b` for every pair
+    mass_a: float or np.ndarray
+        The mass of the objects A, it can be given per object
+    mass_b: float or np.ndarray
+        The mass of the objects B, it can be given per object
+    size: int, default=None
+        The number of objects B in the result, default is the length
+        of `position_b`
+
+    Return
+    ------
+    (size, dim) array of the total general gravity force acting on every
+    object B
+
+    Notes
+    -----
+    - The force of each pair is the same as `general_gravity` and it is the
+    force acting on object B from object A.
+    """
+    index_a = np.asarray(index_a, dtype=int)
+    index_b = np.asarray(index_b, dtype=int)
+    mass_a = np.broadcast_to(mass_a, np.shape(position_a)[:1])
+    mass_b = np.broadcast_to(mass_b, np.shape(position_b)[:1])
+    coefficient = -1 * GRAVITY_CONSTANT * mass_a[index_a] * mass_b[index_b]
+    if backend.use_numba():
+        return kernels.inverse_square_force_pairs(
+            position_a, position_b, index_a, index_b, coefficient, size
+        )
+    position_b = np.asarray(position_b)
+    if size is None:
+        size = len(position_b)
+    dist_vec = position_b[index_b] - np.asarray(position_a)[index_a]
+    dist_sq = np.einsum("ij,ij->i", dist_vec, dist_vec)
+    force = coefficient / (dist_sq * np.sqrt(dist_sq))
+    total_force = np.empty((size, dist_vec.shape[1]), dtype=float)
+    for axis in range(dist_vec.shape[1]):
+        total_force[:, axis] = np.bincount(
+            index_b, weights=force * dist_vec[:, axis], minlength=size
+        )
+    return total_force
@@ -2,6 +2,8 @@
 
 import numpy as np
 
+from .. import backend, kernels
+
 
 def lj_6_12(position_a, position_b, epsilon=1, sigma=1):
     """calculate the Lennard-Jones 6-12 force
@@ -37,6 +39,79 @@ def lj_6_12(position_a, position_b, epsilon=1, sigma=1):
     return force_vec
 
 
+def lj_6_12_pairs(
+    position_a,
+    position_b,
+    index_a,
+    index_b,
+    epsilon=1,
+    sigma=1,
+    weight=None,
+    size=None,
+    cutoff=None,
+):
+    """calculate the accumulated Lennard-Jones 6-12 force of many
+    pairs at once
+
+    Parameter
+    --------
+    position_a: np.ndarray
+        The (N, dim) coordinate position of the objects A
+    position_b: np.ndarray
+        The (M, dim) coordinate position of the objects B
+    index_a: np.ndarray
+        The index of object A in `position_a` for every pair
+    index_b: np.ndarray
+        The index of object B in `position_b` for every pair
+    epsilon: float, default=1
+        The depth of the potential creek/well
+    sigma: float or np.ndarray, default=1
+        The distance when the energy value equal to zero. It can be
+        given per pair.
+    weight: np.ndarray, default=None
+        The multiplier of the force of every pair
+    size: int, default=None
+        The number of objects B in the result, default is the length
+        of `position_b`
+    cutoff: float, default=None
+        The pairs with distance equal or greater than the cutoff are
+        ignored
+
+    Return
+    ------
+    (size, dim) array of the total lennard-jones force acting on every
+    object B
+
+    Notes
+    -----
+    - The force of each pair is the same as `lj_6_12` and it is the
+    force acting on object B from object A.
+    """
+    if backend.use_numba():
+        return kernels.lj_6_12_pairs(
+            position_a, position_b, index_a, index_b, epsilon, sigma, weight, size, cutoff
+        )
+    position_b = np.asarray(position_b)
+    if size is None:
+        size = len(position_b)
+    index_a = np.asarray(index_a, dtype=int)
+    index_b = np.asarray(index_b, dtype=int)
+    dist_vec = position_b[index_b] - np.asarray(position_a)[index_a]
+    dist = np.sqrt(np.einsum("ij,ij->i", dist_vec, dist_vec))
+    alpha = (sigma / dist) ** 6
+    force = (48 / dist) * epsilon * alpha * (alpha - 0.5) / dist
+    if weight is not None:
+        force = force * weight
+    if cutoff is not None:
+        force = np.where(dist < cutoff, force, 0.0)
+    total_force = np.empty((size, dist_vec.shape[1]), dtype=float)
+    for axis in range(dist_vec.shape[1]):
+        total_force[:, axis] = np.bincount(
+            index_b, weights=force * dist_vec[:, axis], minlength=size
+        )
+    return total_force
+
+
 def nearest_dist_LJ(epsilon, sigma, limit=10e-6, start_point=10e-3):
     """function to get the perimeter where the force greater than a limit
 
@@ -2,6 +2,8 @@
 
 import numpy as np
 
+from .. import backend, kernels
+
 
 def spring(
     position_a,
@@ -52,3 +54,79 @@ def spring(
         (spring_constant * delta_dist * dist_vec) + damping_coefficient * rel_velocity
     )
     return force
+
+
+def spring_pairs(
+    position,
+    velocity,
+    index_a,
+    index_b,
+    spring_constant,
+    normal_length,
+    damping_coefficient=0,
+    size=None,
+):
+    """calculate the accumulated spring force of many springs at once
+
+    Every spring is evaluated once, the force is added to object B and
+    the opposite force is added to object A.
+
+    Parameter
+    --------
+    position: np.ndarray
+        The (N, dim) coordinate position of the objects
+    velocity: np.ndarray
+        The (N, dim) velocity of the objects
+    index_a: np.ndarray
+        The index of object A of every spring
+    index_b: np.ndarray
+        The index of object B of every spring
+    spring_constant: float
+        The spring constant
+    normal_length: float or np.ndarray
+        The normal length of the spring, it can be given per spring
+    damping_coefficient: float, default=0
+        The damping coefficient related to the velocity of the object
+    size: int, default=None
+        The number of objects in the result, default is the length of
+        `position`
+
+    Return
+    ------
+    (size, dim) array of the total spring force acting on every object
+
+    Notes
+    -----
+    The force of each spring is the same as `spring`.
+    """
+    if backend.use_numba():
+        return kernels.spring_force_pairs(
+            position,
+            velocity,
+            index_a,
+            index_b,
+            spring_constant,
+            normal_length,
+            damping_coefficient,
+            size,
+        )
+    position = np.asarray(position)
+    velocity = np.asarray(velocity)
+    if size is None:
+        size = len(position)
+    index_a = np.asarray(index_a, dtype=int)
+    index_b = np.asarray(index_b, dtype=int)
+    dist_vec = position[index_b] - position[index_a]
+    dist = np.sqrt(np.einsum("ij,ij->i", dist_vec, dist_vec))
+    rel_velocity = velocity[index_b] - velocity[index_a]
+    delta_dist = dist - normal_length
+    force = -1 * (
+        (spring_constant * delta_dist / dist)[:, np.newaxis] * dist_vec
+        + damping_coefficient * rel_velocity
+    )
+    total_force = np.empty((size, position.shape[1]), dtype=float)
+    for axis in range(position.shape[1]):
+        total_force[:, axis] = np.bincount(
+            index_b, weights=force[:, axis], minlength=size
+        ) - np.bincount(index_a, weights=force[:, axis], minlength=size)
+    return total_force
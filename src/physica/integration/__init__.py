@@ -1,6 +1,13 @@
 """init file for integration module"""
 
-from .euler import eom_euler
-from .rungekutta import eom_rungekutta
+from .buffer import IntegrationBuffer
+from .euler import eom_euler, eom_euler_batch
+from .rungekutta import eom_rungekutta, eom_rungekutta_batch
 
-__all__ = ["eom_euler", "eom_rungekutta"]
+__all__ = [
+    "IntegrationBuffer",
+    "eom_euler",
+    "eom_euler_batch",
+    "eom_rungekutta",
+    "eom_rungekutta_batch",
+]
@@ -0,0 +1,34 @@
+"""module for the scratch buffer of the batched integration"""
+
+import numpy as np
+
+
+class IntegrationBuffer:
+    """Collection of scratch arrays which are reused by the batched
+    integration functions, so no temporary array is allocated on every
+    step.
+    """
+
+    def __init__(self) -> None:
+        """initial function for IntegrationBuffer class"""
+        self._arrays: dict[str, np.ndarray] = {}
+
+    def get(self, name: str, shape: tuple) -> np.ndarray:
+        """return the scratch array with a specific name.
+
+        The array is only reallocated when the requested shape is
+        different from the previous one. The content of the array is
+        not initialized.
+
+        Parameters
+        ----------
+        name: str
+            the name of the scratch array
+        shape: tuple
+            the shape of the scratch array
+        """
+        array = self._arrays.get(name)
+        if array is None or array.shape != shape:
+            array = np.empty(shape, dtype=float)
+            self._arrays[name] = array
+        return array
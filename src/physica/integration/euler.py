@@ -2,6 +2,8 @@
 
 import numpy as np
 
+from .buffer import IntegrationBuffer
+
 
 def eom_euler(position, velocity, force, mass, timestep):
     """a function to calculate equation of motion using eulerian
@@ -37,3 +39,54 @@ def eom_euler(position, velocity, force, mass, timestep):
     final_velocity = velocity + acceleration * timestep
     final_position = position + velocity * timestep
     return final_position, final_velocity
+
+
+def eom_euler_batch(
+    position, velocity, force, mass, timestep, buffer=None, force_out=None
+):
+    """a function to calculate equation of motion of many objects at
+    once using eulerian methods
+
+    Parameters
+    ----------
+    position: np.ndarray
+        the current position of all objects in (N, dim) shape.
+    velocity: np.ndarray
+        the current velocity of all objects in (N, dim) shape.
+    force: function
+        the force acting on all objects. it must be written as the
+        function of (x, v) of the whole system and return (N, dim)
+        array.
+    mass: float or np.ndarray
+        the mass of the objects, either a scalar or (N, 1) array.
+    timestep: float
+        time step of integration
+    buffer: IntegrationBuffer, default=None
+        the scratch arrays reused between the calls. The returned
+        arrays belong to the buffer and are overwritten on the next
+        call.
+    force_out: np.ndarray, default=None
+        if given, the force at the initial state is copied into it.
+
+    Returns
+    -------
+    final_position: np.ndarray
+        the calculated final position in the span of `dt`
+    final_velocity: np.ndarray
+        the calculated final velocity in the span of `dt`
+    """
+    if buffer is None:
+        buffer = IntegrationBuffer()
+    shape = np.shape(position)
+    final_position = buffer.get("euler_final_position", shape)
+    final_velocity = buffer.get("euler_final_velocity", shape)
+
+    force_val = force(position, velocity)
+    if force_out is not None:
+        force_out[:] = force_val
+    np.divide(force_val, mass, out=final_velocity)
+    final_velocity *= timestep
+    final_velocity += velocity
+    np.multiply(velocity, timestep, out=final_position)
+    final_position += position
+    return final_position, final_velocity
@@ -2,6 +2,8 @@
 
 import numpy as np
 
+from .buffer import IntegrationBuffer
+
 
 def eom_rungekutta(position, velocity, force, mass, timestep):
     """a function to calculate equation of motion using 4th order
@@ -62,3 +64,85 @@ def eom_rungekutta(position, velocity, force, mass, timestep):
         k1_pos + (2 * k2_pos) + (2 * k3_pos) + k4_pos
     )
     return final_position, final_velocity
+
+
+def eom_rungekutta_batch(
+    position, velocity, force, mass, timestep, buffer=None, force_out=None
+):
+    """a function to calculate equation of motion of many objects at
+    once using 4th order Runge-Kutta methods
+
+    Parameters
+    ----------
+    position: np.ndarray
+        the current position of all objects in (N, dim) shape.
+    velocity: np.ndarray
+        the current velocity of all objects in (N, dim) shape.
+    force: function
+        the force acting on all objects. it must be written as the
+        function of (x, v) of the whole system and return (N, dim)
+        array.
+    mass: float or np.ndarray
+        the mass of the objects, either a scalar or (N, 1) array.
+    timestep: float
+        time step of integration
+    buffer: IntegrationBuffer, default=None
+        the scratch arrays reused between the calls. The returned
+        arrays belong to the buffer and are overwritten on the next
+        call.
+    force_out: np.ndarray, default=None
+        if given, the force at the initial state is copied into it.
+
+    Returns
+    -------
+    final_position: np.ndarray
+        the calculated final position in the span of `dt`
+    final_velocity: np.ndarray
+        the calculated final velocity in the span of `dt`
+    """
+    if buffer is None:
+        buffer = IntegrationBuffer()
+    shape = np.shape(position)
+    temp_position = buffer.get("rk_temp_position", shape)
+    temp_velocity = buffer.get("rk_temp_velocity", shape)
+    k_pos = buffer.get("rk_k_position", shape)
+    k_vel = buffer.get("rk_k_velocity", shape)
+    sum_pos = buffer.get("rk_sum_position", shape)
+    sum_vel = buffer.get("rk_sum_velocity", shape)
+    final_position = buffer.get("rk_final_position", shape)
+    final_velocity = buffer.get("rk_final_velocity", shape)
+
+    # 1st order runge-kutta
+    force_val = force(position, velocity)
+    if force_out is not None:
+        force_out[:] = force_val
+    np.divide(force_val, mass, out=k_vel)
+    k_vel *= timestep
+    np.multiply(velocity, timestep, out=k_pos)
+    sum_vel[:] = k_vel
+    sum_pos[:] = k_pos
+    # 2nd and 3rd order runge-kutta
+    for _ in range(2):
+        np.divide(k_pos, 2, out=temp_position)
+        temp_position += position
+        np.divide(k_vel, 2, out=temp_velocity)
+        temp_velocity += velocity
+        np.divide(force(temp_position, temp_velocity), mass, out=k_vel)
+        k_vel *= timestep
+        np.multiply(temp_velocity, timestep, out=k_pos)
+        sum_vel += 2 * k_vel
+        sum_pos += 2 * k_pos
+    # 4rd order runge-kutta
+    np.add(position, k_pos, out=temp_position)
+    np.add(velocity, k_vel, out=temp_velocity)
+    np.divide(force(temp_position, temp_velocity), mass, out=k_vel)
+    k_vel *= timestep
+    np.multiply(temp_velocity, timestep, out=k_pos)
+    sum_vel += k_vel
+    sum_pos += k_pos
+    # result
+    np.multiply(sum_vel, 1 / 6, out=final_velocity)
+    final_velocity += velocity
+    np.multiply(sum_pos, 1 / 6, out=final_position)
+    final_position += position
+    return final_position, final_velocity
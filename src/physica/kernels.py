@@ -0,0 +1,282 @@
+"""module for the compiled pair kernels
+
+The kernels are plain pair loops which are compiled with numba when it
+is installed. They give the same result as the NumPy array functions in
+`physica.force` and `physica.potential` (the Lennard-Jones, spring,
+coulomb and general gravity pairs and the drag force) and are used by
+them when the 'numba' backend is selected.
+"""
+
+import numpy as np
+
+from .backend import jit
+
+
+def _per_pair(value, number):
+    """return a value as a contiguous float array with one item per
+    pair
+    """
+    if value is None:
+        value = 1.0
+    return np.ascontiguousarray(np.broadcast_to(np.asarray(value, dtype=float), (number,)))
+
+
+def _prepare(position, index):
+    """return the contiguous position and index arrays of the kernels"""
+    position = np.ascontiguousarray(position, dtype=float)
+    index = np.ascontiguousarray(index, dtype=np.int64)
+    return position, index
+
+
+@jit
+def _lj_6_12_force_loop(
+    position_a, position_b, index_a, index_b, epsilon, sigma, weight, cutoff, size
+):
+    dim = position_b.shape[1]
+    total_force = np.zeros((size, dim))
+    dist_vec = np.empty(dim)
+    for k in range(index_a.shape[0]):
+        dist_sq = 0.0
+        for axis in range(dim):
+            dist_vec[axis] = position_b[index_b[k], axis] - position_a[index_a[k], axis]
+            dist_sq += dist_vec[axis] * dist_vec[axis]
+        dist = np.sqrt(dist_sq)
+        if not dist < cutoff:
+            continue
+        alpha = (sigma[k] / dist) ** 6
+        force = (48 / dist) * epsilon * alpha * (alpha - 0.5) / dist * weight[k]
+        for axis in range(dim):
+            total_force[index_b[k], axis] += force * dist_vec[axis]
+    return total_force
+
+
+@jit
+def _lj_6_12_potential_loop(
+    position_a, position_b, index_a, index_b, epsilon, sigma, weight, cutoff, size
+):
+    dim = position_b.shape[1]
+    total_energy = np.zeros(size)
+    for k in range(index_a.shape[0]):
+        dist_sq = 0.0
+        for axis in range(dim):
+            diff = position_b[index_b[k], axis] - position_a[index_a[k], axis]
+            dist_sq += diff * diff
+        dist = np.sqrt(dist_sq)
+        if not dist < cutoff:
+            continue
+        alpha = (sigma[k] / dist) ** 6
+        total_energy[index_b[k]] += 4 * epsilon * alpha * (alpha - 1) * weight[k]
+    return total_energy
+
+
+@jit
+def _spring_force_loop(
+    position,
+    velocity,
+    index_a,
+    index_b,
+    spring_constant,
+    normal_length,
+    damping_coefficient,
+    size,
+):
+    dim = position.shape[1]
+    total_force = np.zeros((size, dim))
+    dist_vec = np.empty(dim)
+    for k in range(index_a.shape[0]):
+        dist_sq = 0.0
+        for axis in range(dim):
+            dist_vec[axis] = position[index_b[k], axis] - position[index_a[k], axis]
+            dist_sq += dist_vec[axis] * dist_vec[axis]
+        dist = np.sqrt(dist_sq)
+        stretch = spring_constant * (dist - normal_length[k]) / dist
+        for axis in range(dim):
+            rel_velocity = velocity[index_b[k], axis] - velocity[index_a[k], axis]
+            force = -1 * (stretch * dist_vec[axis] + damping_coefficient * rel_velocity)
+            total_force[index_b[k], axis] += force
+            total_force[index_a[k], axis] -= force
+    return total_force
+
+
+@jit
+def _spring_potential_loop(position, index_a, index_b, spring_constant, normal_length):
+    dim = position.shape[1]
+    energy = np.empty(index_a.shape[0])
+    for k in range(index_a.shape[0]):
+        dist_sq = 0.0
+        for axis in range(dim):
+            diff = position[index_b[k], axis] - position[index_a[k], axis]
+            dist_sq += diff * diff
+        dist_diff = np.sqrt(dist_sq) - normal_length[k]
+        energy[k] = 0.5 * spring_constant * (dist_diff**2)
+    return energy
+
+
+@jit
+def _inverse_square_force_loop(position_a, position_b, index_a, index_b, coefficient, size):
+    dim = position_b.shape[1]
+    total_force = np.zeros((size, dim))
+    dist_vec = np.empty(dim)
+    for k in range(index_a.shape[0]):
+        dist_sq = 0.0
+        for axis in range(dim):
+            dist_vec[axis] = position_b[index_b[k], axis] - position_a[index_a[k], axis]
+            dist_sq += dist_vec[axis] * dist_vec[axis]
+        force = coefficient[k] / (dist_sq * np.sqrt(dist_sq))
+        for axis in range(dim):
+            total_force[index_b[k], axis] += force * dist_vec[axis]
+    return total_force
+
+
+@jit
+def _inverse_square_potential_loop(position_a, position_b, index_a, index_b, coefficient, size):
+    dim = position_b.shape[1]
+    total_energy = np.zeros(size)
+    for k in range(index_a.shape[0]):
+        dist_sq = 0.0
+        for axis in range(dim):
+            diff = position_b[index_b[k], axis] - position_a[index_a[k], axis]
+            dist_sq += diff * diff
+        total_energy[index_b[k]] += coefficient[k] / np.sqrt(dist_sq)
+    return total_energy
+
+
+@jit
+def _drag_loop(velocity, radius, viscocity):
+    force = np.empty(velocity.shape)
+    for i in range(velocity.shape[0]):
+        for axis in range(velocity.shape[1]):
+            column = axis if radius.shape[1] > 1 else 0
+            force[i, axis] = -6 * np.pi * viscocity * radius[i, column] * velocity[i, axis]
+    return force
+
+
+def lj_6_12_pairs(
+    position_a, position_b, index_a, index_b, epsilon, sigma, weight, size, cutoff
+):
+    """compiled version of `physica.force.lj_6_12_pairs`"""
+    position_a, index_a = _prepare(position_a, index_a)
+    position_b, index_b = _prepare(position_b, index_b)
+    number = len(index_a)
+    if size is None:
+        size = len(position_b)
+    return _lj_6_12_force_loop(
+        position_a,
+        position_b,
+        index_a,
+        index_b,
+        float(epsilon),
+        _per_pair(sigma, number),
+        _per_pair(weight, number),
+        np.inf if cutoff is None else float(cutoff),
+        size,
+    )
+
+
+def lennardjones_6_12_pairs(
+    position_a, position_b, index_a, index_b, epsilon, sigma, weight, size, cutoff
+):
+    """compiled version of `physica.potential.lennardjones_6_12_pairs`"""
+    position_a, index_a = _prepare(position_a, index_a)
+    position_b, index_b = _prepare(position_b, index_b)
+    number = len(index_a)
+    if size is None:
+        size = len(position_b)
+    return _lj_6_12_potential_loop(
+        position_a,
+        position_b,
+        index_a,
+        index_b,
+        float(epsilon),
+        _per_pair(sigma, number),
+        _per_pair(weight, number),
+        np.inf if cutoff is None else float(cutoff),
+        size,
+    )
+
+
+def spring_force_pairs(
+    position,
+    velocity,
+    index_a,
+    index_b,
+    spring_constant,
+    normal_length,
+    damping_coefficient,
+    size,
+):
+    """compiled version of `physica.force.spring_pairs`"""
+    position, index_a = _prepare(position, index_a)
+    velocity, index_b = _prepare(velocity, index_b)
+    if size is None:
+        size = len(position)
+    return _spring_force_loop(
+        position,
+        velocity,
+        index_a,
+        index_b,
+        float(spring_constant),
+        _per_pair(normal_length, len(index_a)),
+        float(damping_coefficient),
+        size,
+    )
+
+
+def spring_potential_pairs(position, index_a, index_b, spring_constant, normal_length):
+    """compiled version of `physica.potential.spring_pairs`"""
+    position, index_a = _prepare(position, index_a)
+    _, index_b = _prepare(position, index_b)
+    return _spring_potential_loop(
+        position,
+        index_a,
+        index_b,
+        float(spring_constant),
+        _per_pair(normal_length, len(index_a)),
+    )
+
+
+def inverse_square_force_pairs(position_a, position_b, index_a, index_b, coefficient, size):
+    """compiled force of the pairs `coefficient / r**2` along the
+    direction from object A to object B, used by
+    `physica.force.coulomb_pairs` and `physica.force.general_gravity_pairs`
+    """
+    position_a, index_a = _prepare(position_a, index_a)
+    position_b, index_b = _prepare(position_b, index_b)
+    if size is None:
+        size = len(position_b)
+    return _inverse_square_force_loop(
+        position_a,
+        position_b,
+        index_a,
+        index_b,
+        _per_pair(coefficient, len(index_a)),
+        size,
+    )
+
+
+def inverse_square_potential_pairs(position_a, position_b, index_a, index_b, coefficient, size):
+    """compiled potential of the pairs `coefficient / r`, used by
+    `physica.potential.coulomb_pairs` and
+    `physica.potential.general_gravity_pairs`
+    """
+    position_a, index_a = _prepare(position_a, index_a)
+    position_b, index_b = _prepare(position_b, index_b)
+    if size is None:
+        size = len(position_b)
+    return _inverse_square_potential_loop(
+        position_a,
+        position_b,
+        index_a,
+        index_b,
+        _per_pair(coefficient, len(index_a)),
+        size,
+    )
+
+
+def drag(velocity, radius, viscocity):
+    """compiled version of `physica.force.drag` for (N, dim) velocity"""
+    velocity = np.ascontiguousarray(velocity, dtype=float)
+    radius = np.asarray(radius, dtype=float)
+    if radius.ndim < 2 or radius.shape[0] != velocity.shape[0]:
+        radius = np.broadcast_to(radius, velocity.shape)
+    return _drag_loop(velocity, np.ascontiguousarray(radius), float(viscocity))
@@ -53,6 +53,32 @@ class ObjBase:
         self.velocity = self.temp_velocity
         self.position = self.temp_position
 
+    def bind(self, position, velocity, acceleration, force):
+        """Bind the state of the object into external storage.
+
+        The current state is copied into the given arrays, which are
+        usually the rows of a bigger array, and the object keeps them
+        as its own state. Every update through the object is then
+        visible in the storage and vice versa.
+
+        Parameters
+        ----------
+        position, velocity, acceleration, force : :obj:`ndarray`
+            writable arrays with the same shape as the object state.
+        """
+        position[:] = self._position
+        velocity[:] = self._velocity
+        acceleration[:] = self._acceleration
+        force[:] = self._force
+        self._position = position
+        self._velocity = velocity
+        self._acceleration = acceleration
+        self._force = force
+        self._temp_position = self._position
+        self._temp_velocity = self._velocity
+        self._temp_acceleration = self._acceleration
+        self._temp_force = self._force
+
     def get_distance(self, obj, bias=None):
         """Get the distance from two objects.
 
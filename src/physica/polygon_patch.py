@@ -6,12 +6,17 @@ from matplotlib.patches import PathPatch
 from matplotlib.collections import PatchCollection
 
 
+def polygon_path(poly):
+    """a method to convert a shapely polygon into a matplotlib path"""
+    return Path.make_compound_path(
+        Path(np.asarray(poly.exterior.coords)[:, :2]),
+        *[Path(np.asarray(ring.coords)[:, :2]) for ring in poly.interiors])
+
+
 # Plots a Polygon to pyplot `ax`
 def polygon_patch(ax, poly, **kwargs):
     """a method to plot polygon into matplotlib"""
-    path = Path.make_compound_path(
-        Path(np.asarray(poly.exterior.coords)[:, :2]),
-        *[Path(np.asarray(ring.coords)[:, :2]) for ring in poly.interiors])
+    path = polygon_path(poly)
 
     patch = PathPatch(path, **kwargs)
     collection = PatchCollection([patch], **kwargs)
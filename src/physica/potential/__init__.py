@@ -1,15 +1,19 @@
 """init file for potential module"""
 
-from .pot_lennardjones import lennardjones_6_12
-from .pot_coulomb import coulomb
-from .pot_general_gravity import general_gravity
+from .pot_lennardjones import lennardjones_6_12, lennardjones_6_12_pairs
+from .pot_coulomb import coulomb, coulomb_pairs
+from .pot_general_gravity import general_gravity, general_gravity_pairs
 from .pot_gravity import gravity
-from .pot_spring import spring
+from .pot_spring import spring, spring_pairs
 
 __all__ = [
     "lennardjones_6_12",
+    "lennardjones_6_12_pairs",
     "coulomb",
+    "coulomb_pairs",
     "general_gravity",
+    "general_gravity_pairs",
     "gravity",
     "spring",
+    "spring_pairs",
 ]
@@ -1,6 +1,8 @@
 """module for coulomb potential"""
 
 import numpy as np
+
+from .. import backend, kernels
 from ..constant import COULOMB_CONSTANT
 
 
@@ -32,3 +34,50 @@ def coulomb(charge_a, charge_b, position_a, position_b):
     dist = np.linalg.norm((position_b - position_a))
     energy = COULOMB_CONSTANT * charge_a * charge_b / dist
     return energy
+
+
+def coulomb_pairs(position_a, position_b, index_a, index_b, charge_a, charge_b, size=None):
+    """calculate the accumulated coulombic potential energy of many pairs
+    at once
+
+    Parameter
+    --------
+    position_a: np.ndarray
+        The (N, dim) coordinate position of the objects A
+    position_b: np.ndarray
+        The (M, dim) coordinate position of the objects B
+    index_a: np.ndarray
+        The index of object A in `position_a` for every pair
+    index_b: np.ndarray
+        The index of object B in `position_b` for every pair
+    charge_a: float or np.ndarray
+        The electronic charge of the objects A, it can be given per object
+    charge_b: float or np.ndarray
+        The electronic charge of the objects B, it can be given per object
+    size: int, default=None
+        The number of objects B in the result, default is the length
+        of `position_b`
+
+    Return
+    ------
+    (size,) array of the total potential energy of every object B
+
+    Notes
+    -----
+    - The energy of each pair is the same as `coulomb`.
+    """
+    index_a = np.asarray(index_a, dtype=int)
+    index_b = np.asarray(index_b, dtype=int)
+    charge_a = np.broadcast_to(charge_a, np.shape(position_a)[:1])
+    charge_b = np.broadcast_to(charge_b, np.shape(position_b)[:1])
+    coefficient = COULOMB_CONSTANT * charge_a[index_a] * charge_b[index_b]
+    if backend.use_numba():
+        return kernels.inverse_square_potential_pairs(
+            position_a, position_b, index_a, index_b, coefficient, size
+        )
+    position_b = np.asarray(position_b)
+    if size is None:
+        size = len(position_b)
+    dist_vec = position_b[index_b] - np.asarray(position_a)[index_a]
+    dist = np.sqrt(np.einsum("ij,ij->i", dist_vec, dist_vec))
+    return np.bincount(index_b, weights=coefficient / dist, minlength=size)
@@ -2,6 +2,8 @@
 
 import numpy as np
 
+from .. import backend, kernels
+
 
 def lennardjones_6_12(position_a, position_b, epsilon=1, sigma=1):
     """calculate the Lennard-Jones 6-12 potential
@@ -34,3 +36,70 @@ def lennardjones_6_12(position_a, position_b, epsilon=1, sigma=1):
     alpha = (sigma / dist) ** 6
     energy = 4 * epsilon * alpha * (alpha - 1)
     return energy
+
+
+def lennardjones_6_12_pairs(
+    position_a,
+    position_b,
+    index_a,
+    index_b,
+    epsilon=1,
+    sigma=1,
+    weight=None,
+    size=None,
+    cutoff=None,
+):
+    """calculate the accumulated Lennard-Jones 6-12 potential of many
+    pairs at once
+
+    Parameter
+    --------
+    position_a: np.ndarray
+        The (N, dim) coordinate position of the objects A
+    position_b: np.ndarray
+        The (M, dim) coordinate position of the objects B
+    index_a: np.ndarray
+        The index of object A in `position_a` for every pair
+    index_b: np.ndarray
+        The index of object B in `position_b` for every pair
+    epsilon: float, default=1
+        The depth of the potential creek/well
+    sigma: float or np.ndarray, default=1
+        The distance when the energy value equal to zero. It can be
+        given per pair.
+    weight: np.ndarray, default=None
+        The multiplier of the energy of every pair, e.g. 0.5 for a
+        pair whose energy is shared by both objects.
+    size: int, default=None
+        The number of objects B in the result, default is the length
+        of `position_b`
+    cutoff: float, default=None
+        The pairs with distance equal or greater than the cutoff are
+        ignored
+
+    Return
+    ------
+    (size,) array of the total potential energy of every object B
+
+    Notes
+    -----
+    - The energy of each pair is the same as `lennardjones_6_12`.
+    """
+    if backend.use_numba():
+        return kernels.lennardjones_6_12_pairs(
+            position_a, position_b, index_a, index_b, epsilon, sigma, weight, size, cutoff
+        )
+    position_b = np.asarray(position_b)
+    if size is None:
+        size = len(position_b)
+    index_a = np.asarray(index_a, dtype=int)
+    index_b = np.asarray(index_b, dtype=int)
+    dist_vec = position_b[index_b] - np.asarray(position_a)[index_a]
+    dist = np.sqrt(np.einsum("ij,ij->i", dist_vec, dist_vec))
+    alpha = (sigma / dist) ** 6
+    energy = 4 * epsilon * alpha * (alpha - 1)
+    if weight is not None:
+        energy = energy * weight
+    if cutoff is not None:
+        energy = np.where(dist < cutoff, energy, 0.0)
+    return np.bincount(index_b, weights=energy, minlength=size)
@@ -2,6 +2,8 @@
 
 import numpy as np
 
+from .. import backend, kernels
+
 
 def spring(position_a, position_b, spring_constant, normal_length):
     """calculate the spring potential
@@ -32,3 +34,37 @@ def spring(position_a, position_b, spring_constant, normal_length):
     dist_diff = dist - normal_length
     energy = 0.5 * spring_constant * (dist_diff**2)
     return energy
+
+
+def spring_pairs(position, index_a, index_b, spring_constant, normal_length):
+    """calculate the spring potential of many springs at once
+
+    Parameter
+    --------
+    position: np.ndarray
+        The (N, dim) coordinate position of the objects
+    index_a: np.ndarray
+        The index of object A of every spring
+    index_b: np.ndarray
+        The index of object B of every spring
+    spring_constant: float
+        The spring constant
+    normal_length: float or np.ndarray
+        The normal length of the spring, it can be given per spring
+
+    Return
+    ------
+    (E,) array of the potential energy of every spring
+    """
+    if backend.use_numba():
+        return kernels.spring_potential_pairs(
+            position, index_a, index_b, spring_constant, normal_length
+        )
+    position = np.asarray(position)
+    dist_vec = position[np.asarray(index_b, dtype=int)] - position[
+        np.asarray(index_a, dtype=int)
+    ]
+    dist = np.sqrt(np.einsum("ij,ij->i", dist_vec, dist_vec))
+    dist_diff = dist - normal_length
+    energy = 0.5 * spring_constant * (dist_diff**2)
+    return energy
@@ -0,0 +1,127 @@
+"""module for the uniform grid spatial hash of points"""
+
+import numpy as np
+
+# multiplier to combine the two cell indices into one integer key
+_KEY_SHIFT = 2**32
+
+
+class SpatialHash:
+    """Uniform grid cell list of 2D points.
+
+    The points are binned into square cells and sorted by their cell
+    key, so the points inside a cell are found with a binary search.
+    It answers radius queries of many points at once and returns the
+    result as compressed sparse row (CSR) neighbor lists.
+    """
+
+    def __init__(self, positions, cell_size: float) -> None:
+        """initial function for SpatialHash class
+
+        Parameters
+        ----------
+        positions: array_like
+            the (N, 2) position of the points
+        cell_size: float
+            the size of one cell of the grid
+        """
+        self._cell_size = float(cell_size)
+        self._positions = np.zeros((0, 2), dtype=float)
+        self._order = np.zeros(0, dtype=int)
+        self._sorted_key = np.zeros(0, dtype=np.int64)
+        self.update(positions)
+
+    def _key(self, cell):
+        """return the integer key of (N, 2) cell indices"""
+        return cell[:, 0] * _KEY_SHIFT + cell[:, 1]
+
+    def update(self, positions):
+        """Bin the points into the grid again.
+
+        Parameters
+        ----------
+        positions: array_like
+            the (N, 2) position of the points
+        """
+        self._positions = np.asarray(positions, dtype=float).reshape(-1, 2)
+        cell = np.floor(self._positions / self._cell_size).astype(np.int64)
+        key = self._key(cell)
+        self._order = np.argsort(key, kind="stable")
+        self._sorted_key = key[self._order]
+
+    def query(self, points, radius: float, mask=None, exclude=None):
+        """Find the points inside a radius of many query points.
+
+        Parameters
+        ----------
+        points: array_like
+            the (M, 2) position of the query points
+        radius: float
+            the maximum distance (exclusive) of the neighbors
+        mask: np.ndarray, default=None
+            boolean array of the hashed points, only the points with
+            True value are returned
+        exclude: np.ndarray, default=None
+            index of a hashed point to be excluded for every query
+            point, e.g. the query point itself
+
+        Return
+        ------
+        pointer:
+            the neighbors of query point q are
+            `index[pointer[q]:pointer[q+1]]`
+        index:
+            the index of the neighboring hashed points, sorted per
+            query point
+        """
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        number = len(points)
+        reach = int(np.ceil(radius / self._cell_size))
+        query_cell = np.floor(points / self._cell_size).astype(np.int64)
+
+        query_list = []
+        index_list = []
+        for x_offset in range(-reach, reach + 1):
+            for y_offset in range(-reach, reach + 1):
+                key = self._key(query_cell + (x_offset, y_offset))
+                low = np.searchsorted(self._sorted_key, key, side="left")
+                high = np.searchsorted(self._sorted_key, key, side="right")
+                count = high - low
+                total = int(count.sum())
+                if total == 0:
+                    continue
+                start = np.repeat(low - np.cumsum(count) + count, count)
+                query_list.append(np.repeat(np.arange(number), count))
+                index_list.append(self._order[start + np.arange(total)])
+
+        if query_list:
+            query = np.concatenate(query_list)
+            index = np.concatenate(index_list)
+        else:
+            query = np.zeros(0, dtype=int)
+            index = np.zeros(0, dtype=int)
+
+        # filter the candidates to make circle
+        dist_vec = self._positions[index] - points[query]
+        keep = np.einsum("ij,ij->i", dist_vec, dist_vec) < radius**2
+        if mask is not None:
+            keep &= mask[index]
+        if exclude is not None:
+            keep &= index != np.asarray(exclude)[query]
+        query = query[keep]
+        index = index[keep]
+
+        order = np.lexsort((index, query))
+        pointer = np.zeros(number + 1, dtype=int)
+        np.cumsum(np.bincount(query, minlength=number), out=pointer[1:])
+        return pointer, index[order]
+
+    @property
+    def cell_size(self):
+        """return the size of one cell of the grid"""
+        return self._cell_size
+
+    @property
+    def positions(self):
+        """return the hashed positions"""
+        return self._positions
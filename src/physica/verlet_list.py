@@ -0,0 +1,158 @@
+"""module for the Verlet neighbor list with skin distance"""
+
+import numpy as np
+
+
+class VerletList:
+    """Neighbor list which is only rebuilt when it is needed.
+
+    The list contains every pair inside `radius + skin`. As long as no
+    object has moved more than half of the skin since the last build,
+    every pair inside `radius` is guaranteed to be in the list, so the
+    list can be reused. The pairs are stored as (row, index) arrays
+    sorted by row.
+    """
+
+    def __init__(self, builder, radius: float, skin: float = 0.0) -> None:
+        """initial function for VerletList class
+
+        Parameters
+        ----------
+        builder: function
+            the function to build the pairs. It must be written as the
+            function of the list radius and return the (row, index)
+            arrays of the pairs.
+        radius: float
+            the interaction radius
+        skin: float, default=0.0
+            the additional distance of the list. With zero skin the
+            list is rebuilt on every update.
+        """
+        self._builder = builder
+        self._radius = radius
+        self._skin = skin
+        self._reference = None
+        self._row = np.zeros(0, dtype=int)
+        self._index = np.zeros(0, dtype=int)
+        self._rebuild_count = 0
+
+    def max_displacement(self, positions):
+        """return the maximum displacement of the objects since the
+        last build.
+
+        Parameters
+        ----------
+        positions: np.ndarray
+            the current (N, dim) position of the objects
+        """
+        if self._reference is None or self._reference.shape != positions.shape:
+            return np.inf
+        if len(positions) == 0:
+            return 0.0
+        displacement = positions - self._reference
+        return np.sqrt(np.max(np.einsum("ij,ij->i", displacement, displacement)))
+
+    def update(self, positions, force: bool = False) -> bool:
+        """Rebuild the list if an object has moved more than half of
+        the skin since the last build.
+
+        Parameters
+        ----------
+        positions: np.ndarray
+            the current (N, dim) position of the objects
+        force: bool, default=False
+            rebuild the list regardless of the displacement
+
+        Return
+        ------
+        True if the list is rebuilt
+        """
+        if force or not self.max_displacement(positions) < self._skin / 2:
+            self._row, self._index = self._builder(self.list_radius)
+            self._reference = np.array(positions, dtype=float)
+            self._rebuild_count += 1
+            return True
+        return False
+
+    def prune(self, mask):
+        """Remove the pairs whose target is not accepted anymore, e.g.
+        the target has been bound.
+
+        Parameters
+        ----------
+        mask: np.ndarray
+            boolean array of the targets, the pairs with False target
+            are removed
+
+        Return
+        ------
+        the rows which lose at least one pair
+        """
+        keep = mask[self._index]
+        removed_rows = np.unique(self._row[~keep])
+        self._row = self._row[keep]
+        self._index = self._index[keep]
+        return removed_rows
+
+    def get_state(self):
+        """return the arrays which describe the list, e.g. to save a
+        checkpoint.
+        """
+        reference = self._reference
+        if reference is None:
+            reference = np.zeros((0, 0), dtype=float)
+        return {
+            "row": self._row,
+            "index": self._index,
+            "reference": reference,
+            "rebuild_count": np.array(self._rebuild_count),
+        }
+
+    def set_state(self, row, index, reference, rebuild_count):
+        """Restore the list from the arrays of `get_state`.
+
+        Parameters
+        ----------
+        row, index: np.ndarray
+            the pairs of the list
+        reference: np.ndarray
+            the positions of the objects at the last build, an empty
+            array if the list has never been built
+        rebuild_count: int
+            the number of list builds
+        """
+        self._row = np.array(row, dtype=int)
+        self._index = np.array(index, dtype=int)
+        reference = np.array(reference, dtype=float)
+        self._reference = reference if reference.size else None
+        self._rebuild_count = int(rebuild_count)
+
+    @property
+    def row(self):
+        """return the row of every pair"""
+        return self._row
+
+    @property
+    def index(self):
+        """return the target index of every pair"""
+        return self._index
+
+    @property
+    def radius(self):
+        """return the interaction radius"""
+        return self._radius
+
+    @property
+    def skin(self):
+        """return the skin distance"""
+        return self._skin
+
+    @property
+    def list_radius(self):
+        """return the radius of the list including the skin"""
+        return self._radius + self._skin
+
+    @property
+    def rebuild_count(self):
+        """return the number of list builds"""
+        return self._rebuild_count
@@ -4,22 +4,27 @@
 import os
 from pathlib import Path
 from datetime import datetime
-import itertools
+from weakref import WeakKeyDictionary
 
 # third party imports
 import imageio
 import matplotlib.pyplot as plt
 import numpy as np
 import cv2 as cv
+from matplotlib.cm import ScalarMappable
+from matplotlib.collections import PatchCollection
+from matplotlib.colors import Normalize, to_rgba
 from matplotlib.figure import Figure
-from matplotlib.patches import Circle
+from matplotlib.patches import Circle, PathPatch
 from PIL import Image
 
 # local import
 import physica as psc
 import cell as cel
+import density as dns
 import nanopattern as npt
 import inputfile as ifile
+import trajectory as trj
 
 
 def init_figure():
@@ -88,87 +93,35 @@ def show_all(
     # determine the file name
     namefile = f"{namefolder}/{number:06}.jpg"
     
-    fig.clf()
+    renderer = draw_frame(
+        fig,
+        frame_data(cells, substrate, number),
+        timestep,
+        show_substrate=show_substrate,
+        showintegrin=showintegrin,
+        forcearrow=forcearrow,
+    )
     axis = fig.gca()
-    axis.set_aspect('equal')
-    
-    # print the cells
-    for cell in cells.members:
-        if show_substrate is True:
-            # draw the free ligands
-            psc.circles(
-                axis,
-                substrate.x_pos_list[0],
-                substrate.y_pos_list[0],
-                substrate.ligand_size,
-                "green",
-                alpha=1,
-                ec="none",
-            )
-            # draw the bound ligands
-            psc.circles(
-                axis,
-                substrate.x_pos_list[1],
-                substrate.y_pos_list[1],
-                substrate.ligand_size,
-                "yellow",
-                alpha=1,
-                ec="none",
-            )
-        # draw center of mass
-        cm_position = (cell.x_position, cell.y_position)
-        cm_patch = Circle(cm_position, 2, color="yellow", alpha=0.2)
-        axis.add_patch(cm_patch)
-        # draw the outer layer
-        print(cell.alpha_shape)
-        psc.polygon_patch(axis, cell.alpha_shape, alpha=0.2)
-        if showintegrin is True:
-            # draw the free integrins
-            psc.circles(
-                axis,
-                cell.x_pos_list[0],
-                cell.y_pos_list[0],
-                cell.integrin_size,
-                "red",
-                alpha=1,
-                ec="none",
-            )
-            # draw the bound integrins
-            psc.circles(
-                axis,
-                cell.x_pos_list[1],
-                cell.y_pos_list[1],
-                cell.integrin_size,
-                "yellow",
-                alpha=1,
-                ec="none",
-            )
-            # draw the id
-            if showID is True:
-                for cell_obj in cells.members:
-                    for integrin_obj in cell_obj.integrins:
-                        axis.text(integrin_obj.x_position, integrin_obj.y_position, integrin_obj.id_)
 
-        # draw line between integrins
+    # draw the details which need the objects, they are removed by the
+    # renderer on the next frame
+    extras = renderer.extras
+    for cell in cells.members:
+        if showintegrin is True and showID is True:
+            for integrin_obj in cell.integrins:
+                extras.append(
+                    axis.text(integrin_obj.x_position, integrin_obj.y_position, integrin_obj.id_)
+                )
         for integrin_ in cell.integrins:
             if line is True:
                 for neighbor in integrin_.neighbors:
                     x_line = [integrin_.x_position, neighbor.x_position]
                     y_line = [integrin_.y_position, neighbor.y_position]
-                    axis.plot(x_line, y_line, color="black", linewidth="1", alpha=0.1)
-            if forcearrow is True and integrin_.bound is False:
-                axis.arrow(
-                    integrin_.x_position,
-                    integrin_.y_position,
-                    integrin_.x_force,
-                    integrin_.y_force,
-                    color="blue",
-                    width=0.3,
-                )
+                    extras += axis.plot(x_line, y_line, color="black", linewidth="1", alpha=0.1)
             if showsurface:
                 if integrin_.issurface:
                     monitor = Circle(integrin_.position, integrin_.size, color="blue")
-                    axis.add_patch(monitor)
+                    extras.append(axis.add_patch(monitor))
             if tracking:
                 if integrin_.id_ == trackID:
                     x_neighbor_pos = []
@@ -181,17 +134,12 @@ def show_all(
                     for neighbor in integrin_.neighbors:
                         x_line = [integrin_.x_position, neighbor.x_position]
                         y_line = [integrin_.y_position, neighbor.y_position]
-                        axis.plot(x_line, y_line, color="black", linewidth="1", alpha=0.5)
-                    psc.circles(axis, x_neighbor_pos, y_neighbor_pos, integrin_.size, color="blue")
-                    axis.add_patch(monitor)
-                    axis.add_patch(radar)
-            
-
-    axis.set_xlim(0, substrate.width)
-    axis.set_ylim(0, substrate.height)
-    axis.set_title(f"time = {number*timestep}", fontsize=22)
-    plt.xticks(fontsize=22)
-    plt.yticks(fontsize=22)
+                        extras += axis.plot(x_line, y_line, color="black", linewidth="1", alpha=0.5)
+                    extras.append(
+                        psc.circles(axis, x_neighbor_pos, y_neighbor_pos, integrin_.size, color="blue")
+                    )
+                    extras.append(axis.add_patch(monitor))
+                    extras.append(axis.add_patch(radar))
 
     # save if necessary
     if save is True:
@@ -207,6 +155,7 @@ def contour_plot(
     timestep,
     number=0,
     folder=None,
+    resolution: int = 100,
 ):
     """Procedure to show contour plot of integrin in cells"""
     # determine the folder's name
@@ -221,81 +170,406 @@ def contour_plot(
     # determine the file name
     namefile = f"{namefolder}/C{number:06}.jpg"
 
-    # draw the figure
-    fig.clf()
-    axis = fig.gca()
-    axis.set_aspect('equal')
-
-    # concatenate the list as we treated equally between bounded
-    # integrins and unbounded integrins
-    x_pos_list = list(itertools.chain.from_iterable(cells.x_list))
-    y_pos_list = list(itertools.chain.from_iterable(cells.y_list))
-
-    # get the limit
-    xmin = 0
-    xmax = substrate.width
-    ymin = 0
-    ymax = substrate.height
-
-    xx_grid, yy_grid = np.mgrid[xmin:xmax:100j, ymin:ymax:100j]
-    fig_matrix = np.zeros((100, 100))
-    x_gap = substrate.width / 100
-    y_gap = substrate.height / 100
-    for i in range(len(x_pos_list)):
-        x_index = int(x_pos_list[i] // x_gap)
-        y_index = int(y_pos_list[i] // y_gap)
-        fig_matrix[x_index][y_index] += 1
-
-    fig_matrix_blur = cv.GaussianBlur(fig_matrix, (7, 7), 0)
-
-    # position = np.vstack([xx.ravel(), yy.ravel()])
-    # values = np.vstack([x, y])
-    # kernel = st.gaussian_kde(values)
-    # f = np.reshape(kernel(position).T, xx.shape)
-
-    axis.set_xlim(xmin, xmax)
-    axis.set_ylim(ymin, ymax)
-    cfset = axis.contourf(
-        xx_grid, yy_grid, fig_matrix_blur, cmap="turbo", vmin=0, vmax=0.5
-    )
-    # cset = fig.gca().contour(xx, yy, f, colors='k')
-    # fig.gca().clabel(cset, inline=1, fontsize=10)
-    cbar = fig.colorbar(cfset, aspect=5, shrink=0.5)
-    cbar.set_label(
-        "density (integrin/${\mu}m^2$)", rotation=270, fontsize=22, labelpad=40
-    )
-    cbar.ax.set_label("density (integrin/${\mu}m^2$)")
-    cbar.ax.tick_params(labelsize=22)
-    axis.set_xlabel("X (${\mu}m$)", fontsize=22)
-    axis.set_ylabel("Y (${\mu}m$)", fontsize=22)
-    axis.set_title(f"time = {number*timestep}", fontsize=22)
-    plt.xticks(fontsize=22)
-    plt.yticks(fontsize=22)
+    draw_contour(fig, frame_data(cells, substrate, number), timestep, resolution)
 
     # save if necessary
     fig.savefig(namefile, bbox_inches="tight", dpi=100)
 
 
-def build_GIF(time: datetime):
+def frame_data(cells: cel.Cells, substrate: npt.Nanopattern, number: int = 0) -> dict:
+    """Function to copy the data which is needed to draw a frame, so
+    the frame can be drawn later or in another process.
+
+    Parameter
+    ---------
+    cells: :obj: `Cells`
+        The collection of cell
+    substrate: :obj: `Nanopattern`
+        The nanopatterned substrate which is consisted of ligands
+    number: int, default=0
+        The iteration of the frame
+
+    Return
+    ------
+    dictionary of the size of the substrate, the position and bound
+    status of the ligands and for every cell its center of mass,
+    alpha shape and the position, bound status and force of its
+    integrins
+    """
+    state = cells.state
+    return {
+        "number": number,
+        "width": substrate.width,
+        "height": substrate.height,
+        "ligand_size": substrate.ligand_size,
+        "ligand_position": substrate.positions.copy(),
+        "ligand_bound": substrate.bound_mask.copy(),
+        "cells": [
+            {
+                "center": (cell.x_position, cell.y_position),
+                "shape": cell.shape,
+                "integrin_size": cell.integrin_size,
+                "position": state.position[cell.rows].copy(),
+                "bound": state.bound[cell.rows].copy(),
+                "force": state.force[cell.rows].copy(),
+            }
+            for cell in cells.members
+        ],
+    }
+
+
+class FrameRenderer:
+    """Renderer of the cells and the nanopattern.
+
+    The axis and the collections of the ligands, the centers of mass,
+    the alpha shapes, the integrins and the force arrows are created
+    on the first frame. The next frames only update their offsets,
+    colors and paths.
+    """
+
+    def __init__(
+        self,
+        fig: Figure,
+        timestep,
+        show_substrate: bool = False,
+        showintegrin: bool = True,
+        forcearrow: bool = False,
+    ) -> None:
+        """init function for the frame renderer.
+
+        parameters
+        ----------
+        fig: Figure
+            The figure, it is cleared on the first frame
+        timestep: float
+            The time step of the simulation
+        show_substrate: default=False
+            The plot is not printing the substrate when `False`
+        showintegrin: default=True
+            Whether the plot will include the integrin or not
+        forcearrow: default=False
+            Whether the plot will include arrow which indicates the
+            force vector or not
+        """
+        self.fig = fig
+        self.options = (timestep, show_substrate, showintegrin, forcearrow)
+        # the artists which are removed on the next frame
+        self.extras = []
+        self._axis = None
+        self._sizes = None
+        self._artists = {}
+
+    def _build(self, frame: dict):
+        """create the axis and the collections"""
+        _, show_substrate, showintegrin, forcearrow = self.options
+        self.fig.clf()
+        axis = self.fig.gca()
+        axis.set_aspect('equal')
+        self._artists = {}
+        if show_substrate is True:
+            self._artists["ligands"] = psc.circles(
+                axis,
+                frame["ligand_position"][:, 0],
+                frame["ligand_position"][:, 1],
+                frame["ligand_size"],
+                "green",
+                alpha=1,
+                ec="none",
+            )
+        centers = np.array([cell["center"] for cell in frame["cells"]]).reshape(-1, 2)
+        self._artists["centers"] = psc.circles(
+            axis, centers[:, 0], centers[:, 1], 2, "yellow", alpha=0.2
+        )
+        self._artists["shapes"] = PatchCollection([], alpha=0.2)
+        axis.add_collection(self._artists["shapes"])
+        position = _cell_positions(frame)
+        size = np.concatenate(
+            [np.zeros(0)]
+            + [np.full(len(cell["position"]), cell["integrin_size"]) for cell in frame["cells"]]
+        )
+        if showintegrin is True:
+            self._artists["integrins"] = psc.circles(
+                axis, position[:, 0], position[:, 1], size, "red", alpha=1, ec="none"
+            )
+        if forcearrow is True:
+            self._artists["arrows"] = axis.quiver(
+                position[:, 0],
+                position[:, 1],
+                np.zeros(len(position)),
+                np.zeros(len(position)),
+                color="blue",
+                units="xy",
+                angles="xy",
+                scale_units="xy",
+                scale=1,
+                width=0.3,
+                headwidth=3,
+                headlength=4.5,
+                headaxislength=4.5,
+                minlength=0,
+            )
+        axis.set_xlim(0, frame["width"])
+        axis.set_ylim(0, frame["height"])
+        axis.tick_params(labelsize=22)
+        self._axis = axis
+        self._sizes = _frame_sizes(frame)
+
+    def draw(self, frame: dict):
+        """Procedure to draw a frame.
+
+        Parameter
+        ---------
+        frame: dict
+            The frame data from `frame_data`
+        """
+        if self._axis is None or self._axis.figure is None or self._sizes != _frame_sizes(frame):
+            self._build(frame)
+        for artist in self.extras:
+            artist.remove()
+        self.extras = []
+        artists = self._artists
+        if "ligands" in artists:
+            artists["ligands"].set_facecolor(
+                np.where(frame["ligand_bound"][:, np.newaxis], _YELLOW, _GREEN)
+            )
+        centers = np.array([cell["center"] for cell in frame["cells"]]).reshape(-1, 2)
+        artists["centers"].set_offsets(centers)
+        artists["shapes"].set_paths(
+            [PathPatch(psc.polygon_path(cell["shape"])) for cell in frame["cells"]]
+        )
+        position = _cell_positions(frame)
+        bound = np.concatenate([np.zeros(0, dtype=bool)] + [cell["bound"] for cell in frame["cells"]])
+        if "integrins" in artists:
+            artists["integrins"].set_offsets(position)
+            artists["integrins"].set_facecolor(
+                np.where(bound[:, np.newaxis], _YELLOW, _RED)
+            )
+        if "arrows" in artists:
+            force = np.concatenate([np.zeros((0, 2))] + [cell["force"] for cell in frame["cells"]])
+            force[bound] = 0.0
+            artists["arrows"].set_offsets(position)
+            artists["arrows"].set_UVC(force[:, 0], force[:, 1])
+        self._axis.set_title(f"time = {frame['number']*self.options[0]}", fontsize=22)
+
+
+class ContourRenderer:
+    """Renderer of the contour plot of the integrin density.
+
+    The axis, the labels and the colorbar are created on the first
+    frame, the next frames only replace the filled contour.
+    """
+
+    def __init__(self, fig: Figure, timestep, resolution: int = 100) -> None:
+        """init function for the contour renderer.
+
+        parameters
+        ----------
+        fig: Figure
+            The figure, it is cleared on the first frame
+        timestep: float
+            The time step of the simulation
+        resolution: int, default=100
+            The number of bins of the density map in every axis
+        """
+        self.fig = fig
+        self.options = (timestep, resolution)
+        self._axis = None
+        self._limit = None
+        self._contour = None
+
+    def _build(self, frame: dict):
+        """create the axis and the colorbar"""
+        self.fig.clf()
+        axis = self.fig.gca()
+        axis.set_aspect('equal')
+        axis.set_xlim(0, frame["width"])
+        axis.set_ylim(0, frame["height"])
+        mappable = ScalarMappable(norm=Normalize(vmin=0, vmax=0.5), cmap="turbo")
+        cbar = self.fig.colorbar(mappable, ax=axis, aspect=5, shrink=0.5)
+        cbar.set_label(
+            "density (integrin/${\\mu}m^2$)", rotation=270, fontsize=22, labelpad=40
+        )
+        cbar.ax.tick_params(labelsize=22)
+        axis.set_xlabel("X (${\\mu}m$)", fontsize=22)
+        axis.set_ylabel("Y (${\\mu}m$)", fontsize=22)
+        axis.tick_params(labelsize=22)
+        self._axis = axis
+        self._limit = (frame["width"], frame["height"])
+        self._contour = None
+
+    def draw(self, frame: dict):
+        """Procedure to draw a frame.
+
+        Parameter
+        ---------
+        frame: dict
+            The frame data from `frame_data`
+        """
+        if (
+            self._axis is None
+            or self._axis.figure is None
+            or self._limit != (frame["width"], frame["height"])
+        ):
+            self._build(frame)
+        resolution = self.options[1]
+        xx_grid, yy_grid = np.mgrid[
+            0:frame["width"]:resolution * 1j, 0:frame["height"]:resolution * 1j
+        ]
+        fig_matrix = dns.histogram(
+            _cell_positions(frame), frame["width"], frame["height"], resolution
+        )
+        fig_matrix_blur = cv.GaussianBlur(fig_matrix, (7, 7), 0)
+
+        if self._contour is not None:
+            # ContourSet.remove only exists since matplotlib 3.8
+            if hasattr(self._contour, "remove"):
+                self._contour.remove()
+            else:
+                for collection in self._contour.collections:
+                    collection.remove()
+        self._contour = self._axis.contourf(
+            xx_grid, yy_grid, fig_matrix_blur, cmap="turbo", vmin=0, vmax=0.5
+        )
+        self._axis.set_title(f"time = {frame['number']*self.options[0]}", fontsize=22)
+
+
+# the colors of the free and bound objects
+_GREEN = to_rgba("green")
+_RED = to_rgba("red")
+_YELLOW = to_rgba("yellow")
+
+# the renderer of every figure
+_renderers = WeakKeyDictionary()
+
+
+def _cell_positions(frame: dict):
+    """return the position of every integrin of a frame"""
+    return np.concatenate([np.zeros((0, 2))] + [cell["position"] for cell in frame["cells"]])
+
+
+def _frame_sizes(frame: dict):
+    """return the number of ligands and integrins of every cell"""
+    return (len(frame["ligand_position"]),) + tuple(len(cell["position"]) for cell in frame["cells"])
+
+
+def _renderer(fig: Figure, renderer_class, *options):
+    """return the renderer of a figure, it is created if the figure
+    has no renderer of the class and the options
+    """
+    renderer = _renderers.get(fig)
+    if not isinstance(renderer, renderer_class) or renderer.options != options:
+        renderer = renderer_class(fig, *options)
+        _renderers[fig] = renderer
+    return renderer
+
+
+def draw_frame(
+    fig: Figure,
+    frame: dict,
+    timestep,
+    show_substrate: bool = False,
+    showintegrin: bool = True,
+    forcearrow: bool = False,
+):
+    """Procedure to draw the cells and the nanopattern of a frame with
+    the `FrameRenderer` of the figure.
+
+    Parameter
+    ---------
+    fig: Figure
+        The figure
+    frame: dict
+        The frame data from `frame_data`
+    timestep, show_substrate, showintegrin, forcearrow:
+        The options of `FrameRenderer`
+
+    Return
+    ------
+    the renderer of the figure
+    """
+    renderer = _renderer(fig, FrameRenderer, timestep, show_substrate, showintegrin, forcearrow)
+    renderer.draw(frame)
+    return renderer
+
+
+def draw_contour(fig: Figure, frame: dict, timestep, resolution: int = 100):
+    """Procedure to draw the contour plot of the integrin density of a
+    frame with the `ContourRenderer` of the figure.
+
+    Parameter
+    ---------
+    fig: Figure
+        The figure
+    frame: dict
+        The frame data from `frame_data`
+    timestep: float
+        The time step of the simulation
+    resolution: int, default=100
+        The number of bins of the density map in every axis
+
+    Return
+    ------
+    the renderer of the figure
+    """
+    renderer = _renderer(fig, ContourRenderer, timestep, resolution)
+    renderer.draw(frame)
+    return renderer
+
+
+def build_GIF(
+    time: datetime,
+    stride: int = 1,
+    size: int = 1000,
+    fps: float = 5,
+    movie_format: str = "gif",
+):
     """function to generate GIF using python
 
+    The figures are read, resized and appended to the movie one at a
+    time, so only one frame is kept in memory.
+
     parameter
     ---------
     time: datetime
         start time of simulation, to generate a specific folder
+    stride: int, default=1
+        only every `stride`-th figure is used
+    size: int, default=1000
+        the width and height of the frames in pixel, the figures are
+        not resized if it is 0 or None
+    fps: float, default=5
+        the number of frames per second
+    movie_format: str, default='gif'
+        'gif' or 'mp4', mp4 needs the imageio-ffmpeg package
+
+    return
+    ------
+    the path of the movie
     """
     image_dir = f"./output/{psc.time_format(time)}-output/figure/newsimulate"
     gif_dir = f"./output/{psc.time_format(time)}-output/figure/gif"
     Path(gif_dir).mkdir(parents=True, exist_ok=True)
-    images = []
-    for namefile in sorted(os.listdir(image_dir)):
-        if namefile.endswith(".jpg"):
-            pathfile = os.path.join(image_dir, namefile)
-            images.append(
-                Image.fromarray(imageio.imread(pathfile)).resize((1000, 1000))
-            )
-    pathgif = os.path.join(gif_dir, "simulation.gif")
-    imageio.mimsave(pathgif, images, fps=5)
+    # the contour figures (C######.jpg) are not part of the movie
+    namefiles = sorted(
+        namefile
+        for namefile in os.listdir(image_dir)
+        if namefile.endswith(".jpg") and namefile[:-4].isdigit()
+    )[::max(int(stride), 1)]
+    pathgif = os.path.join(gif_dir, f"simulation.{movie_format}")
+    if movie_format == "gif":
+        # the GIF-PIL writer writes every frame when it is appended
+        writer = imageio.get_writer(pathgif, format="GIF-PIL", mode="I", fps=fps)
+    else:
+        writer = imageio.get_writer(pathgif, mode="I", fps=fps)
+    with writer:
+        for namefile in namefiles:
+            with Image.open(os.path.join(image_dir, namefile)) as image:
+                image = image.convert("RGB")
+                if size:
+                    image = image.resize((int(size), int(size)))
+                writer.append_data(np.asarray(image))
+    return pathgif
+
 
 def plot_energy():
     """method to plot the energy from energy file"""
@@ -329,7 +603,7 @@ def plot_energy():
 def _plot_map(fig: Figure, map_type: str, folder_code: str, file_timestamp: str):
     """method to plot map"""
     if map_type in ["patmap", "PATMAP", "nanopattern"]:
-        file_dir = f"./output/{folder_code}-output/file/PATMAP/PATMAP{int(file_timestamp):06}.txt"
+        file_dir = trj.text_file(folder_code, "PATMAP", file_timestamp)
         print(f"open: {file_dir}")
         with open(file_dir, "r", encoding="utf-8") as data_file:
             lst_strng = data_file.readlines()
@@ -365,7 +639,7 @@ def _plot_map(fig: Figure, map_type: str, folder_code: str, file_timestamp: str)
             ec="none",
         )
     elif map_type in ["celmap", "CELMAP", "cell", "cells"]:
-        file_dir = f"./output/{folder_code}-output/file/CELMAP/CELMAP{int(file_timestamp):06}.txt"
+        file_dir = trj.text_file(folder_code, "CELMAP", file_timestamp)
         print(f"open: {file_dir}")
         with open(file_dir, "r", encoding="utf-8") as data_file:
             lst_strng = data_file.readlines()
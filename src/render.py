@@ -0,0 +1,166 @@
+"""render module
+
+This module contains the render pool which draws the figures of the
+simulation (`plotter.show_all` and `plotter.contour_plot`) in worker
+processes. The simulation only copies the frame data with
+`plotter.frame_data` and every worker draws it on its own figures, so
+the stepping loop does not wait for matplotlib.
+
+"""
+
+# built-in import
+import atexit
+import multiprocessing as mp
+from collections import deque
+from pathlib import Path
+
+# third party import
+import matplotlib.pyplot as plt
+
+# local import
+import plotter
+
+# the figures of the worker process
+_figures = {}
+
+
+def _init_worker():
+    """the initializer of a worker process, it creates the figures"""
+    plt.switch_backend("Agg")
+    _figures["cell"] = plotter.init_figure()
+    _figures["contour"] = plotter.init_figure()
+
+
+def _render(frame, namefolder, timestep, options):
+    """draw the figures of one frame in a worker process
+
+    Return
+    ------
+    the names of the saved files
+    """
+    Path(namefolder).mkdir(parents=True, exist_ok=True)
+    namefiles = []
+    if options["save_fig"]:
+        plotter.draw_frame(
+            _figures["cell"],
+            frame,
+            timestep,
+            show_substrate=options["show_substrate"],
+            showintegrin=options["showintegrin"],
+            forcearrow=options["forcearrow"],
+        )
+        namefiles.append(f"{namefolder}/{frame['number']:06}.jpg")
+        _figures["cell"].savefig(namefiles[-1], bbox_inches="tight", dpi=100)
+    if options["contour"]:
+        plotter.draw_contour(
+            _figures["contour"], frame, timestep, options["resolution"]
+        )
+        namefiles.append(f"{namefolder}/C{frame['number']:06}.jpg")
+        _figures["contour"].savefig(namefiles[-1], bbox_inches="tight", dpi=100)
+    return namefiles
+
+
+class RenderPool:
+    """Pool of worker processes which draws the figures.
+
+    The frames are rendered asynchronously and the results are
+    collected in the order of submission. If too many frames are
+    waiting, `submit` waits for the oldest one.
+
+    The workers are forked, so the pool is only available on the
+    platforms with the 'fork' start method.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        namefolder: str,
+        timestep,
+        save_fig: bool = True,
+        contour: bool = False,
+        show_substrate: bool = True,
+        showintegrin: bool = True,
+        forcearrow: bool = False,
+        resolution: int = 100,
+        max_pending: int = None,
+    ) -> None:
+        """init function for the render pool.
+
+        parameters
+        ----------
+        workers: int
+            the number of worker processes
+        namefolder: str
+            the folder of the figures
+        timestep: float
+            the time step of the simulation
+        save_fig: bool, default=True
+            draw the cells and the nanopattern
+        contour: bool, default=False
+            draw the contour plot
+        show_substrate, showintegrin, forcearrow:
+            the options of `plotter.draw_frame`
+        resolution: int, default=100
+            the resolution of the contour plot
+        max_pending: int, default=None
+            the maximum number of frames which are not rendered yet,
+            two frames for every worker if None
+        """
+        self._namefolder = namefolder
+        self._timestep = timestep
+        self._options = {
+            "save_fig": save_fig,
+            "contour": contour,
+            "show_substrate": show_substrate,
+            "showintegrin": showintegrin,
+            "forcearrow": forcearrow,
+            "resolution": resolution,
+        }
+        self._max_pending = max_pending or 2 * workers
+        self._pending = deque()
+        self._pool = mp.get_context("fork").Pool(workers, initializer=_init_worker)
+        self._workers = workers
+        atexit.register(self.close)
+
+    def submit(self, frame: dict):
+        """Procedure to render a frame.
+
+        Parameter
+        ---------
+        frame: dict
+            the frame data from `plotter.frame_data`
+        """
+        while len(self._pending) >= self._max_pending:
+            self._collect()
+        self._pending.append(
+            self._pool.apply_async(
+                _render, (frame, self._namefolder, self._timestep, self._options)
+            )
+        )
+        # collect the finished frames in order
+        while self._pending and self._pending[0].ready():
+            self._collect()
+
+    def _collect(self):
+        """wait for the oldest frame, the errors of the worker are
+        raised here
+        """
+        for namefile in self._pending.popleft().get():
+            print(f"SYSTEM: figure {Path(namefile).name} saved on {self._namefolder}")
+
+    def close(self):
+        """Procedure to wait for every frame and stop the workers"""
+        if self._pool is None:
+            return
+        try:
+            while self._pending:
+                self._collect()
+        finally:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    @property
+    def workers(self):
+        """return the number of worker processes"""
+        return self._workers
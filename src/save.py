@@ -1,17 +1,45 @@
 """The saving data procedure functions"""
 
 # built-in import
+import atexit
+import copy
+import queue
 import shutil
+import threading
 from datetime import datetime
 from pathlib import Path
 
+# third party import
+import numpy as np
+
 # local import
 import cell as cel
+import density as dns
 import nanopattern as npt
 import physica as psc
+import trajectory as trj
+
+# the formats of the map data
+TEXT = 0
+BINARY = 1
+BOTH = 2
+
+# the open trajectory writers, by folder
+_writers: dict = {}
+# the rows of the time series waiting to be written, by file
+_buffers: dict = {}
+# the writer thread, the outputs are written in place if it is None
+_async_writer = None
 
 
-def save(save_obj, time: datetime, num_iteration: int = 0, timestep=1.0, data_type: str = None):
+def save(
+    save_obj,
+    time: datetime,
+    num_iteration: int = 0,
+    timestep=1.0,
+    data_type: str = None,
+    map_format: int = TEXT,
+):
     """function to save the data into file
 
     The objects that can be converted into text data are as follows:
@@ -20,10 +48,16 @@ def save(save_obj, time: datetime, num_iteration: int = 0, timestep=1.0, data_ty
     - Cells object
         - CELLEN (Energy)
         - CELLMAP (Map)
+        - CELNBR (Neighbors)
         - CELLAR (Area)
         - CELLCM (Center of Mass)
+    - DensityMap object
+        - DENSITY (time-averaged density map)
     - Input files
 
+    The data is copied from the object and written by the writer
+    thread if it is started by `start`, otherwise in place.
+
     Parameter
     ---------
     save_obj
@@ -35,172 +69,451 @@ def save(save_obj, time: datetime, num_iteration: int = 0, timestep=1.0, data_ty
     data_type: str, default=None
         type of of generated file, it need to be specified if the
         object is `Cells`
+    map_format: int, default=TEXT
+        the format of the map data (PATMAP, CELMAP and CELNBR), TEXT
+        for the text files, BINARY for the binary trajectories
+        (PATTRJ and CELTRJ) or BOTH
     """
     # PATMAP
     if isinstance(save_obj, npt.Nanopattern):
-        namefolder = f"./output/{psc.time_format(time)}-output/file/PATMAP"
-        # build the folder
-        Path(namefolder).mkdir(parents=True, exist_ok=True)
-        # determine the name of the file
-        namefile = f"{namefolder}/PATMAP{num_iteration:06}.txt"
-        head_text = "ligand_id\tbound\t"
-        head_text += "x_grid\ty_grid\t"
-        head_text += "x_pos\ty_pos\t"
-        head_text += "cell_target\tint_target\t"
-        head_text += "\n"
-        with open(namefile, "w", encoding="utf-8") as output:
-            output.write(f"size\t{save_obj.ligand_size}\n\n")
-            output.write(head_text)
-        for i in range(len(save_obj._grid)):
-            for j in range(len(save_obj._grid[i])):
-                for member in save_obj._grid[i][j]:
-                    content = f"{member.id_}\t{int(member.bound)}\t"
-                    content += f"{j}\t{i}\t"
-                    content += f"{member.x_position}\t{member.y_position}\t"
-                    if int(member.bound) == 1:
-                        content += f"{member.target_cell_id}\t{member.target_integrin_id}\t"
-                    else:
-                        content += f"{None}\t{None}\t"
-                    content += "\n"
-                    with open(namefile, "a", encoding="utf-8") as output:
-                        output.write(content)
-
+        namefolder = f"./output/{psc.time_format(time)}-output/file"
+        static = patmap_static(save_obj)
+        frame = patmap_frame(save_obj, static)
+        _submit(_write_map, namefolder, "PATMAP", num_iteration, static, frame, map_format)
 
     # CELLS
     elif isinstance(save_obj, cel.Cells):
         # CELLEN
         if data_type in ("energy", "E", "EN", "Energy", "CELLEN"):
             namefolder = f"./output/{psc.time_format(time)}-output/file"
-            # build the folder
-            Path(namefolder).mkdir(parents=True, exist_ok=True)
-            # determine the name of the file
-            namefile = f"{namefolder}/CELLEN.txt"
+            head_text = None
             if num_iteration <= 0:
                 head_text = "t\t"
                 for cell in save_obj.members:
                     head_cell = f"EK{cell.id_}\tEP{cell.id_}\tEB{cell.id_}"
                     head_text += head_cell
                 head_text += "\n"
-                # save the data
-                with open(namefile, "w", encoding="utf-8") as output:
-                    output.write(head_text)
-            output_text = f"{round(num_iteration*timestep, 3)}\t"
+            values = [round(num_iteration * timestep, 3)]
             for cell in save_obj.members:
-                cell_output = f"{cell.kinetic_energy}\t{cell.potential_energy}\t{cell.bonding_energy}\t"
-                output_text += cell_output
-            output_text += "\n"
-            # save the data
-            with open(namefile, "a", encoding="utf-8") as output:
-                output.write(output_text)
+                values += [cell.kinetic_energy, cell.potential_energy, cell.bonding_energy]
+            _submit(_write_series, f"{namefolder}/CELLEN.txt", head_text, values)
 
         # CELMAP
         elif data_type in ("MAP", "CELMAP", "map"):
-            namefolder = f"./output/{psc.time_format(time)}-output/file/CELMAP"
-            # build the folder
-            Path(namefolder).mkdir(parents=True, exist_ok=True)
-            # determine the name of the file
-            namefile = f"{namefolder}/CELMAP{num_iteration:06}.txt"
-            head_text = "cell_id\tintegrin_id\tbound\t"
-            head_text += "x_pos\ty_pos\t"
-            head_text += "vx_pos\tvy_pos\t"
-            head_text += "ax_pos\tay_pos\t"
-            head_text += "\n"
-            # save the data
-            with open(namefile, "w", encoding="utf-8") as output:
-                output.write(head_text)
-            for cell in save_obj.members:
-                for integrin in cell.integrins:
-                    content = f"{cell.id_}\t{integrin.id_}\t{int(integrin.bound)}\t"
-                    content += f"{integrin.x_position}\t{integrin.y_position}\t"
-                    content += f"{integrin.x_velocity}\t{integrin.y_velocity}\t"
-                    content += f"{integrin.x_acceleration}\t{integrin.y_acceleration}"
-                    content += f"{integrin.x_force}\t{integrin.y_force}"
-                    content += "\n"
-                    with open(namefile, "a", encoding="utf-8") as output:
-                        output.write(content)
-        
-        #CELNBR
+            namefolder = f"./output/{psc.time_format(time)}-output/file"
+            static = celmap_static(save_obj)
+            frame = {key: value.copy() for key, value in celmap_frame(save_obj).items()}
+            _submit(_write_map, namefolder, "CELMAP", num_iteration, static, frame, map_format)
+
+        # CELNBR, the neighbors are also stored in the static arrays of
+        # the binary trajectory
         elif data_type in ("NBR", "CELNBR", "Neighbors"):
             namefolder = f"./output/{psc.time_format(time)}-output/file"
-            # build the folder
-            Path(namefolder).mkdir(parents=True, exist_ok=True)
-            # determine the name of the file
-            namefile = f"{namefolder}/CELNBR.txt"
-            head_text = "cell_id\tintegrin_id\tneighbour_id\n"
-            # save the data
-            with open(namefile, "w", encoding="utf-8") as output:
-                output.write(head_text)
-            for cell in save_obj.members:
-                for integrin in cell.integrins:
-                    content = f"{cell.id_}\t{integrin.id_}"
-                    for id_ in integrin.neighbors_id:
-                        content += f"\t{id_}"
-                    content += "\n"
-                    with open(namefile, "a", encoding="utf-8") as output:
-                        output.write(content)
+            static = celmap_static(save_obj)
+            _submit(_write_map, namefolder, "CELNBR", num_iteration, static, None, map_format)
 
         # CELLAR
         elif data_type in ("area", "Area", "CELLAR"):
             namefolder = f"./output/{psc.time_format(time)}-output/file"
-            # build the folder
-            Path(namefolder).mkdir(parents=True, exist_ok=True)
-            # determine the name of the file
-            namefile = f"{namefolder}/CELLAR.txt"
+            head_text = None
             if num_iteration <= 0:
                 head_text = "t\t"
                 for cell in save_obj.members:
                     head_cell = f"A{cell.id_}\t"
                     head_text += head_cell
                 head_text += "\n"
-                # save the data
-                with open(namefile, "w", encoding="utf-8") as output:
-                    output.write(head_text)
-            output_text = f"{round(num_iteration*timestep, 3)}\t"
+            values = [round(num_iteration * timestep, 3)]
             for cell in save_obj.members:
-                area = round(cell.alpha_shape.area, 2)
-                cell_output = f"{area}\t"
-                output_text += cell_output
-            output_text += "\n"
-            # save the data
-            with open(namefile, "a", encoding="utf-8") as output:
-                output.write(output_text)
+                values.append(round(cell.area, 2))
+            _submit(_write_series, f"{namefolder}/CELLAR.txt", head_text, values)
             print(f"SYSTEM: CELLAR updated on {namefolder}")
 
         # CELLCM
         elif data_type in ("CELLCM", "CM", "COM"):
             namefolder = f"./output/{psc.time_format(time)}-output/file"
-            # build the folder
-            Path(namefolder).mkdir(parents=True, exist_ok=True)
-            # determine the name of the file
-            namefile = f"{namefolder}/CELLCM.txt"
+            head_text = None
             if num_iteration <= 0:
                 head_text = "t\t"
                 for cell in save_obj.members:
                     head_cell = f"x{cell.id_}\ty{cell.id_}\tn{cell.id_}\t"
                     head_text += head_cell
                 head_text += "\n"
-                # save the data
-                with open(namefile, "w", encoding="utf-8") as output:
-                    output.write(head_text)
-            output_text = f"{round(num_iteration*timestep, 3)}\t"
+            values = [round(num_iteration * timestep, 3)]
             for cell in save_obj.members:
-                cell_output = (
-                    f"{cell.x_position}\t{cell.y_position}\t{cell.total_bound}\t"
-                )
-                output_text += cell_output
-            output_text += "\n"
-            # save the data
-            with open(namefile, "a", encoding="utf-8") as output:
-                output.write(output_text)
+                values += [cell.x_position, cell.y_position, cell.total_bound]
+            _submit(_write_series, f"{namefolder}/CELLCM.txt", head_text, values)
             print(f"SYSTEM: CELLCM updated on {namefolder}")
-    
+
+    # DENSITY
+    elif isinstance(save_obj, dns.DensityMap):
+        namefile = dns.density_file(time)
+        _submit(_write_density, namefile, copy.deepcopy(save_obj))
+
     # INPUT
     elif isinstance(save_obj, str):
         if save_obj in ("input", "INPUT", "Input"):
             namefolder = f"./output/{psc.time_format(time)}-output/input"
-            Path(namefolder).mkdir(parents=True, exist_ok=True)
-            shutil.copy2("./input/PATCON.txt", namefolder)
-            shutil.copy2("./input/CELCON.txt", namefolder)
-            shutil.copy2("./input/SIMCON.txt", namefolder)
+            _submit(_copy_input, namefolder)
             print(f"SYSTEM: input file has been copied on {namefolder}")
-    
+
+
+def _write_series(namefile: str, head_text, values: list):
+    """Procedure to add a row into a time series file (CELLEN, CELLAR
+    or CELLCM). The row is buffered until the buffers are written.
+
+    Parameters
+    ----------
+    namefile: str
+        the name of the file
+    head_text: str or None
+        the head of the file, the file is created if it is given
+    values: list
+        the time and the values of every cell
+    """
+    if head_text is not None:
+        Path(namefile).parent.mkdir(parents=True, exist_ok=True)
+        _buffers.pop(namefile, None)
+        with open(namefile, "w", encoding="utf-8") as output:
+            output.write(head_text)
+    row = "".join(f"{value}\t" for value in values) + "\n"
+    _buffers.setdefault(namefile, []).append(row)
+
+
+def _write_buffers():
+    """Procedure to append the buffered rows into their files"""
+    for namefile, rows in _buffers.items():
+        Path(namefile).parent.mkdir(parents=True, exist_ok=True)
+        with open(namefile, "a", encoding="utf-8") as output:
+            output.writelines(rows)
+    _buffers.clear()
+
+
+def _write_map(namefolder, map_name, num_iteration, static, frame, map_format):
+    """Procedure to write a map (PATMAP, CELMAP or CELNBR) as text
+    and/or as a frame of the binary trajectory.
+    """
+    trajectory_name = "PATTRJ" if map_name == "PATMAP" else "CELTRJ"
+    if map_format in (BINARY, BOTH):
+        writer = _writer(f"{namefolder}/{trajectory_name}", static)
+        if frame is not None:
+            writer.append(num_iteration, **frame)
+    if map_format in (TEXT, BOTH):
+        if map_name == "CELNBR":
+            Path(namefolder).mkdir(parents=True, exist_ok=True)
+            with open(f"{namefolder}/CELNBR.txt", "w", encoding="utf-8") as output:
+                output.write(celnbr_text(static))
+            return
+        Path(f"{namefolder}/{map_name}").mkdir(parents=True, exist_ok=True)
+        namefile = f"{namefolder}/{map_name}/{map_name}{num_iteration:06}.txt"
+        text = patmap_text if map_name == "PATMAP" else celmap_text
+        with open(namefile, "w", encoding="utf-8") as output:
+            output.write(text({**static, **frame}))
+
+
+def _write_density(namefile, density_map):
+    """Procedure to write the density map"""
+    density_map.save(namefile)
+
+
+def _copy_input(namefolder):
+    """Procedure to copy the input files"""
+    Path(namefolder).mkdir(parents=True, exist_ok=True)
+    shutil.copy2("./input/PATCON.txt", namefolder)
+    shutil.copy2("./input/CELCON.txt", namefolder)
+    shutil.copy2("./input/SIMCON.txt", namefolder)
+
+
+def patmap_static(substrate) -> dict:
+    """return the arrays of the ligands which never change during the
+    simulation. The ligands are ordered by their grid, ungrouped
+    ligands are excluded.
+    """
+    members = [
+        (member._index, member.id_, j, i)
+        for i, row in enumerate(substrate._grid)
+        for j, grid in enumerate(row)
+        for member in grid
+    ]
+    index, ligand_id, x_grid, y_grid = np.array(members, dtype=int).reshape(-1, 4).T
+    return {
+        "ligand_size": np.array(substrate.ligand_size),
+        "index": index,
+        "ligand_id": ligand_id,
+        "x_grid": x_grid,
+        "y_grid": y_grid,
+        "position": substrate.positions[index],
+    }
+
+
+def patmap_frame(substrate, static: dict) -> dict:
+    """return the arrays of the ligands which change during the
+    simulation, in the order of `patmap_static`. The target of the
+    free ligands is -1.
+    """
+    index = static["index"]
+    bound = substrate.bound_mask[index]
+    target = np.full((len(index), 2), -1, dtype=int)
+    for k in np.flatnonzero(bound):
+        ligand_ = substrate.ligands[index[k]]
+        target[k] = (ligand_.target_cell_id, ligand_.target_integrin_id)
+    return {"bound": bound, "target": target}
+
+
+def patmap_text(arrays: dict) -> str:
+    """return the PATMAP text of the ligand arrays"""
+    head_text = "ligand_id\tbound\t"
+    head_text += "x_grid\ty_grid\t"
+    head_text += "x_pos\ty_pos\t"
+    head_text += "cell_target\tint_target\t"
+    head_text += "\n"
+    lines = [f"size\t{arrays['ligand_size'].item()}\n\n", head_text]
+    rows = zip(
+        arrays["ligand_id"].tolist(),
+        arrays["bound"].tolist(),
+        arrays["x_grid"].tolist(),
+        arrays["y_grid"].tolist(),
+        arrays["position"].tolist(),
+        arrays["target"].tolist(),
+    )
+    for id_, bound, x_grid, y_grid, (x_pos, y_pos), (cell_id, integrin_id) in rows:
+        content = f"{id_}\t{int(bound)}\t{x_grid}\t{y_grid}\t{x_pos}\t{y_pos}\t"
+        if bound:
+            content += f"{cell_id}\t{integrin_id}\t"
+        else:
+            content += f"{None}\t{None}\t"
+        lines.append(content + "\n")
+    return "".join(lines)
+
+
+def celmap_static(cells) -> dict:
+    """return the arrays of the integrins which never change during
+    the simulation, in the order of the state rows. The neighbors of
+    every integrin are flattened with their count.
+    """
+    state = cells.state
+    neighbor_id = [id_ for integrin_ in state.integrins for id_ in integrin_.neighbors_id]
+    return {
+        "cell_id": state.cell_id,
+        "integrin_id": state.integrin_id,
+        "neighbor_id": np.array(neighbor_id, dtype=int),
+        "neighbor_count": np.array(
+            [len(integrin_.neighbors) for integrin_ in state.integrins], dtype=int
+        ),
+    }
+
+
+def celmap_frame(cells) -> dict:
+    """return the arrays of the integrins which change during the
+    simulation
+    """
+    state = cells.state
+    return {
+        "bound": state.bound,
+        "position": state.position,
+        "velocity": state.velocity,
+        "acceleration": state.acceleration,
+        "force": state.force,
+    }
+
+
+def celmap_text(arrays: dict) -> str:
+    """return the CELMAP text of the integrin arrays"""
+    head_text = "cell_id\tintegrin_id\tbound\t"
+    head_text += "x_pos\ty_pos\t"
+    head_text += "vx_pos\tvy_pos\t"
+    head_text += "ax_pos\tay_pos\t"
+    head_text += "fx\tfy\t"
+    head_text += "\n"
+    lines = [head_text]
+    rows = zip(
+        arrays["cell_id"].tolist(),
+        arrays["integrin_id"].tolist(),
+        arrays["bound"].tolist(),
+        arrays["position"].tolist(),
+        arrays["velocity"].tolist(),
+        arrays["acceleration"].tolist(),
+        arrays["force"].tolist(),
+    )
+    for cell_id, id_, bound, (x, y), (vx, vy), (ax, ay), (fx, fy) in rows:
+        lines.append(
+            f"{cell_id}\t{id_}\t{int(bound)}\t{x}\t{y}\t{vx}\t{vy}\t{ax}\t{ay}\t{fx}\t{fy}\n"
+        )
+    return "".join(lines)
+
+
+def celnbr_text(arrays: dict) -> str:
+    """return the CELNBR text of the integrin arrays"""
+    lines = ["cell_id\tintegrin_id\tneighbour_id\n"]
+    neighbors = np.split(arrays["neighbor_id"], np.cumsum(arrays["neighbor_count"])[:-1])
+    for cell_id, id_, neighbor_id in zip(
+        arrays["cell_id"].tolist(), arrays["integrin_id"].tolist(), neighbors
+    ):
+        content = f"{cell_id}\t{id_}"
+        for neighbor in neighbor_id.tolist():
+            content += f"\t{neighbor}"
+        lines.append(content + "\n")
+    return "".join(lines)
+
+
+def _writer(folder: str, static: dict) -> trj.TrajectoryWriter:
+    """return the trajectory writer of a folder, it is created with the
+    static arrays on the first call
+    """
+    if folder not in _writers:
+        _writers[folder] = trj.TrajectoryWriter(folder, static)
+    return _writers[folder]
+
+
+class AsyncWriter:
+    """Writer thread of the output.
+
+    The simulation puts the tasks, i.e. a write function with the
+    snapshot of its data, into a bounded queue and the thread executes
+    them in order. The rows of the time series are buffered and
+    written when the queue is empty. If the queue is full, the
+    simulation waits for the writer.
+    """
+
+    def __init__(self, queue_size: int = 64) -> None:
+        """init function for the writer thread.
+
+        parameters
+        ----------
+        queue_size: int, default=64
+            the maximum number of waiting tasks
+        """
+        self._queue = queue.Queue(maxsize=max(queue_size, 1))
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name="save-writer", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        """the loop of the writer thread"""
+        while True:
+            task = self._queue.get()
+            try:
+                if task is None:
+                    return
+                # the tasks after an error are skipped
+                if self._error is None:
+                    function, args = task
+                    function(*args)
+                    if self._queue.empty():
+                        _write_buffers()
+            except Exception as error:  # pylint: disable=broad-except
+                self._error = error
+            finally:
+                self._queue.task_done()
+
+    def _raise_error(self):
+        """raise the error of the writer thread in the caller"""
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def submit(self, function, *args):
+        """Procedure to put a task into the queue"""
+        self._raise_error()
+        self._queue.put((function, args))
+
+    def drain(self):
+        """Procedure to wait until every task in the queue is done"""
+        self._queue.join()
+        self._raise_error()
+
+    def close(self):
+        """Procedure to execute the remaining tasks and stop the
+        thread
+        """
+        self._queue.put(None)
+        self._thread.join()
+        self._raise_error()
+
+
+def start(queue_size: int = 64):
+    """Procedure to start the writer thread, the next outputs are
+    written in the background until `close` is called.
+
+    Parameter
+    ---------
+    queue_size: int, default=64
+        the maximum number of outputs waiting to be written
+    """
+    global _async_writer  # pylint: disable=global-statement
+    if _async_writer is None:
+        _async_writer = AsyncWriter(queue_size)
+        atexit.register(close)
+
+
+def _submit(function, *args):
+    """Procedure to execute a write task, in the writer thread if it
+    is started.
+    """
+    if _async_writer is None:
+        function(*args)
+        _write_buffers()
+    else:
+        _async_writer.submit(function, *args)
+
+
+def _flush_all():
+    """Procedure to write the buffered rows and the frames of every
+    trajectory which are still in memory.
+    """
+    _write_buffers()
+    for writer in _writers.values():
+        writer.flush()
+
+
+def flush():
+    """Procedure to write every output which is still waiting in the
+    queue or in memory, e.g. before a checkpoint.
+    """
+    _submit(_flush_all)
+    if _async_writer is not None:
+        _async_writer.drain()
+
+
+def close():
+    """Procedure to write the remaining outputs, stop the writer
+    thread and close every trajectory writer. It must be called at the
+    end of the simulation.
+    """
+    global _async_writer  # pylint: disable=global-statement
+    flush()
+    if _async_writer is not None:
+        writer, _async_writer = _async_writer, None
+        writer.close()
+    _writers.clear()
+
+
+def truncate(time: datetime, num_iteration: int, timestep=1.0):
+    """function to remove the rows written after an iteration from the
+    time series files (CELLEN, CELLAR and CELLCM) and the frames from
+    the binary trajectories, e.g. when the simulation is resumed from
+    a checkpoint.
+
+    Parameter
+    ---------
+    time: datetime
+        time of simulation
+    num_iteration: int
+        the last iteration to be kept
+    timestep: float, default=1.0
+        the time step of the simulation
+    """
+    last_time = round(num_iteration * timestep, 3)
+    namefolder = f"./output/{psc.time_format(time)}-output/file"
+    for data_type in ("CELLEN", "CELLAR", "CELLCM"):
+        namefile = Path(f"{namefolder}/{data_type}.txt")
+        if not namefile.exists():
+            continue
+        with open(namefile, "r", encoding="utf-8") as data_file:
+            lines = data_file.readlines()
+        kept_lines = lines[:1] + [
+            line for line in lines[1:] if float(line.split("\t")[0]) <= last_time
+        ]
+        with open(namefile, "w", encoding="utf-8") as output:
+            output.writelines(kept_lines)
+    for name in ("CELTRJ", "PATTRJ"):
+        trj.truncate(f"{namefolder}/{name}", num_iteration)
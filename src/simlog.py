@@ -9,7 +9,7 @@ from pathlib import Path
 import physica as psc
 
 
-def init_simulation(cond=None, logfile_name="SIMLOG.txt"):
+def init_simulation(cond=None, logfile_name="SIMLOG.txt", start_time=None):
     """Initiate the simulation log
 
     Parameter
@@ -18,6 +18,9 @@ def init_simulation(cond=None, logfile_name="SIMLOG.txt"):
         It give the special condition for example 'debug' log
     logfile_name: str, default="SIMLOG.txt"
         the name of log file.
+    start_time: datetime, default=None
+        the start time of a resumed simulation. The simulation keeps
+        its output folder and the log is appended.
 
     Return
     ------
@@ -27,7 +30,11 @@ def init_simulation(cond=None, logfile_name="SIMLOG.txt"):
         the log object
     """
     # simulation time
-    start_time = datetime.now()
+    resume = start_time is not None
+    if resume:
+        cond = "debug" if start_time == "debug" else cond
+    else:
+        start_time = datetime.now()
     if cond in ("debug", -1):
         time = "debug"
     elif cond is None:
@@ -39,7 +46,7 @@ def init_simulation(cond=None, logfile_name="SIMLOG.txt"):
     namefolder = f"./output/{psc.time_format(time)}-output/file"
     Path(namefolder).mkdir(parents=True, exist_ok=True)
     namefile = f"{namefolder}/{logfile_name}"
-    log = open(namefile, "w", encoding="utf-8")
+    log = open(namefile, "a" if resume else "w", encoding="utf-8")
     sys.stdout = log
 
     print("==================================================================")
@@ -49,6 +56,9 @@ def init_simulation(cond=None, logfile_name="SIMLOG.txt"):
     print("==================================================================")
 
     # current running time
-    print(f"SYSTEM: Simulation is start \t: {time}")
+    if resume:
+        print(f"SYSTEM: Simulation is resumed \t: {datetime.now()}")
+    else:
+        print(f"SYSTEM: Simulation is start \t: {time}")
 
     return time, log
@@ -0,0 +1,191 @@
+"""state module
+
+This module contains the integrin state class which stores the dynamic
+state of every integrin in the system as contiguous arrays.
+
+"""
+
+# third party import
+import numpy as np
+
+
+class IntegrinState:
+    """Structure-of-arrays store of all integrins in the system.
+
+    Every integrin owns one row of the (N, 2) position, velocity,
+    acceleration and force arrays. The integrin object keeps views on
+    its row, so updating the integrin through its properties is
+    visible in the arrays and vice versa. The rows of one cell are
+    always contiguous and can be accessed with `Cell.rows`.
+    """
+
+    def __init__(self, cells: list) -> None:
+        """init function for the integrin state.
+
+        The integrins of every cell are bound to the rows of the
+        state in the order of the cells and the integrins inside the
+        cell.
+
+        parameters
+        ----------
+        cells: list[Cell]
+            the cells whose integrins are stored in the state.
+        """
+        number = sum(cell.number_integrin for cell in cells)
+        self._position = np.zeros((number, 2), dtype=float)
+        self._velocity = np.zeros((number, 2), dtype=float)
+        self._acceleration = np.zeros((number, 2), dtype=float)
+        self._force = np.zeros((number, 2), dtype=float)
+        self._cell_id = np.zeros(number, dtype=int)
+        self._integrin_id = np.zeros(number, dtype=int)
+        self._bound = np.zeros(number, dtype=bool)
+        self._size = np.zeros(number, dtype=float)
+        self._mass = np.zeros(number, dtype=float)
+        self._potential_energy = np.zeros(number, dtype=float)
+        self._bonding_energy = np.zeros(number, dtype=float)
+        # the bond partner of every integrin, -1 if there is none
+        self._bond_ligand = np.full(number, -1, dtype=int)
+        self._bond_integrin = np.full(number, -1, dtype=int)
+        self._integrins = []
+        self._cells = list(cells)
+        self._topology_version = 0
+
+        row = 0
+        for cell in cells:
+            start = row
+            for integrin_ in cell.integrins:
+                integrin_.bind(self, row)
+                self._integrins.append(integrin_)
+                row += 1
+            cell.bind(self, slice(start, row))
+        self._build_edges()
+
+    def _build_edges(self):
+        """procedure to build the spring network of all cells in state
+        rows from the edges of the cells.
+        """
+        edges = [np.zeros((0, 2), dtype=int)]
+        rest_length = [np.zeros(0, dtype=float)]
+        for cell in self._cells:
+            edges.append(cell.edges + cell.rows.start)
+            rest_length.append(np.full(len(cell.edges), cell.normal_length, dtype=float))
+        self._edges = np.concatenate(edges)
+        self._rest_length = np.concatenate(rest_length)
+
+    def update_edges(self):
+        """Procedure to rebuild the spring network after the topology
+        of a cell is changed, see `Cell.invalidate_topology`. The
+        topology version is increased, so the objects which copy the
+        network can detect the change.
+        """
+        self._build_edges()
+        self._topology_version += 1
+
+    def rows_of(self, objs) -> np.ndarray:
+        """return the rows of a collection of integrins.
+
+        Parameter
+        ---------
+        objs: list[Integrin]
+            the integrins bound to this state.
+        """
+        return np.fromiter((obj.row for obj in objs), dtype=int, count=len(objs))
+
+    @property
+    def integrins(self):
+        """return the list of integrins ordered by their row."""
+        return self._integrins
+
+    @property
+    def number(self):
+        """return the number of integrins in the state."""
+        return len(self._integrins)
+
+    @property
+    def position(self):
+        """return the (N, 2) position array."""
+        return self._position
+
+    @property
+    def velocity(self):
+        """return the (N, 2) velocity array."""
+        return self._velocity
+
+    @property
+    def acceleration(self):
+        """return the (N, 2) acceleration array."""
+        return self._acceleration
+
+    @property
+    def force(self):
+        """return the (N, 2) force array."""
+        return self._force
+
+    @property
+    def cell_id(self):
+        """return the id of the host cell of every integrin."""
+        return self._cell_id
+
+    @property
+    def integrin_id(self):
+        """return the id of every integrin."""
+        return self._integrin_id
+
+    @property
+    def bound(self):
+        """return the bound flag of every integrin."""
+        return self._bound
+
+    @property
+    def free(self):
+        """return the rows of the unbound integrins."""
+        return np.flatnonzero(~self._bound)
+
+    @property
+    def topology_version(self):
+        """return the number of the spring network rebuilds."""
+        return self._topology_version
+
+    @property
+    def edges(self):
+        """return the (E, 2) rows of the springs of all cells."""
+        return self._edges
+
+    @property
+    def rest_length(self):
+        """return the normal length of every spring."""
+        return self._rest_length
+
+    @property
+    def size(self):
+        """return the size of every integrin."""
+        return self._size
+
+    @property
+    def mass(self):
+        """return the mass of every integrin."""
+        return self._mass
+
+    @property
+    def potential_energy(self):
+        """return the potential energy of every integrin."""
+        return self._potential_energy
+
+    @property
+    def bonding_energy(self):
+        """return the bonding energy of every integrin."""
+        return self._bonding_energy
+
+    @property
+    def bond_ligand(self):
+        """return the index of the bound ligand of every integrin, -1
+        if the integrin is not bound to a ligand.
+        """
+        return self._bond_ligand
+
+    @property
+    def bond_integrin(self):
+        """return the row of the bound integrin of every integrin, -1
+        if the integrin is not bound to another integrin.
+        """
+        return self._bond_integrin
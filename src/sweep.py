@@ -0,0 +1,263 @@
+"""sweep module
+
+This module runs a parameter sweep of the simulation. Every run gets
+its own folder with a copy of the input files, where the overrides are
+applied, and its own output folder, so the runs can overlap. The runs
+are executed concurrently with a bounded number of processes and a
+summary table is written at the end.
+
+Usage (from the repository root):
+
+    python src/sweep.py --set SIMCON:epsilon=100,511 --set SIMCON:springconstant=0.2,0.4 --jobs 4
+    python src/sweep.py --zip --set CELCON=input/CELCON1.txt,input/CELCON2.txt --set PATCON=input/PATCON1.txt,input/PATCON2.txt
+
+An override is either `FILE:key=value1,value2,...` which replaces (or
+adds) the `key` line of the input file, or `FILE=path1,path2,...` which
+replaces the whole input file. FILE is SIMCON, CELCON or PATCON.
+"""
+
+# built-in import
+import argparse
+import itertools
+import os
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+# local import
+import physica as psc
+
+INPUT_FILES = ("SIMCON", "CELCON", "PATCON")
+MAIN_FILE = Path(__file__).resolve().parent / "main.py"
+
+
+def parse_override(text: str):
+    """Function to parse one override argument.
+
+    Parameter
+    ---------
+    text: str
+        `FILE:key=value1,value2` or `FILE=path1,path2`
+
+    Return
+    ------
+    name: str
+        `FILE:key` or `FILE`
+    values: list[str]
+        the values of the override
+    """
+    name, _, values = text.partition("=")
+    if name.split(":")[0] not in INPUT_FILES or not values:
+        raise ValueError(f"wrong override '{text}'")
+    return name, [value.strip() for value in values.split(",")]
+
+
+def build_runs(overrides, zipped: bool = False):
+    """Function to build the list of runs from the overrides.
+
+    Parameters
+    ----------
+    overrides: list[tuple]
+        the (name, values) of every override
+    zipped: bool, default=False
+        combine the i-th values of every override instead of the
+        full grid of all combinations
+
+    Return
+    ------
+    list of dictionaries {name: value}, one for every run
+    """
+    names = [name for name, _ in overrides]
+    values = [value for _, value in overrides]
+    if zipped:
+        if len({len(value) for value in values}) > 1:
+            raise ValueError("zipped overrides must have the same number of values")
+        combinations = zip(*values)
+    else:
+        combinations = itertools.product(*values)
+    return [dict(zip(names, combination)) for combination in combinations]
+
+
+def apply_override(lines: list, key: str, value: str):
+    """Function to set the value of a key in the lines of an input file.
+
+    The line of the key is replaced. If there is no such line, it is
+    added before the last `#END`.
+    """
+    new_line = f"{key} {value}"
+    for i, line in enumerate(lines):
+        data = line.split()
+        if data and data[0] == key:
+            lines[i] = new_line
+            return lines
+    end_index = max(i for i, line in enumerate(lines) if line.strip() == "#END")
+    lines.insert(end_index, new_line)
+    return lines
+
+
+def prepare_run(run_dir: Path, input_dir: Path, run: dict):
+    """Procedure to create the folder of one run with its input files.
+
+    Parameters
+    ----------
+    run_dir: Path
+        the folder of the run, the simulation is executed inside it
+    input_dir: Path
+        the folder of the base input files
+    run: dict
+        the overrides of the run
+    """
+    run_input = run_dir / "input"
+    run_input.mkdir(parents=True)
+    for file_name in INPUT_FILES:
+        source = Path(run.get(file_name, input_dir / f"{file_name}.txt"))
+        with open(source, "r", encoding="utf-8") as data_file:
+            lines = data_file.read().splitlines()
+        for name, value in run.items():
+            file_key = name.split(":")
+            if file_key[0] == file_name and len(file_key) == 2:
+                lines = apply_override(lines, file_key[1], value)
+        with open(run_input / f"{file_name}.txt", "w", encoding="utf-8") as data_file:
+            data_file.write("\n".join(lines) + "\n")
+
+
+def execute_run(run_dir: Path):
+    """Function to execute the simulation inside the folder of a run.
+
+    Return
+    ------
+    dictionary of the status, the elapsed time, the output folder and
+    the last energy line of the run
+    """
+    start_time = datetime.now()
+    env = dict(os.environ, MPLBACKEND=os.environ.get("MPLBACKEND", "Agg"))
+    with open(run_dir / "SWEEPLOG.txt", "w", encoding="utf-8") as log:
+        process = subprocess.run(
+            [sys.executable, str(MAIN_FILE)],
+            cwd=run_dir,
+            env=env,
+            stdout=log,
+            stderr=subprocess.STDOUT,
+            check=False,
+        )
+    elapsed = (datetime.now() - start_time).total_seconds()
+    outputs = sorted((run_dir / "output").glob("*-output"))
+    energy = ""
+    if outputs and (outputs[-1] / "file" / "CELLEN.txt").exists():
+        with open(outputs[-1] / "file" / "CELLEN.txt", "r", encoding="utf-8") as data_file:
+            lines = data_file.read().split("\n")
+        energy = [line for line in lines if line.strip()][-1].strip()
+    return {
+        "status": "done" if process.returncode == 0 else f"failed ({process.returncode})",
+        "elapsed": elapsed,
+        "output": str(outputs[-1].relative_to(run_dir)) if outputs else "",
+        "energy": energy,
+    }
+
+
+def make_sweep_dir(root: Path):
+    """Function to create a new sweep folder whose name never collides
+    with the previous sweeps.
+    """
+    base_name = f"{psc.time_format(datetime.now())}-sweep"
+    for number in itertools.count():
+        sweep_dir = root / (base_name if number == 0 else f"{base_name}-{number}")
+        try:
+            sweep_dir.mkdir(parents=True)
+            return sweep_dir
+        except FileExistsError:
+            continue
+
+
+def run_sweep(runs, jobs: int = 1, input_dir="./input", root="./output/sweep"):
+    """Procedure to run every run of the sweep.
+
+    Parameters
+    ----------
+    runs: list[dict]
+        the overrides of every run from `build_runs`
+    jobs: int, default=1
+        the maximum number of simulations which run at the same time
+    input_dir: str, default='./input'
+        the folder of the base input files
+    root: str, default='./output/sweep'
+        the folder where the sweep folder is created
+
+    Return
+    ------
+    sweep_dir:
+        the folder of the sweep
+    results:
+        the summary of every run
+    """
+    input_dir = Path(input_dir).resolve()
+    sweep_dir = make_sweep_dir(Path(root))
+    run_dirs = []
+    for number, run in enumerate(runs, start=1):
+        run_dir = sweep_dir / f"run{number:03}"
+        prepare_run(run_dir, input_dir, run)
+        run_dirs.append(run_dir)
+    print(f"SYSTEM: {len(runs)} run(s) in {sweep_dir} with {jobs} job(s)")
+
+    # every simulation is a separate process, the pool bounds them
+    with ThreadPoolExecutor(max_workers=max(jobs, 1)) as pool:
+        results = list(pool.map(execute_run, run_dirs))
+    for number, (run, result) in enumerate(zip(runs, results), start=1):
+        result["run"] = f"run{number:03}"
+        result["overrides"] = " ".join(f"{name}={value}" for name, value in run.items())
+    write_summary(sweep_dir / "SUMMARY.txt", results)
+    return sweep_dir, results
+
+
+def write_summary(file_name, results):
+    """Procedure to print the summary table of the sweep and save it
+    as a tab separated file.
+    """
+    head = ("run", "status", "elapsed", "output", "overrides", "energy")
+    with open(file_name, "w", encoding="utf-8") as output:
+        output.write("\t".join(head) + "\n")
+        for result in results:
+            row = [str(result[key]) for key in head]
+            row[2] = f"{result['elapsed']:.1f}"
+            output.write("\t".join(row) + "\n")
+    print(f"{'run':<8}{'status':<14}{'time (s)':>10}  overrides")
+    for result in results:
+        print(
+            f"{result['run']:<8}{result['status']:<14}"
+            f"{result['elapsed']:>10.1f}  {result['overrides']}"
+        )
+    print(f"SYSTEM: summary is saved in {file_name}")
+
+
+def main(argv=None):
+    """the command line interface of the sweep runner"""
+    parser = argparse.ArgumentParser(description="run a parameter sweep")
+    parser.add_argument(
+        "--set",
+        dest="overrides",
+        action="append",
+        default=[],
+        help="FILE:key=value1,value2 or FILE=path1,path2",
+    )
+    parser.add_argument(
+        "--zip",
+        action="store_true",
+        help="combine the i-th values of the overrides instead of the grid",
+    )
+    parser.add_argument(
+        "--jobs", type=int, default=1, help="number of simultaneous runs"
+    )
+    parser.add_argument("--input", default="./input", help="base input folder")
+    parser.add_argument("--root", default="./output/sweep", help="folder of the sweeps")
+    args = parser.parse_args(argv)
+
+    overrides = [parse_override(text) for text in args.overrides]
+    runs = build_runs(overrides, args.zip) if overrides else [{}]
+    _, results = run_sweep(runs, args.jobs, args.input, args.root)
+    return 0 if all(result["status"] == "done" for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,241 @@
+"""trajectory module
+
+This module contains the binary trajectory format of the map data
+(CELMAP, CELNBR and PATMAP). A trajectory is a folder with:
+1. STATIC.npz, the arrays which never change, e.g. the ids.
+2. CHUNKxxxxx.npz, the compressed arrays of a chunk of frames. Every
+array has the frame as its first axis.
+3. FRAMES.txt, the frame index. Every row is the frame number, the
+iteration, the chunk and the position of the frame in the chunk, so
+any frame can be read without reading the others.
+
+The text files can be exported from a trajectory:
+
+    python src/trajectory.py FOLDER_CODE [ITERATION ...]
+"""
+
+# built-in import
+import sys
+from pathlib import Path
+
+# third party import
+import numpy as np
+
+FRAME_INDEX = "FRAMES.txt"
+STATIC_FILE = "STATIC.npz"
+_INDEX_HEAD = "frame\titeration\tchunk\toffset\n"
+
+
+class TrajectoryWriter:
+    """Writer of a binary trajectory.
+
+    The frames are kept in memory until the chunk is full, then the
+    chunk is written as one compressed file and the frame index is
+    updated. An existing trajectory is continued, e.g. after the
+    simulation is resumed.
+    """
+
+    def __init__(self, folder, static: dict, chunk_size: int = 50) -> None:
+        """init function for the trajectory writer.
+
+        parameters
+        ----------
+        folder: str or Path
+            the folder of the trajectory
+        static: dict
+            the arrays which are the same for every frame
+        chunk_size: int, default=50
+            the number of frames in one chunk file
+        """
+        self._folder = Path(folder)
+        self._folder.mkdir(parents=True, exist_ok=True)
+        self._chunk_size = chunk_size
+        self._frames: list[dict] = []
+        self._iterations: list[int] = []
+        if not (self._folder / STATIC_FILE).exists():
+            np.savez_compressed(self._folder / STATIC_FILE, **static)
+        index = read_index(self._folder)
+        self._frame_count = len(index)
+        self._chunk = int(index[:, 2].max()) + 1 if len(index) else 0
+        if not (self._folder / FRAME_INDEX).exists():
+            with open(self._folder / FRAME_INDEX, "w", encoding="utf-8") as output:
+                output.write(_INDEX_HEAD)
+
+    def append(self, iteration: int, **arrays):
+        """Procedure to add a frame into the trajectory.
+
+        Parameters
+        ----------
+        iteration: int
+            the iteration of the frame
+        arrays:
+            the arrays of the frame, every frame must have the same
+            names and shapes
+        """
+        self._frames.append({key: np.array(value) for key, value in arrays.items()})
+        self._iterations.append(iteration)
+        if len(self._frames) >= self._chunk_size:
+            self.flush()
+
+    def flush(self):
+        """Procedure to write the frames in memory as a new chunk."""
+        if not self._frames:
+            return
+        stacked = {
+            key: np.stack([frame[key] for frame in self._frames])
+            for key in self._frames[0]
+        }
+        np.savez_compressed(self._folder / f"CHUNK{self._chunk:05}.npz", **stacked)
+        rows = [
+            f"{self._frame_count + offset}\t{iteration}\t{self._chunk}\t{offset}\n"
+            for offset, iteration in enumerate(self._iterations)
+        ]
+        with open(self._folder / FRAME_INDEX, "a", encoding="utf-8") as output:
+            output.writelines(rows)
+        self._frame_count += len(self._frames)
+        self._chunk += 1
+        self._frames = []
+        self._iterations = []
+
+    def close(self):
+        """Procedure to write the remaining frames."""
+        self.flush()
+
+
+def read_index(folder):
+    """Function to read the frame index of a trajectory.
+
+    Return
+    ------
+    (F, 4) array of the frame, iteration, chunk and offset
+    """
+    index_file = Path(folder) / FRAME_INDEX
+    if not index_file.exists():
+        return np.zeros((0, 4), dtype=int)
+    return np.loadtxt(index_file, dtype=int, skiprows=1, ndmin=2).reshape(-1, 4)
+
+
+def truncate(folder, iteration: int):
+    """Procedure to remove the frames after an iteration from the frame
+    index, e.g. when the simulation is resumed from a checkpoint. The
+    chunk files are kept, the next frames are written to new chunks.
+    """
+    index = read_index(folder)
+    if len(index) == 0:
+        return
+    index = index[index[:, 1] <= iteration]
+    with open(Path(folder) / FRAME_INDEX, "w", encoding="utf-8") as output:
+        output.write(_INDEX_HEAD)
+        output.writelines(
+            f"{frame}\t{iteration_}\t{chunk}\t{offset}\n"
+            for frame, (_, iteration_, chunk, offset) in enumerate(index)
+        )
+
+
+class TrajectoryReader:
+    """Reader of a binary trajectory with random access to the
+    frames.
+    """
+
+    def __init__(self, folder) -> None:
+        """init function for the trajectory reader.
+
+        parameters
+        ----------
+        folder: str or Path
+            the folder of the trajectory
+        """
+        self._folder = Path(folder)
+        self._index = read_index(self._folder)
+        with np.load(self._folder / STATIC_FILE) as data:
+            self._static = {key: data[key] for key in data.files}
+        self._chunk_number = None
+        self._chunk = None
+
+    def __len__(self):
+        return len(self._index)
+
+    def frame(self, number: int) -> dict:
+        """return the arrays of a frame, including the static arrays.
+
+        Parameter
+        ---------
+        number: int
+            the number of the frame
+        """
+        _, iteration, chunk, offset = self._index[number]
+        if chunk != self._chunk_number:
+            with np.load(self._folder / f"CHUNK{chunk:05}.npz") as data:
+                self._chunk = {key: data[key] for key in data.files}
+            self._chunk_number = chunk
+        arrays = dict(self._static)
+        arrays.update({key: value[offset] for key, value in self._chunk.items()})
+        arrays["iteration"] = int(iteration)
+        return arrays
+
+    def frame_at(self, iteration: int) -> dict:
+        """return the arrays of the last frame of an iteration"""
+        match = np.flatnonzero(self._index[:, 1] == iteration)
+        if len(match) == 0:
+            raise KeyError(f"there is no frame of iteration {iteration}")
+        return self.frame(match[-1])
+
+    @property
+    def iterations(self):
+        """return the iteration of every frame"""
+        return self._index[:, 1]
+
+    @property
+    def static(self):
+        """return the static arrays"""
+        return self._static
+
+
+def export_text(folder_code: str, iterations=None):
+    """Procedure to export the map text files (CELMAP, CELNBR and
+    PATMAP) of a simulation from its binary trajectories.
+
+    Parameters
+    ----------
+    folder_code: str
+        the folder time code of the simulation
+    iterations: list[int], default=None
+        the iterations to be exported, every frame if None
+    """
+    # imported here, the save module imports this module
+    import save
+
+    namefolder = Path(f"./output/{folder_code}-output/file")
+    for name, map_name in (("CELTRJ", "CELMAP"), ("PATTRJ", "PATMAP")):
+        if not (namefolder / name / STATIC_FILE).exists():
+            continue
+        reader = TrajectoryReader(namefolder / name)
+        (namefolder / map_name).mkdir(parents=True, exist_ok=True)
+        if name == "CELTRJ":
+            with open(namefolder / "CELNBR.txt", "w", encoding="utf-8") as output:
+                output.write(save.celnbr_text(reader.static))
+        for number in range(len(reader)):
+            if iterations is not None and reader.iterations[number] not in iterations:
+                continue
+            frame = reader.frame(number)
+            namefile = namefolder / map_name / f"{map_name}{frame['iteration']:06}.txt"
+            with open(namefile, "w", encoding="utf-8") as output:
+                if name == "CELTRJ":
+                    output.write(save.celmap_text(frame))
+                else:
+                    output.write(save.patmap_text(frame))
+        print(f"SYSTEM: {map_name} is exported on {namefolder / map_name}")
+
+
+def text_file(folder_code: str, map_name: str, iteration) -> str:
+    """return the path of a map text file (PATMAP or CELMAP), it is
+    exported from the binary trajectory if it does not exist.
+    """
+    file_dir = f"./output/{folder_code}-output/file/{map_name}/{map_name}{int(iteration):06}.txt"
+    if not Path(file_dir).exists():
+        export_text(folder_code, [int(iteration)])
+    return file_dir
+
+
+if __name__ == "__main__":
+    export_text(sys.argv[1], [int(arg) for arg in sys.argv[2:]] or None)